@@ -0,0 +1,103 @@
+"""Benchmark memory use of binary_store_transmit for a large payload.
+
+Sends a payload (1 MB by default) through `binary_store_transmit` to an
+OpenSerial with a fake UART, once with the copying transmit path used before
+memoryviews were introduced and once with the current path. Each mode runs
+in its own process so that peak RSS is measured independently.
+
+For each mode this reports the peak RSS of the process, the peak of Python
+allocations traced during the call, and the number of buffers allocated to
+hold payload bytes on their way to the UART.
+
+    python benchmarks/binary_transmit_memory.py [payload_bytes]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+from unittest.mock import patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import binary_helpers  # noqa: E402
+from notecard.notecard import CARD_REQUEST_SEGMENT_MAX_LEN  # noqa: E402
+
+
+class FakeUART:
+    """A pyserial-like UART that discards writes and counts payload copies."""
+
+    def __init__(self):
+        """Create the UART."""
+        self.copies = 0
+        self.in_waiting = 0
+
+    def write(self, data):
+        """Discard `data`, counting it if it is a fresh buffer."""
+        if not isinstance(data, memoryview):
+            self.copies += 1
+
+
+def copying_transmit(self, data, delay=True):
+    """Write `data` in segments the way OpenSerial.transmit used to."""
+    seg_off = 0
+    seg_left = len(data)
+    while seg_left > 0:
+        seg_len = min(seg_left, CARD_REQUEST_SEGMENT_MAX_LEN)
+        self.uart.write(data[seg_off:seg_off + seg_len])
+        seg_off += seg_len
+        seg_left -= seg_len
+
+
+def run(mode, size):
+    """Transmit `size` bytes; return (peak RSS KB, traced peak KB, copies)."""
+    uart = FakeUART()
+    with patch('notecard.notecard.OpenSerial.Reset'):
+        card = notecard.OpenSerial(uart)
+    card.SetPacingProfile(notecard.PacingProfile(0, 0))
+    card.Transaction = lambda req, lock=True: (
+        {'max': size * 2} if req['req'] == 'card.binary' else {})
+    payload = bytes(range(256)) * (size // 256)
+
+    cobs_encode = binary_helpers.cobs_encode
+    transmit = notecard.OpenSerial.transmit
+    if mode == 'copy':
+        def cobs_encode(data, eop, _encode=cobs_encode):
+            # The old code copied the caller's buffer before encoding it.
+            uart.copies += 1
+            return _encode(bytearray(data), eop)
+        transmit = copying_transmit
+
+    tracemalloc.start()
+    with patch('notecard.binary_helpers.cobs_encode', cobs_encode), \
+            patch.object(notecard.OpenSerial, 'transmit', transmit):
+        binary_helpers.binary_store_transmit(card, payload, 0)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss, traced_peak // 1024, uart.copies
+
+
+def main():
+    """Run each mode in a child process and print a comparison table."""
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        print(*run(sys.argv[2], int(sys.argv[3])))
+        return
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024 * 1024
+    print(f'{size} byte payload')
+    print(f'{"mode":<6}{"peak RSS KB":>14}{"traced KB":>12}{"copies":>10}')
+    for mode in ('copy', 'view'):
+        out = subprocess.run(
+            [sys.executable, __file__, '--child', mode, str(size)],
+            check=True, capture_output=True, text=True).stdout
+        rss, traced, copies = out.split()
+        print(f'{mode:<6}{rss:>14}{traced:>12}{copies:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark the CRC32 backends in notecard.crc32.
+
+Reports the throughput, in MB/s, of each backend over a buffer of random
+bytes. `crc32` is whichever backend was selected for this platform at
+import.
+
+    python benchmarks/crc32_throughput.py [buffer_bytes] [iterations]
+"""
+
+import importlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# `notecard.crc32` is shadowed by the crc32 function on the package.
+crc32_module = importlib.import_module('notecard.crc32')
+
+BACKENDS = [
+    ('half-byte', crc32_module._crc32_half_byte),
+    ('table', crc32_module._crc32_byte_table),
+    ('zlib', crc32_module._crc32_zlib),
+]
+
+
+def run(fn, data, iterations):
+    """Return the throughput of `fn` over `data` in MB/s."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(data)
+    elapsed = time.perf_counter() - start
+    return len(data) * iterations / elapsed / (1024 * 1024)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 64 * 1024
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    data = bytes(random.getrandbits(8) for _ in range(size))
+
+    print(f'{size} byte buffer, {iterations} iterations, '
+          f'selected backend: {crc32_module.CRC32_BACKEND}')
+    print(f'{"backend":<12}{"MB/s":>12}')
+    for name, fn in BACKENDS:
+        print(f'{name:<12}{run(fn, data, iterations):>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark OpenI2C response polling against a simulated I2C Notecard.
+
+The simulated device answers each request after a random processing latency
+(a few milliseconds, like card.version). The benchmark measures the time from
+the end of the request write to the full response being read, first with the
+old fixed 50 ms poll interval and then with the adaptive schedule, and
+reports p50/p99 latency.
+
+    python benchmarks/i2c_poll_latency.py [transactions]
+"""
+
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+
+RESPONSE = b'{"version":"notecard-8.1.3","device":"dev:000000000000000"}\r\n'
+
+
+class SimulatedI2C:
+    """A periphery.I2C-like device that answers after a random latency."""
+
+    def __init__(self, min_latency_ms=2, max_latency_ms=8):
+        """Create the device."""
+        self.min_latency_ms = min_latency_ms
+        self.max_latency_ms = max_latency_ms
+        self.ready_at = None
+        self.pending = bytearray()
+
+    def transfer(self, address, msgs):
+        """Handle a serial-over-I2C write or read transfer."""
+        if len(msgs) == 1:
+            # A write. Once a full request is in, schedule the response.
+            if bytes(msgs[0].data[1:]).endswith(b'\n'):
+                latency = random.uniform(self.min_latency_ms,
+                                         self.max_latency_ms)
+                self.ready_at = time.monotonic() + latency / 1000
+            return
+
+        want = msgs[0].data[1]
+        if self.ready_at is not None and time.monotonic() >= self.ready_at:
+            self.pending += RESPONSE
+            self.ready_at = None
+        chunk = self.pending[:want]
+        del self.pending[:want]
+        out = bytearray(len(msgs[1].data))
+        out[0] = min(len(self.pending), 255)
+        out[1] = len(chunk)
+        out[2:2 + len(chunk)] = chunk
+        msgs[1].data = out
+
+
+def run(transactions):
+    """Run `transactions` request/response cycles; return latencies in ms."""
+    device = SimulatedI2C()
+    with patch('notecard.notecard.OpenI2C.Reset'):
+        card = notecard.OpenI2C(device, 0, 0)
+    req = b'{"req":"card.version"}\n'
+
+    latencies = []
+    # Write the request directly, skipping transmit's pacing delays, so that
+    # only the wait for the response is timed.
+    card.transmit = card._write
+    for _ in range(transactions):
+        start = time.monotonic()
+        rsp = card._transact(req, rsp_expected=True)
+        latencies.append((time.monotonic() - start) * 1000)
+        assert rsp == RESPONSE
+    return latencies
+
+
+def percentile(values, pct):
+    """Return the `pct` percentile of `values`."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    random.seed(1)
+
+    print(f'{transactions} transactions, device latency 2-8 ms')
+    print(f'{"schedule":<10}{"p50 ms":>10}{"p99 ms":>10}')
+    fixed = {
+        'CARD_I2C_POLL_MIN_MS': 50,
+        'CARD_I2C_POLL_MAX_MS': 50,
+        'CARD_I2C_POLL_NETWORK_MS': 50,
+    }
+    with patch.multiple('notecard.notecard', **fixed):
+        latencies = run(transactions)
+    print(f'{"fixed":<10}{percentile(latencies, 50):>10.1f}'
+          f'{percentile(latencies, 99):>10.1f}')
+
+    latencies = run(transactions)
+    print(f'{"adaptive":<10}{percentile(latencies, 50):>10.1f}'
+          f'{percentile(latencies, 99):>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark heap allocations made by OpenI2C._read.
+
+Polls (reads of the header only) and full-size reads are made against a fake
+I2C bus that allocates nothing itself, first with the old `_read`, which
+allocated its buffers on every call, and then with the current one, which
+reuses buffers allocated by OpenI2C.
+
+On CPython, reads go through the MicroPython code path, as the periphery one
+allocates buffers of its own, and tracemalloc reports the memory allocated
+during each read. It's freed straight away, but on MicroPython it stays on
+the heap until the next garbage collection.
+
+On MicroPython or CircuitPython, copy the notecard package to the board and
+run this file there. Garbage collection is disabled while reading, and
+gc.mem_alloc() reports the heap used by each read.
+
+    python benchmarks/i2c_read_allocations.py [reads]
+"""
+
+import gc
+import sys
+
+if sys.implementation.name == 'cpython':
+    import os
+
+    sys.path.insert(0, os.path.abspath(
+        os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+
+MAX_TRANSFER = 255
+
+
+class FakeI2C:
+    """An I2C bus whose Notecard always has a full read's worth of data."""
+
+    def writeto(self, address, buf, stop=True):
+        """Note the length of the read being started."""
+        self.read_len = buf[1]
+
+    def readfrom_into(self, address, buf):
+        """Fill in the header for a read of the requested length."""
+        buf[0] = MAX_TRANSFER
+        buf[1] = self.read_len
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in):
+        """Start a read, then read."""
+        self.writeto(address, buffer_out)
+        self.readfrom_into(address, buffer_in)
+
+    def try_lock(self):
+        """Take the bus lock."""
+        return True
+
+    def unlock(self):
+        """Release the bus lock."""
+        pass
+
+
+def old_read(self, length):
+    """Perform a serial-over-I2C read the way OpenI2C._read used to."""
+    initiate_read = bytearray(2)
+    initiate_read[0] = 0
+    initiate_read[1] = length
+    read_buf = bytearray(length + 2)
+
+    self._platform_read(initiate_read, read_buf)
+    header = read_buf[0:2]
+    available = header[0]
+    data_len = header[1]
+    data = read_buf[2:]
+
+    if len(data) != data_len:
+        raise Exception('Serial-over-I2C error.')
+
+    return available, data
+
+
+def open_card():
+    """Open an OpenI2C on a FakeI2C, reading the MicroPython way."""
+    reset = notecard.OpenI2C.Reset
+    notecard.OpenI2C.Reset = lambda self: None
+    try:
+        card = notecard.OpenI2C(FakeI2C(), 0, MAX_TRANSFER)
+    finally:
+        notecard.OpenI2C.Reset = reset
+    card._platform_read = card._micropython_read
+    return card
+
+
+def cpython_bytes_per_read(read, length, reads):
+    """Return the mean bytes allocated by `reads` calls of read(length)."""
+    import tracemalloc
+
+    tracemalloc.start()
+    total = 0
+    for _ in range(reads):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        read(length)
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / reads
+
+
+def micropython_bytes_per_read(read, length, reads):
+    """Return the mean heap used by `reads` calls of read(length)."""
+    gc.collect()
+    gc.disable()
+    try:
+        before = gc.mem_alloc()
+        for _ in range(reads):
+            read(length)
+        used = gc.mem_alloc() - before
+    finally:
+        gc.enable()
+    return used / reads
+
+
+def main(reads):
+    """Measure each implementation and print a table."""
+    if sys.implementation.name == 'cpython':
+        bytes_per_read = cpython_bytes_per_read
+    else:
+        bytes_per_read = micropython_bytes_per_read
+
+    card = open_card()
+    print('bytes allocated per read, mean of {} reads'.format(reads))
+    print('{:<8}{:>10}{:>12}'.format('_read', 'poll', 'full read'))
+    for name, read in (('old', lambda n: old_read(card, n)),
+                       ('reused', card._read)):
+        poll = bytes_per_read(read, 0, reads)
+        full = bytes_per_read(read, MAX_TRANSFER, reads)
+        print('{:<8}{:>10.0f}{:>12.0f}'.format(name, poll, full))
+
+
+if sys.implementation.name != 'cpython' or __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,102 @@
+"""Benchmark the cost of importing the notecard package.
+
+On CPython, imports notecard in fresh interpreters and reports the median
+cold-start import time, the slowest modules imported along the way (from
+`python -X importtime`), and which optional dependencies were loaded. These
+are only needed once an OpenSerial or OpenI2C is created, so none of them
+should be.
+
+On MicroPython or CircuitPython, copy the notecard package to the board and
+run this file there to report the free RAM before and after the import.
+
+    python benchmarks/import_time.py [runs]
+"""
+
+import gc
+import sys
+
+# Modules notecard should only import when they're used.
+LAZY_MODULES = ('filelock', 'periphery', 'RPi', 'notecard.md5',
+                'notecard.metrics', 'asyncio')
+
+
+def cpython_import_times(runs):
+    """Return the import time of notecard, in ms, in `runs` fresh processes."""
+    import subprocess
+
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import notecard'],
+            capture_output=True, text=True, check=True, cwd=ROOT).stderr
+        for line in out.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == 'notecard':
+                times.append(int(fields[1]) / 1000)
+
+    return times
+
+
+def slowest_imports(count=8):
+    """Return the `count` modules that took longest to import, with times."""
+    import subprocess
+
+    out = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import notecard'],
+        capture_output=True, text=True, check=True, cwd=ROOT).stderr
+    rows = []
+    for line in out.splitlines()[1:]:
+        fields = line.split('|')
+        if len(fields) == 3:
+            rows.append((int(fields[0].split(':')[1]) / 1000,
+                         fields[2].strip()))
+
+    return sorted(rows, reverse=True)[:count]
+
+
+def loaded_lazy_modules():
+    """Return the LAZY_MODULES that `import notecard` loads."""
+    import subprocess
+
+    script = ('import sys, notecard; '
+              f'print(*[m for m in {LAZY_MODULES!r} if m in sys.modules])')
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                         text=True, check=True, cwd=ROOT).stdout
+    return out.split()
+
+
+def cpython_main(runs):
+    """Report import times on CPython."""
+    times = sorted(cpython_import_times(runs))
+    print(f'import notecard: median {times[len(times) // 2]:.1f} ms, '
+          f'min {times[0]:.1f} ms over {runs} runs')
+
+    print('slowest modules (self time):')
+    for ms, name in slowest_imports():
+        print(f'  {ms:7.2f} ms  {name}')
+
+    loaded = loaded_lazy_modules()
+    print('lazily loaded modules imported:', ', '.join(loaded) or 'none')
+
+
+def micropython_main():
+    """Report the RAM used by importing notecard on MicroPython."""
+    gc.collect()
+    before = gc.mem_free()
+    import notecard  # noqa: F401
+    gc.collect()
+    after = gc.mem_free()
+    print('free RAM before import: {} bytes'.format(before))
+    print('free RAM after import:  {} bytes'.format(after))
+    print('used by import notecard: {} bytes'.format(before - after))
+
+
+if sys.implementation.name == 'cpython':
+    import os
+
+    ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+    if __name__ == '__main__':
+        cpython_main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
+else:
+    micropython_main()
@@ -0,0 +1,72 @@
+"""Benchmark the JSON codecs in notecard.codec.
+
+Times, for each codec installed here, encoding a representative `note.add`
+request and decoding a large `note.changes` response.
+
+    python benchmarks/json_codecs.py [response_bytes] [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from notecard.codec import CODECS  # noqa: E402
+
+NOTE_ADD = {
+    'req': 'note.add',
+    'file': 'sensors.qo',
+    'sync': True,
+    'body': {
+        'temp': 21.53,
+        'humidity': 48.25,
+        'pressure': 1013.2,
+        'location': 'greenhouse/north',
+        'readings': [0.125, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0],
+    },
+}
+
+
+def make_changes_response(size):
+    """Build a `note.changes` response of roughly `size` bytes."""
+    note = '"%04d":{"body":{"temp":21.5,"humidity":48.25},"time":1700000000},'
+    notes = ''
+    i = 0
+    while len(notes) < size - 32:
+        notes += note % i
+        i += 1
+    return ('{"changes":%d,"notes":{%s}}\r\n' % (i, notes[:-1])).encode()
+
+
+def run(fn, arg, iterations):
+    """Return the CPU time, in microseconds, per call of `fn(arg)`."""
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 64 * 1024
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    changes = make_changes_response(size)
+
+    print(f'note.add encode, {len(changes)} byte note.changes decode, '
+          f'{iterations} iterations')
+    print(f'{"codec":<8}{"encode us":>12}{"decode us":>12}')
+    for name, codec_class in CODECS.items():
+        try:
+            codec = codec_class()
+        except ImportError:
+            print(f'{name:<8}{"not installed":>24}')
+            continue
+        encode = run(codec.dumps, NOTE_ADD, iterations * 10)
+        decode = run(codec.loads, changes, iterations)
+        print(f'{name:<8}{encode:>12.2f}{decode:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark a Notecard session replayed from a wire capture.
+
+Records a session (a card.version request, a binary store round trip and a
+note.add) against notecard.emulator with a fixed response latency, using
+notecard.capture. The capture is then replayed through OpenSerial and
+OpenI2C, with its timing and without, and the time to run the session is
+reported each way. Untimed replays measure the host's own overhead, which is
+what changes to Transaction, its retries and its CRC handling affect.
+
+Pass a capture path to keep the capture, or to replay one recorded earlier
+with the same session. Captures from the field can be replayed the same way,
+by driving the card with the requests made when they were recorded.
+
+    python benchmarks/replay.py [latency_ms] [iterations] [capture_dir]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import binary_helpers  # noqa: E402
+from notecard.capture import (  # noqa: E402
+    RecordingI2C,
+    RecordingUART,
+    ReplayI2C,
+    ReplayUART,
+)
+from notecard.emulator import (  # noqa: E402
+    EmulatedI2C,
+    EmulatedUART,
+    NotecardEmulator,
+)
+from notecard.pacing import PacingProfile  # noqa: E402
+
+PAYLOAD = bytes(range(256)) * 64
+
+TRANSPORTS = {
+    'serial': (notecard.OpenSerial, EmulatedUART, RecordingUART, ReplayUART),
+    'i2c': (lambda bus: notecard.OpenI2C(bus, 0, 0), EmulatedI2C,
+            RecordingI2C, ReplayI2C),
+}
+
+
+def session(card):
+    """Run the benchmark's requests on `card`."""
+    card.SetPacingProfile(PacingProfile(0, 0))
+    card.Transaction({'req': 'card.version'})
+    binary_helpers.binary_store_reset(card)
+    binary_helpers.binary_store_transmit(card, PAYLOAD, 0)
+    binary_helpers.binary_store_receive(card, 0, len(PAYLOAD))
+    card.Transaction({'req': 'note.add', 'body': {'temp': 21.5}})
+
+
+def timed_session(open_card):
+    """Return the seconds taken to open a card and run the session on it."""
+    start = time.monotonic()
+    session(open_card())
+    return time.monotonic() - start
+
+
+def main():
+    """Record, replay and report."""
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    capture_dir = sys.argv[3] if len(sys.argv) > 3 else tempfile.mkdtemp()
+
+    print(f'{latency_ms} ms response latency, median of {iterations} '
+          'sessions')
+    print(f'{"transport":<10}{"live":>10}{"timed":>10}{"untimed":>10}'
+          f'{"capture":>12}')
+    for name, (open_card, emulated, recording, replay) in TRANSPORTS.items():
+        path = os.path.join(capture_dir, f'{name}.ncap')
+
+        def live():
+            return open_card(emulated(NotecardEmulator(latency_ms)))
+
+        if not os.path.exists(path):
+            with recording(emulated(NotecardEmulator(latency_ms)),
+                           path) as port:
+                session(open_card(port))
+
+        results = []
+        for open_port in (live,
+                          lambda: open_card(replay(path)),
+                          lambda: open_card(replay(path, timed=False))):
+            times = sorted(timed_session(open_port)
+                           for _ in range(iterations))
+            results.append(times[len(times) // 2] * 1000)
+
+        print(f'{name:<10}' + ''.join(f'{ms:>8.1f}ms' for ms in results)
+              + f'{os.path.getsize(path) / 1024:>10.1f}KB')
+
+    print(f'captures in {capture_dir}')
+
+
+if __name__ == '__main__':
+    main()
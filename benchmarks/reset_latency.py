@@ -0,0 +1,77 @@
+"""Benchmark how long it takes to open and to resynchronise with a Notecard.
+
+Times, against notecard.emulator with a fixed response latency:
+
+- startup: constructing OpenSerial or OpenI2C, which resets the Notecard.
+- reset: a Reset with nothing pending, as done before retrying a request.
+- recovery: a Reset with a partial request sitting in the Notecard's input
+  buffer, which the Notecard answers with an error line instead of an echo.
+
+    python benchmarks/reset_latency.py [latency_ms] [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard.emulator import (  # noqa: E402
+    EmulatedI2C,
+    EmulatedUART,
+    NotecardEmulator,
+)
+
+
+def open_serial(latency_ms):
+    """Open an OpenSerial on a new emulator."""
+    return notecard.OpenSerial(EmulatedUART(NotecardEmulator(latency_ms)))
+
+
+def open_i2c(latency_ms):
+    """Open an OpenI2C on a new emulator."""
+    return notecard.OpenI2C(EmulatedI2C(NotecardEmulator(latency_ms)), 0, 0)
+
+
+def leave_partial_request(card):
+    """Send the start of a request without its terminating newline."""
+    if isinstance(card, notecard.OpenSerial):
+        card.uart.write(b'{"req":"card.')
+    else:
+        card._write(b'{"req":"card.')
+
+
+def time_ms(fn, iterations):
+    """Return the mean wall time, in ms, of `fn()`."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    """Print startup, reset and recovery latency for each transport."""
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f'Emulated Notecard latency {latency_ms} ms, '
+          f'{iterations} iterations.')
+    print(f'{"transport":<10}{"startup":>12}{"reset":>12}{"recovery":>12}')
+    for name, open_card in (('serial', open_serial), ('i2c', open_i2c)):
+        startup = time_ms(lambda: open_card(latency_ms), iterations)
+        card = open_card(latency_ms)
+        reset = time_ms(card.Reset, iterations)
+
+        def recover():
+            leave_partial_request(card)
+            card.Reset()
+        recovery = time_ms(recover, iterations)
+
+        print(f'{name:<10}{startup:>9.1f} ms{reset:>9.1f} ms'
+              f'{recovery:>9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
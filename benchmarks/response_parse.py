@@ -0,0 +1,63 @@
+"""Benchmark the cost of checking and decoding a Notecard response.
+
+Builds a large `note.changes` response carrying a valid CRC field and times
+`Notecard._evaluate_response` on it, next to a single bare `json.loads` of
+the same bytes for reference.
+
+    python benchmarks/response_parse.py [response_bytes] [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard.notecard import crc32  # noqa: E402
+
+
+def make_response(size, seq_number):
+    """Build a `note.changes` response of roughly `size` bytes with a CRC."""
+    note = '"%04d":{"body":{"temp":21.5,"humidity":48.25},"time":1700000000},'
+    notes = ''
+    i = 0
+    while len(notes) < size - 64:
+        notes += note % i
+        i += 1
+    body = '{"changes":%d,"notes":{%s}}' % (i, notes[:-1])
+    crc = crc32(body.encode())
+    return ('%s,"crc":"%04x:%08x"}\r\n'
+            % (body[:-1], seq_number, crc)).encode()
+
+
+def run(fn, rsp_bytes, iterations):
+    """Return the CPU time, in ms, per call of `fn` on `rsp_bytes`."""
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(rsp_bytes)
+    return (time.process_time() - start) / iterations * 1000
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 64 * 1024
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    card = notecard.Notecard()
+    card._last_request_seq_number = 7
+    rsp_bytes = make_response(size, 7)
+
+    rsp_json, verdict = card._evaluate_response(rsp_bytes)
+    assert rsp_json is not None and 'crc' in rsp_json
+
+    print(f'{len(rsp_bytes)} byte response, {iterations} iterations')
+    print(f'{"step":<20}{"CPU ms/rsp":>12}')
+    for name, fn in (('json.loads', json.loads),
+                     ('_evaluate_response', card._evaluate_response)):
+        print(f'{name:<20}{run(fn, rsp_bytes, iterations):>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark OpenSerial.receive: byte-at-a-time vs. bulk reads.
+
+Feeds a `note.changes`-sized response through a fake UART and reports, for
+each receive mode, the number of UART calls made per KB received and the CPU
+time spent per response.
+
+    python benchmarks/serial_receive.py [response_bytes] [iterations]
+"""
+
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+
+
+class FakeUART:
+    """A pyserial-like UART that counts calls into it.
+
+    Data "arrives" in bursts of `burst` bytes each time `in_waiting` is
+    checked, roughly like USB CDC packets arriving from the Notecard.
+    """
+
+    def __init__(self, burst=64):
+        """Create an empty UART."""
+        self.burst = burst
+        self.rx = bytearray()
+        self.arrived = 0
+        self.calls = 0
+
+    def load(self, data):
+        """Queue up `data` to be received."""
+        self.rx = bytearray(data)
+        self.arrived = 0
+        self.calls = 0
+
+    @property
+    def in_waiting(self):
+        """Return the number of bytes that have arrived but not been read."""
+        self.calls += 1
+        self.arrived = min(len(self.rx), self.arrived + self.burst)
+        return self.arrived
+
+    def read(self, size=1):
+        """Read up to `size` bytes."""
+        self.calls += 1
+        size = min(size, self.arrived)
+        data = bytes(self.rx[:size])
+        del self.rx[:size]
+        self.arrived -= size
+        return data
+
+    def write(self, data):
+        """Discard written data."""
+        self.calls += 1
+
+
+def make_response(size):
+    """Build a newline-terminated JSON response of roughly `size` bytes."""
+    note = '"%04d":{"body":{"temp":21.5,"humidity":48.25}},'
+    notes = ''
+    i = 0
+    while len(notes) < size - 32:
+        notes += note % i
+        i += 1
+    return ('{"changes":%d,"notes":{%s}}\r\n' % (i, notes[:-1])).encode()
+
+
+def run(bulk, response, iterations):
+    """Receive `response` `iterations` times; return (calls/KB, CPU secs)."""
+    uart = FakeUART()
+    with patch('notecard.notecard.OpenSerial.Reset'):
+        card = notecard.OpenSerial(uart)
+    card._bulk_receive = bulk
+
+    calls = 0
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        uart.load(response)
+        data = card.receive()
+        calls += uart.calls
+        assert data == response
+    cpu = time.process_time() - cpu_start
+
+    calls_per_kb = calls / iterations / (len(response) / 1024)
+    return calls_per_kb, cpu / iterations
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    response = make_response(size)
+
+    print(f'{len(response)} byte response, {iterations} iterations')
+    print(f'{"mode":<8}{"calls/KB":>12}{"CPU ms/rsp":>14}')
+    for name, bulk in (('byte', False), ('bulk', True)):
+        calls_per_kb, cpu = run(bulk, response, iterations)
+        print(f'{name:<8}{calls_per_kb:>12.1f}{cpu * 1000:>14.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""Benchmark suite for note-python's transport, codec and binary hot paths.
+
+Times each benchmark below, prints a table and optionally saves the results
+as JSON so that numbers can be compared between releases:
+
+    python benchmarks/suite.py                      # run everything
+    python benchmarks/suite.py -k cobs -k crc32     # only matching names
+    python benchmarks/suite.py -o results.json      # save results
+    python benchmarks/suite.py --compare old.json   # compare with a save
+
+Round-trip and upload benchmarks run against notecard.emulator over an
+in-process UART, so their times include the emulated Notecard's own work
+(e.g. COBS decoding) but no I/O or pacing delays.
+
+Each benchmark is called repeatedly for at least `--min-time` seconds per
+round, over `--rounds` rounds. The reported time per call is the median of
+the rounds; min and max are saved too.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import binary_helpers, md5, upload  # noqa: E402
+from notecard.cobs import cobs_decode, cobs_encode  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+# `notecard.crc32` is shadowed by the crc32 function on the package.
+crc32_module = importlib.import_module('notecard.crc32')
+
+KB = 1024
+MB = 1024 * 1024
+BINARY_SIZES = [('1KB', KB), ('64KB', 64 * KB), ('1MB', MB)]
+
+BENCHMARKS = []
+
+
+def benchmark(name, nbytes=None):
+    """Register a benchmark.
+
+    The decorated function does any setup and returns the callable to time.
+    `nbytes` is the amount of data one call processes, used to report
+    throughput.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, nbytes, setup))
+        return setup
+    return register
+
+
+def payload(size):
+    """Return `size` bytes of repeatable, non-trivial binary data."""
+    return (bytes(range(256)) * (size // 256 + 1))[:size]
+
+
+def changes_response(size, seq_number):
+    """Build a `note.changes` response of roughly `size` bytes with a CRC."""
+    note = '"%04d":{"body":{"temp":21.5,"humidity":48.25},"time":1700000000},'
+    notes = ''
+    i = 0
+    while len(notes) < size - 64:
+        notes += note % i
+        i += 1
+    body = '{"changes":%d,"notes":{%s}}' % (i, notes[:-1])
+    crc = crc32_module.crc32(body.encode())
+    return ('%s,"crc":"%04x:%08x"}\r\n'
+            % (body[:-1], seq_number, crc)).encode()
+
+
+def emulated_card(binary_max=None):
+    """Return an OpenSerial connected to an emulator, with no pacing."""
+    emulator = NotecardEmulator()
+    if binary_max is not None:
+        emulator.binary_max = binary_max
+    card = notecard.OpenSerial(EmulatedUART(emulator))
+    card.SetPacingProfile(PacingProfile(0, 0))
+    return card
+
+
+def forget_history(card):
+    """Stop the emulator's request and web.post records from piling up."""
+    emulator = card.uart.emulator
+    del emulator.requests[:]
+    del emulator.web_posts[:]
+
+
+NOTE_ADD = {
+    'req': 'note.add',
+    'file': 'sensors.qo',
+    'body': {'temp': 21.53, 'humidity': 48.25, 'pressure': 1013.2},
+}
+
+
+for _label, _size in BINARY_SIZES:
+    @benchmark(f'cobs_encode[{_label}]', _size)
+    def _cobs_encode(size=_size):
+        data = payload(size)
+        return lambda: cobs_encode(data, ord('\n'))
+
+    @benchmark(f'cobs_decode[{_label}]', _size)
+    def _cobs_decode(size=_size):
+        encoded = cobs_encode(payload(size), ord('\n'))
+        return lambda: cobs_decode(encoded, ord('\n'))
+
+    @benchmark(f'crc32[{_label}]', _size)
+    def _crc32(size=_size):
+        data = payload(size)
+        return lambda: crc32_module.crc32(data)
+
+    @benchmark(f'crc32_table[{_label}]', _size)
+    def _crc32_table(size=_size):
+        data = payload(size)
+        return lambda: crc32_module._crc32_byte_table(data)
+
+    @benchmark(f'binary_store_transmit[{_label}]', _size)
+    def _binary_store_transmit(size=_size):
+        card = emulated_card(binary_max=size)
+        data = payload(size)
+
+        def run():
+            forget_history(card)
+            binary_helpers.binary_store_reset(card)
+            binary_helpers.binary_store_transmit(card, data, 0)
+        return run
+
+    @benchmark(f'upload[{_label}]', _size)
+    def _upload(size=_size):
+        card = emulated_card()
+        data = payload(size)
+
+        def run():
+            forget_history(card)
+            upload.upload(card, data, 'bench-route')
+        return run
+
+
+# The pure-Python MD5 is far too slow for a 1 MB buffer to be useful.
+for _label, _size in BINARY_SIZES[:2]:
+    @benchmark(f'md5_digest[{_label}]', _size)
+    def _md5_digest(size=_size):
+        data = payload(size)
+        return lambda: md5.digest(data)
+
+
+@benchmark('prepare_request[note.add]')
+def _prepare_request():
+    card = notecard.Notecard()
+    return lambda: card._prepare_request(NOTE_ADD)
+
+
+@benchmark('crc_error[note.changes 64KB]', 64 * KB)
+def _crc_error():
+    card = notecard.Notecard()
+    card._last_request_seq_number = 7
+    rsp = changes_response(64 * KB, 7)
+    return lambda: card._crc_error(rsp)
+
+
+@benchmark('evaluate_response[note.changes 64KB]', 64 * KB)
+def _evaluate_response():
+    card = notecard.Notecard()
+    card._last_request_seq_number = 7
+    rsp = changes_response(64 * KB, 7)
+    return lambda: card._evaluate_response(rsp)
+
+
+@benchmark('transaction[card.version]')
+def _transaction_version():
+    card = emulated_card()
+    req = {'req': 'card.version'}
+
+    def run():
+        forget_history(card)
+        card.Transaction(req)
+    return run
+
+
+@benchmark('transaction[card.version, observed]')
+def _transaction_version_observed():
+    card = emulated_card()
+    card.AddObserver(lambda record: record.durations())
+    req = {'req': 'card.version'}
+
+    def run():
+        forget_history(card)
+        card.Transaction(req)
+    return run
+
+
+@benchmark('transaction[note.add]')
+def _transaction_note_add():
+    card = emulated_card()
+
+    def run():
+        forget_history(card)
+        card.uart.emulator.notes.clear()
+        card.Transaction(NOTE_ADD)
+    return run
+
+
+def time_benchmark(fn, min_time, rounds):
+    """Return the per-call times, in seconds, of `rounds` rounds of `fn`."""
+    # Find a number of calls per round that takes at least min_time.
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls = max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)))
+
+    times = [elapsed / calls]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        times.append((time.perf_counter() - start) / calls)
+    return times, calls
+
+
+def git_commit():
+    """Return the commit of the source tree, if it's a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_time(secs):
+    """Format a duration with a sensible unit."""
+    if secs >= 1:
+        return f'{secs:.3f} s'
+    if secs >= 1e-3:
+        return f'{secs * 1e3:.3f} ms'
+    return f'{secs * 1e6:.2f} us'
+
+
+def main():
+    """Run the suite and print, save or compare the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='filters', action='append', default=[],
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('-o', '--output', help='save results to this file')
+    parser.add_argument('--compare', help='compare with saved results')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per round (default 0.2)')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='rounds per benchmark (default 5)')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args()
+
+    selected = [b for b in BENCHMARKS
+                if not args.filters or any(f in b[0] for f in args.filters)]
+    if args.list:
+        for name, _, _ in selected:
+            print(name)
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {b['name']: b for b in json.load(f)['benchmarks']}
+
+    results = []
+    print(f'{"benchmark":<40}{"time/call":>14}{"MB/s":>10}'
+          + (f'{"vs base":>10}' if baseline else ''))
+    for name, nbytes, setup in selected:
+        times, calls = time_benchmark(setup(), args.min_time, args.rounds)
+        result = {
+            'name': name,
+            'median_secs': statistics.median(times),
+            'min_secs': min(times),
+            'max_secs': max(times),
+            'calls_per_round': calls,
+            'rounds': args.rounds,
+        }
+        if nbytes is not None:
+            result['bytes'] = nbytes
+            result['mb_per_sec'] = nbytes / result['median_secs'] / MB
+        results.append(result)
+
+        line = f'{name:<40}{format_time(result["median_secs"]):>14}'
+        line += (f'{result["mb_per_sec"]:>10.2f}' if nbytes is not None
+                 else f'{"":>10}')
+        if name in baseline:
+            ratio = baseline[name]['median_secs'] / result['median_secs']
+            line += f'{ratio:>9.2f}x'
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                           time.gmtime()),
+                'commit': git_commit(),
+                'python': platform.python_implementation() + ' '
+                + platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'json_codec': notecard.Notecard().GetCodec().name,
+                'crc32_backend': crc32_module.CRC32_BACKEND,
+                'benchmarks': results,
+            }, f, indent=2)
+        print(f'Saved results to {args.output}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark upload.upload over a simulated lossy cellular link.
+
+Uploads a payload (256 KB by default) to notecard.emulator, whose web.post
+stands in for a link to Notehub: each post takes a round trip plus its
+length over the link's rate, and each KB of it is lost with a fixed
+probability, in which case the post fails with a `{timeout}` error after the
+link's timeout. Time is simulated, so backoff and posts don't really take
+any time, and the link's losses are seeded, so runs are repeatable. Each
+policy uploads the payload once per seed, and the results are averaged.
+
+The upload is run with the policy upload used to have, which retried every
+failure after a fixed 15 seconds at the Notecard's full chunk size, and with
+the default adaptive UploadPolicy. For each, this reports the mean
+simulated time, effective throughput, retries, and bytes transferred
+including failed posts.
+
+    python benchmarks/upload_flaky_link.py [payload_bytes] [loss_per_kb]
+        [seeds]
+"""
+
+import os
+import random
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import upload  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+from notecard.retry import RetryRule  # noqa: E402
+
+LINK_BYTES_PER_SEC = 4096
+LINK_RTT_SECS = 1.5
+LINK_TIMEOUT_SECS = 30
+# The Notecard's binary buffer, which sets the largest chunk.
+CHUNK_SIZE = 65536
+
+POLICIES = {
+    'fixed': upload.UploadPolicy(
+        max_retries=1000, server=RetryRule(delay_secs=15),
+        timeout=RetryRule(delay_secs=15), min_chunk_size=CHUNK_SIZE,
+        grow_after=0),
+    'adaptive': upload.UploadPolicy(max_retries=1000),
+}
+
+
+class Clock:
+    """A simulated clock, advanced by the link and by upload's backoff."""
+
+    def __init__(self):
+        """Start the clock at 0."""
+        self.now = 0
+
+    def monotonic(self):
+        """Return the simulated time."""
+        return self.now
+
+    def sleep(self, secs):
+        """Advance the simulated time."""
+        self.now += secs
+
+
+def run(payload, loss_per_kb, policy, seed):
+    """Upload `payload`; return (simulated secs, upload's stats)."""
+    clock = Clock()
+    link = random.Random(seed)
+    emulator = NotecardEmulator()
+    web_post = emulator.handlers['web.post']
+
+    def lossy_web_post(req):
+        length = len(emulator._binary)
+        survives = (1 - loss_per_kb) ** (length / 1024)
+        if link.random() > survives:
+            clock.sleep(LINK_TIMEOUT_SECS)
+            return {'err': 'request timed out {timeout}'}
+        clock.sleep(LINK_RTT_SECS + length / LINK_BYTES_PER_SEC)
+        return web_post(req)
+
+    emulator.handlers['web.post'] = lossy_web_post
+    card = notecard.OpenSerial(EmulatedUART(emulator))
+    card.SetPacingProfile(PacingProfile(0, 0))
+
+    with patch('notecard.upload._monotonic', clock.monotonic), \
+            patch('notecard.upload.time.sleep', clock.sleep):
+        stats = upload.upload(card, payload, route='bench',
+                              max_chunk_size=CHUNK_SIZE, policy=policy)
+
+    assert b''.join(p['payload'] for p in emulator.web_posts) == payload
+    return clock.now, stats
+
+
+def main():
+    """Run each policy and print a table."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256 * 1024
+    loss_per_kb = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    seeds = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    payload = os.urandom(size)
+
+    print(f'{size} byte payload, {loss_per_kb:.1%} loss per KB, '
+          f'{LINK_BYTES_PER_SEC} B/s link, mean of {seeds} seeds')
+    print(f'{"policy":<10}{"secs":>10}{"B/s":>10}{"retries":>9}'
+          f'{"transferred":>13}')
+    for name, policy in POLICIES.items():
+        runs = [run(payload, loss_per_kb, policy, seed)
+                for seed in range(seeds)]
+        secs = sum(secs for secs, _ in runs) / seeds
+        retries = sum(stats['retries'] for _, stats in runs) / seeds
+        transferred = sum(stats['bytes_transferred']
+                          for _, stats in runs) / seeds
+        print(f'{name:<10}{secs:>10.0f}{size / secs:>10.0f}'
+              f'{retries:>9.1f}{transferred:>13.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark memory use of upload.upload for a large file.
+
+Writes a file (8 MB by default) and uploads it to notecard.emulator over an
+in-process UART, once after reading the whole file into memory, as callers
+had to before `upload` accepted files, and once by passing its path, so it's
+read a chunk at a time. Each mode runs in its own process so that peak RSS
+is measured independently.
+
+For each mode this reports the peak RSS of the process, the peak of Python
+allocations traced during the upload, and the time taken. The emulator drops
+each payload once it's been posted, so only the host's memory is measured.
+
+    python benchmarks/upload_memory.py [file_bytes]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import upload  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+
+def open_card():
+    """Open a card on an emulator that forgets payloads once posted."""
+    emulator = NotecardEmulator()
+    web_post = emulator.handlers['web.post']
+
+    def forgetful_web_post(req):
+        rsp = web_post(req)
+        emulator.web_posts.clear()
+        return rsp
+
+    emulator.handlers['web.post'] = forgetful_web_post
+    card = notecard.OpenSerial(EmulatedUART(emulator))
+    card.SetPacingProfile(PacingProfile(0, 0))
+    return card
+
+
+def run(mode, path):
+    """Upload the file at `path`; return (peak RSS KB, traced KB, secs)."""
+    card = open_card()
+
+    tracemalloc.start()
+    start = time.monotonic()
+    if mode == 'bytes':
+        with open(path, 'rb') as f:
+            data = f.read()
+    else:
+        data = path
+    upload.upload(card, data, route='bench')
+    elapsed = time.monotonic() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss, traced_peak // 1024, elapsed
+
+
+def main():
+    """Run each mode in a child process and print a comparison table."""
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        print(*run(sys.argv[2], sys.argv[3]))
+        return
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 8 * 1024 * 1024
+    with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+        f.write(os.urandom(size))
+    try:
+        print(f'{size} byte file')
+        print(f'{"mode":<6}{"peak RSS KB":>14}{"traced KB":>12}'
+              f'{"secs":>8}')
+        for mode in ('bytes', 'path'):
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', mode, f.name],
+                check=True, capture_output=True, text=True).stdout
+            rss, traced, secs = out.split()
+            print(f'{mode:<6}{rss:>14}{traced:>12}{float(secs):>8.1f}')
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
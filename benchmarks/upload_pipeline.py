@@ -0,0 +1,58 @@
+"""Benchmark upload.upload throughput with different pipeline depths.
+
+Uploads a payload (2 MB by default) to notecard.emulator over an in-process
+UART, with web.post taking `web_post_ms` to answer (200 ms by default) to
+stand in for the round trip to Notehub, and reports the throughput for each
+pipeline depth. At depth 0 every chunk is hashed and COBS-encoded just
+before it's staged; at higher depths that work is done on a worker thread
+while earlier chunks are on the wire or waiting on Notehub.
+
+    python benchmarks/upload_pipeline.py [payload_bytes] [web_post_ms]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import upload  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+DEPTHS = (0, 1, 2)
+
+
+def run(payload, web_post_ms, depth):
+    """Upload `payload`; return the throughput in bytes per second."""
+    emulator = NotecardEmulator(request_latency_ms={'web.post': web_post_ms})
+    card = notecard.OpenSerial(EmulatedUART(emulator))
+    card.SetPacingProfile(PacingProfile(0, 0))
+
+    start = time.monotonic()
+    upload.upload(card, payload, route='bench', pipeline_depth=depth)
+    elapsed = time.monotonic() - start
+
+    assert b''.join(p['payload'] for p in emulator.web_posts) == payload
+    return len(payload) / elapsed
+
+
+def main():
+    """Run each depth and print a table."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2 * 1024 * 1024
+    web_post_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    payload = os.urandom(size)
+
+    print(f'{size} byte payload, {web_post_ms:.0f} ms web.post')
+    print(f'{"depth":<8}{"KB/s":>10}{"speedup":>10}')
+    baseline = None
+    for depth in DEPTHS:
+        bps = run(payload, web_post_ms, depth)
+        baseline = baseline or bps
+        print(f'{depth:<8}{bps / 1024:>10.1f}{bps / baseline:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
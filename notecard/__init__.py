@@ -1,3 +1,10 @@
 """__init__ Module for note-python."""
 
 from .notecard import *
+
+
+def __getattr__(name):
+    """Forward lazily imported names, like SerialLockTimeout, to notecard."""
+    from . import notecard
+
+    return getattr(notecard, name)
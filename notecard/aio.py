@@ -0,0 +1,355 @@
+"""asyncio support for note-python."""
+
+##
+# @file aio.py
+#
+# @brief asyncio variants of the Notecard classes.
+#
+# @section description Description
+# AsyncOpenSerial and AsyncOpenI2C speak the same protocol as OpenSerial and
+# OpenI2C, and reuse their request preparation, CRC checking, response
+# handling and reset logic. They also run the same retry, receive and
+# transmit loops, which yield each pause as a step, but `Transaction` is a
+# coroutine that awaits those steps, so the event loop is never blocked. This
+# module is CPython-only.
+#
+# The fluent API helpers (notecard.card, notecard.note, notecard.hub,
+# notecard.web, ...) return whatever `card.Transaction` returns, so with an
+# async Notecard they return awaitables:
+#
+#     rsp = await note.add(card, file='data.qo', body={'temp': 21.5})
+
+import asyncio
+
+from notecard import download as _download
+from notecard import upload as _upload
+from notecard.notecard import (
+    Notecard,
+    OpenSerial,
+    OpenI2C,
+    NoOpSerialLock,
+    CARD_INTER_TRANSACTION_TIMEOUT_SEC,
+    CARD_INTRA_TRANSACTION_TIMEOUT_SEC,
+    _STEP_SLEEP,
+    _STEP_WAIT_READABLE,
+    _STEP_TRANSMIT,
+    _STEP_RECEIVE,
+    _STEP_TRANSACT,
+)
+from notecard.observer import TransactionRecord, NULL_ATTEMPT, NULL_RECORD
+from notecard.timeout import remaining_secs
+from notecard.transaction_manager import NoOpTransactionManager
+
+
+class AsyncNotecard(Notecard):
+    """Base class for asyncio Notecards.
+
+    Transports are serialized within the process with an `asyncio.Lock`,
+    `transaction_lock`, and across processes with the transport's own lock
+    (the serial FileLock), which is taken in a worker thread so the event
+    loop isn't blocked. Callers that need to hold the transport across
+    several operations (e.g. a card.binary.put followed by the binary data)
+    should hold it with `acquire` and `release` and pass `lock=False` to
+    `Transaction`.
+    """
+
+    _reset_on_init = False
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the Notecard. The reset is deferred to first use."""
+        super().__init__(*args, **kwargs)
+        self.transaction_lock = asyncio.Lock()
+
+    async def Reset(self):
+        """Reset the Notecard.
+
+        Runs the transport's synchronous reset sequence in a worker thread.
+        """
+        await asyncio.to_thread(super().Reset)
+
+    async def acquire(self):
+        """Take `transaction_lock`, then the transport's lock."""
+        await self.transaction_lock.acquire()
+        try:
+            await self._lock_transport()
+        except BaseException:
+            self.transaction_lock.release()
+            raise
+
+    def release(self):
+        """Release the locks taken by `acquire`."""
+        try:
+            self._unlock_transport()
+        finally:
+            self.transaction_lock.release()
+
+    async def _lock_transport(self):
+        pass
+
+    def _unlock_transport(self):
+        pass
+
+    async def _start_transaction_manager(self):
+        if not isinstance(self._transaction_manager, NoOpTransactionManager):
+            await asyncio.to_thread(self._transaction_manager.start,
+                                    CARD_INTER_TRANSACTION_TIMEOUT_SEC)
+
+    async def Transaction(self, req, lock=True, retry_policy=None):
+        """Send a request to the Notecard and read back a response.
+
+        See `Notecard.Transaction`. `transaction_lock` is held for the
+        duration of the request and response if `lock` is True.
+        """
+        record = TransactionRecord(req) if self._observers else NULL_RECORD
+        rsp_json = None
+        timeout_secs = self._transaction_timeout_seconds(req)
+        req_bytes, rsp_expected = self._prepare_request(req)
+        record.mark('encoded')
+
+        try:
+            if lock:
+                record.mark('lock_start')
+                await self.acquire()
+                record.mark('lock_end')
+
+            try:
+                if self._reset_required:
+                    record.mark('reset_start')
+                    await self.Reset()
+                    record.mark('reset_end')
+
+                record.mark('tm_start')
+                await self._start_transaction_manager()
+                record.mark('tm_end')
+
+                rsp_json = await self._run_steps_async(
+                    self._transaction_steps(req, req_bytes, rsp_expected,
+                                            timeout_secs, record,
+                                            retry_policy))
+
+            finally:
+                self._attempt = NULL_ATTEMPT
+                if lock:
+                    self.release()
+
+                self._transaction_manager.stop()
+        except Exception as e:
+            if record is not NULL_RECORD:
+                record.error = str(e)
+            raise
+        finally:
+            if record is not NULL_RECORD:
+                record.mark('end')
+                self._notify_observers(record)
+
+        if self._debug and rsp_json is not None:
+            print(rsp_json)
+
+        return rsp_json
+
+    async def Command(self, req):
+        """Send a command to the Notecard. See `Notecard.Command`."""
+        if 'cmd' not in req:
+            raise Exception("Please use 'cmd' instead of 'req'")
+
+        await self.Transaction(req)
+
+    async def _run_steps_async(self, steps):
+        """Run a step generator to completion and return what it returns.
+
+        The asyncio counterpart of `Notecard._run_steps`: each step is
+        awaited, so the loops behind Transaction, `_transact`, `receive` and
+        `transmit` are shared with the synchronous Notecards.
+        """
+        result = None
+        error = None
+        while True:
+            try:
+                if error is None:
+                    step = steps.send(result)
+                else:
+                    step = steps.throw(error)
+            except StopIteration as e:
+                return e.value
+
+            result = None
+            error = None
+            try:
+                kind = step[0]
+                if kind == _STEP_SLEEP:
+                    await asyncio.sleep(step[1])
+                elif kind == _STEP_WAIT_READABLE:
+                    await self._wait_readable_async(step[1], step[2],
+                                                    step[3])
+                elif kind == _STEP_TRANSMIT:
+                    await self.transmit(step[1])
+                elif kind == _STEP_RECEIVE:
+                    result = await self.receive()
+                elif kind == _STEP_TRANSACT:
+                    result = await self._transact(
+                        step[1], rsp_expected=step[2], timeout_secs=step[3])
+                else:
+                    await self.Reset()
+            except Exception as e:
+                error = e
+
+    async def _transact(self, req_bytes, rsp_expected,
+                        timeout_secs=CARD_INTER_TRANSACTION_TIMEOUT_SEC):
+        return await self._run_steps_async(
+            self._transact_steps(req_bytes, rsp_expected, timeout_secs))
+
+    async def receive(self, timeout_secs=CARD_INTRA_TRANSACTION_TIMEOUT_SEC,
+                      delay=True):
+        """Read a newline-terminated batch of data from the Notecard."""
+        return await self._run_steps_async(
+            self._receive_steps(timeout_secs, delay))
+
+    async def transmit(self, data, delay=True):
+        """Send `data` to the Notecard."""
+        await self._run_steps_async(self._transmit_steps(data, delay))
+
+
+class AsyncOpenSerial(AsyncNotecard, OpenSerial):
+    """asyncio Notecard class for Serial communication."""
+
+    _serial_lock_thread_local = False
+
+    def __init__(self, uart_id, debug=False, lock_path=None):
+        """Initialize the Notecard. The reset is deferred to first use.
+
+        See `OpenSerial` for `lock_path`.
+        """
+        super().__init__(uart_id, debug, lock_path)
+
+    async def _lock_transport(self):
+        # The FileLock blocks while another process holds the port.
+        if not isinstance(self.lock_handle, NoOpSerialLock):
+            await asyncio.to_thread(self.lock)
+
+    def _unlock_transport(self):
+        self.unlock()
+
+    async def _wait_readable_async(self, start, timeout_secs, idle_secs):
+        """Wait for the UART to become readable or the timeout to expire.
+
+        Waits on the event loop for the serial port's file descriptor where
+        possible, otherwise sleeps for `idle_secs`, like `_wait_for_data`.
+        """
+        if self._fd is None:
+            await asyncio.sleep(idle_secs)
+            return
+
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+
+        def _on_readable():
+            if not readable.done():
+                readable.set_result(None)
+
+        try:
+            loop.add_reader(self._fd, _on_readable)
+        except NotImplementedError:
+            # e.g. the Windows proactor event loop.
+            await asyncio.sleep(idle_secs)
+            return
+
+        try:
+            if timeout_secs == 0:
+                await readable
+            else:
+                remaining = max(remaining_secs(start, timeout_secs), 0)
+                await asyncio.wait_for(readable, remaining)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(self._fd)
+
+
+class AsyncOpenI2C(AsyncNotecard, OpenI2C):
+    """asyncio Notecard class for I2C communication."""
+
+    def __init__(self, i2c, address, max_transfer, debug=False):
+        """Initialize the Notecard. The reset is deferred to first use."""
+        super().__init__(i2c, address, max_transfer, debug)
+        # transaction_lock serializes access instead.
+        self.lock_fn = self._i2c_no_op_try_lock
+        self.unlock_fn = self._i2c_no_op_unlock
+
+
+class _BlockingCard:
+    """A synchronous view of an AsyncNotecard, for use from a worker thread.
+
+    Each call is scheduled on the event loop that owns the card, and the
+    calling thread waits for the result. This lets synchronous helpers such as
+    `upload.upload` drive an async Notecard without blocking the loop.
+    """
+
+    def __init__(self, card, loop):
+        self._card = card
+        self._loop = loop
+
+    def __getattr__(self, name):
+        return getattr(self._card, name)
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def Transaction(self, req, lock=True, retry_policy=None):
+        return self._run(self._card.Transaction(req, lock=lock,
+                                                retry_policy=retry_policy))
+
+    def lock(self):
+        self._run(self._card.acquire())
+
+    def unlock(self):
+        async def _release():
+            self._card.release()
+
+        self._run(_release())
+
+    def transmit(self, data, delay=True):
+        self._run(self._card.transmit(data, delay=delay))
+
+    def receive(self, timeout_secs=CARD_INTRA_TRANSACTION_TIMEOUT_SEC,
+                delay=True):
+        return self._run(self._card.receive(timeout_secs, delay))
+
+
+async def upload(card, data, route, progress_cb=None, **kwargs):
+    """Upload binary data to a Notehub proxy route via an async Notecard.
+
+    Takes the same arguments and returns the same statistics as
+    `notecard.upload.upload`. The chunking and retry logic runs in a worker
+    thread while all Notecard I/O happens on the event loop. `progress_cb`
+    is called on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    def threaded_progress_cb(info):
+        loop.call_soon_threadsafe(progress_cb, info)
+
+    if progress_cb is not None:
+        kwargs['progress_cb'] = threaded_progress_cb
+
+    return await asyncio.to_thread(_upload.upload, _BlockingCard(card, loop),
+                                   data, route, **kwargs)
+
+
+async def download(card, route, dest, progress_cb=None, **kwargs):
+    """Download binary data from a Notehub proxy route via an async Notecard.
+
+    Takes the same arguments and returns the same statistics as
+    `notecard.download.download`, and runs it the way `upload` runs
+    `notecard.upload.upload`. Writes to `dest` happen in the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+
+    def threaded_progress_cb(info):
+        loop.call_soon_threadsafe(progress_cb, info)
+
+    if progress_cb is not None:
+        kwargs['progress_cb'] = threaded_progress_cb
+
+    return await asyncio.to_thread(_download.download,
+                                   _BlockingCard(card, loop), route, dest,
+                                   **kwargs)
@@ -13,7 +13,13 @@ if sys.implementation.name == 'cpython':
         """Create an MD5 digest of the given data."""
         return hashlib.md5(data).hexdigest()
 else:
-    from .md5 import digest as _md5_hash
+    def _md5_hash(data):
+        """Create an MD5 digest of the given data.
+
+        The pure-Python MD5 is only loaded the first time it's needed.
+        """
+        from .md5 import digest
+        return digest(data)
 
 
 def binary_store_decoded_length(card: Notecard):
@@ -36,10 +42,11 @@ def binary_store_reset(card: Notecard):
 
 
 def binary_store_transmit(card: Notecard, data: bytearray, offset: int):
-    """Write bytes to index `offset` of the binary data store."""
-    # Make a copy of the data to transmit. We do not modify the user's passed in
-    # `data` object.
-    tx_data = bytearray(data)
+    """Write bytes to index `offset` of the binary data store.
+
+    `data` may be any bytes-like object. It is read in place and never
+    modified.
+    """
     rsp = card.Transaction({'req': 'card.binary'})
 
     # Ignore `{bad-bin}` errors, because we intend to overwrite the data.
@@ -56,15 +63,15 @@ def binary_store_transmit(card: Notecard, data: bytearray, offset: int):
 
     max_len = rsp['max']
     remaining = max_len - curr_len if offset > 0 else max_len
-    if len(tx_data) > remaining:
+    if len(data) > remaining:
         raise Exception(('Data to transmit won\'t fit in the Notecard\'s binary'
                          ' store.'))
 
-    encoded = cobs_encode(tx_data, ord('\n'))
+    encoded = cobs_encode(data, ord('\n'))
     req = {
         'req': 'card.binary.put',
         'cobs': len(encoded),
-        'status': _md5_hash(tx_data)
+        'status': _md5_hash(data)
     }
     encoded.append(ord('\n'))
     if offset > 0:
@@ -0,0 +1,469 @@
+"""Record and replay the bytes exchanged with a Notecard."""
+
+##
+# @file capture.py
+#
+# @brief Record the wire traffic of a Notecard session and replay it.
+#
+# @section description Description
+# RecordingUART and RecordingI2C wrap the port or bus handed to OpenSerial or
+# OpenI2C and write every read and write, with a timestamp, to a capture file
+# as it happens. Everything `_transact`, `transmit`, `receive` and `Reset`
+# exchange with the Notecard goes through them, including the COBS-encoded
+# binary phases of card.binary and web.post transfers. Captures are streamed
+# to disk, so sessions of any length can be recorded.
+#
+# ReplayUART and ReplayI2C play a capture back as a fake transport, so field
+# problems can be reproduced, and changes to the transaction, retry and CRC
+# handling measured, without hardware. The Notecard's side of the capture is
+# handed out as the host sends its side: bytes the Notecard sent after the
+# host had written N bytes only become readable once N bytes have been
+# written again, and, when replaying with timing, only after the same delay.
+# What the host writes is otherwise ignored, so a replay can diverge from the
+# capture if the code under test sends something different.
+#
+# This module is CPython-only.
+#
+# Example:
+#     with RecordingUART(serial.Serial('/dev/ttyACM0', 9600),
+#                        'session.ncap') as port:
+#         card = notecard.OpenSerial(port)
+#         card.Transaction({'req': 'card.version'})
+#
+#     card = notecard.OpenSerial(ReplayUART('session.ncap'))
+#     card.Transaction({'req': 'card.version'})
+
+import struct
+from collections import namedtuple
+
+from notecard.timeout import start_timeout, elapsed_secs
+
+CAPTURE_MAGIC = b'NCAP\x01'
+# The transport a capture was made on, written after CAPTURE_MAGIC.
+CAPTURE_SERIAL = b'S'
+CAPTURE_I2C = b'I'
+
+# Event kinds: bytes written to and read from the Notecard.
+CAPTURE_TX = 0
+CAPTURE_RX = 1
+
+# Each event is its kind, the microseconds since the previous event and the
+# number of bytes that follow.
+_EVENT = struct.Struct('<BII')
+_MAX_DELTA_US = 0xFFFFFFFF
+# Marks the end of what the Notecard had ready when a read was made, in the
+# events replayed by ReplayI2C.
+_RX_BOUNDARY = -1
+
+CaptureEvent = namedtuple('CaptureEvent', ['kind', 'time', 'data'])
+CaptureEvent.__doc__ = """An event in a capture.
+
+Attributes:
+    kind (int): CAPTURE_TX or CAPTURE_RX.
+    time (float): Seconds since the capture started.
+    data (bytes): The bytes written or read.
+"""
+
+
+class CaptureWriter:
+    """Streams events to a capture file."""
+
+    def __init__(self, file, transport):
+        """Start a capture.
+
+        Args:
+            file: A path, or a binary file object open for writing.
+            transport (bytes): CAPTURE_SERIAL or CAPTURE_I2C.
+        """
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            self._file = open(file, 'wb')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+
+        self._file.write(CAPTURE_MAGIC + transport)
+        self._start = start_timeout()
+        self._last_us = 0
+        self.events = 0
+
+    def write(self, kind, data):
+        """Append an event with the bytes in `data`."""
+        if not data:
+            return
+
+        now_us = int(elapsed_secs(self._start) * 1000000)
+        delta_us = min(now_us - self._last_us, _MAX_DELTA_US)
+        self._last_us = now_us
+        self._file.write(_EVENT.pack(kind, delta_us, len(data)))
+        self._file.write(data)
+        self.events += 1
+
+    def flush(self):
+        """Flush buffered events to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Flush the capture, and close its file if it was opened here."""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def read_capture(file):
+    """Yield the transport, then each CaptureEvent, of a capture.
+
+    Events are read from the file one at a time.
+
+    Args:
+        file: A path, or a binary file object open for reading.
+
+    Raises:
+        Exception: If the file isn't a capture, or is truncated.
+    """
+    if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+        with open(file, 'rb') as f:
+            yield from read_capture(f)
+        return
+
+    header = file.read(len(CAPTURE_MAGIC) + 1)
+    if header[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+        raise Exception('Not a Notecard capture file.')
+    yield header[len(CAPTURE_MAGIC):]
+
+    time_us = 0
+    while True:
+        fields = file.read(_EVENT.size)
+        if not fields:
+            return
+        if len(fields) < _EVENT.size:
+            raise Exception('Truncated Notecard capture file.')
+
+        kind, delta_us, length = _EVENT.unpack(fields)
+        data = file.read(length)
+        if len(data) < length:
+            raise Exception('Truncated Notecard capture file.')
+
+        time_us += delta_us
+        yield CaptureEvent(kind, time_us / 1000000, data)
+
+
+class _Recording:
+    """Base for the recording wrappers."""
+
+    transport = None
+
+    def __init__(self, port, file):
+        self._port = port
+        self.capture = CaptureWriter(file, self.transport)
+
+    def __getattr__(self, name):
+        # Anything not recorded, e.g. fileno or baudrate, is the port's.
+        return getattr(self._port, name)
+
+    def __enter__(self):
+        """Return the wrapper for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the wrapper."""
+        self.close()
+
+    def close(self):
+        """Finish the capture and close the port."""
+        self.capture.close()
+        if hasattr(self._port, 'close'):
+            self._port.close()
+
+
+class RecordingUART(_Recording):
+    """A pyserial-like port that records what's written to and read from it.
+
+    Pass it to OpenSerial in place of the port it wraps.
+    """
+
+    transport = CAPTURE_SERIAL
+
+    def __init__(self, uart, file):
+        """Record the traffic on `uart` to `file`, a path or file object."""
+        super().__init__(uart, file)
+
+    @property
+    def in_waiting(self):
+        """Return the number of bytes ready to read."""
+        return self._port.in_waiting
+
+    def read(self, size=1):
+        """Read up to `size` bytes from the port."""
+        data = self._port.read(size)
+        self.capture.write(CAPTURE_RX, data)
+        return data
+
+    def write(self, data):
+        """Write `data` to the port."""
+        written = self._port.write(data)
+        self.capture.write(CAPTURE_TX, bytes(data))
+        return written
+
+
+class RecordingI2C(_Recording):
+    """An I2C bus that records the transfers made on it.
+
+    Wraps a periphery.I2C, or a MicroPython or CircuitPython I2C object, and
+    can be passed to OpenI2C in its place.
+    """
+
+    transport = CAPTURE_I2C
+
+    def __init__(self, i2c, file):
+        """Record the transfers on `i2c` to `file`, a path or file object."""
+        super().__init__(i2c, file)
+
+    def transfer(self, address, messages):
+        """Run periphery.I2C.Message transfers on the bus."""
+        self._port.transfer(address, messages)
+        for message in messages:
+            kind = CAPTURE_RX if message.read else CAPTURE_TX
+            self.capture.write(kind, bytes(message.data))
+
+    def writeto(self, address, buf, *args, **kwargs):
+        """Write `buf` to the device at `address`."""
+        self._port.writeto(address, buf, *args, **kwargs)
+        self.capture.write(CAPTURE_TX, bytes(buf))
+
+    def readfrom_into(self, address, buf, *args, **kwargs):
+        """Read from the device at `address` into `buf`."""
+        self._port.readfrom_into(address, buf, *args, **kwargs)
+        self.capture.write(CAPTURE_RX, bytes(buf))
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *args,
+                              **kwargs):
+        """Write `buffer_out`, then read into `buffer_in`."""
+        self._port.writeto_then_readfrom(address, buffer_out, buffer_in,
+                                         *args, **kwargs)
+        self.capture.write(CAPTURE_TX, bytes(buffer_out))
+        self.capture.write(CAPTURE_RX, bytes(buffer_in))
+
+
+class _ReplayStream:
+    """The Notecard's side of a capture, released as the host writes."""
+
+    def __init__(self, events, transport, timed):
+        # `events` yields the capture's transport, then its events.
+        self._events = events
+        if next(self._events) != transport:
+            self._events.close()
+            raise Exception('The capture was made on a different transport.')
+
+        self._timed = timed
+        self._next = None
+        self._rx = bytearray()
+        # Bytes the host has written, and bytes of the capture's host side
+        # accounted for by them.
+        self._written = 0
+        self._tx_replayed = 0
+        # When the latest host write covered in the capture was made, in the
+        # capture and in this replay.
+        self._anchor_capture = 0.0
+        self._anchor_replay = start_timeout()
+        # Offsets into _rx that a read can't run past until the host has seen
+        # them, like the ends of responses over I2C.
+        self._boundaries = []
+
+    def written(self, length):
+        """Account for `length` bytes written by the host."""
+        self._written += length
+        self._advance()
+
+    def available(self):
+        """Return the number of bytes the host can read now."""
+        self._advance()
+        if self._boundaries:
+            return self._boundaries[0]
+        return len(self._rx)
+
+    def read(self, size):
+        """Read up to `size` of the bytes available now."""
+        size = min(size, self.available())
+        data = bytes(self._rx[:size])
+        del self._rx[:size]
+        self._boundaries = [b - size for b in self._boundaries]
+        return data
+
+    def release(self):
+        """Let reads run past a boundary the host has reached."""
+        if self._boundaries and self._boundaries[0] == 0:
+            del self._boundaries[0]
+
+    def close(self):
+        """Close the capture."""
+        self._events.close()
+
+    def _advance(self):
+        while True:
+            if self._next is None:
+                self._next = next(self._events, None)
+                if self._next is None:
+                    return
+
+            kind, capture_time, data = self._next
+            if kind == CAPTURE_TX:
+                if self._written < self._tx_replayed + len(data):
+                    return
+                self._tx_replayed += len(data)
+                self._anchor_capture = capture_time
+                self._anchor_replay = start_timeout()
+            elif kind == _RX_BOUNDARY:
+                if len(self._rx) not in self._boundaries[-1:]:
+                    self._boundaries.append(len(self._rx))
+            else:
+                if (self._timed
+                        and elapsed_secs(self._anchor_replay)
+                        < capture_time - self._anchor_capture):
+                    return
+                self._rx.extend(data)
+
+            self._next = None
+
+
+class ReplayUART:
+    """A pyserial-like port that replays a capture made with RecordingUART.
+
+    Pass it to OpenSerial in place of a serial.Serial.
+    """
+
+    def __init__(self, file, timed=True):
+        """Replay the capture in `file`, a path or file object.
+
+        Args:
+            file: The capture to replay.
+            timed (bool): Hold back the Notecard's bytes for as long as they
+                took to arrive in the capture. If False, they're readable as
+                soon as the host has written what preceded them.
+        """
+        self._stream = _ReplayStream(read_capture(file), CAPTURE_SERIAL,
+                                     timed)
+
+    @property
+    def in_waiting(self):
+        """Return the number of bytes ready to read."""
+        return self._stream.available()
+
+    def read(self, size=1):
+        """Read up to `size` bytes."""
+        return self._stream.read(size)
+
+    def write(self, data):
+        """Accept `data` from the host."""
+        self._stream.written(len(data))
+        return len(data)
+
+    def close(self):
+        """Close the capture."""
+        self._stream.close()
+
+
+class ReplayI2C:
+    """An I2C bus that replays a capture made with RecordingI2C.
+
+    Serial-over-I2C framing is stripped from the capture and regenerated for
+    the reads made during the replay, so the host doesn't need to poll the
+    way it did when the capture was made. Implements the same interfaces as
+    notecard.emulator.EmulatedI2C and can be passed to OpenI2C in place of a
+    bus.
+    """
+
+    def __init__(self, file, timed=True):
+        """Replay the capture in `file`, a path or file object.
+
+        See ReplayUART for `timed`.
+        """
+        self._stream = _ReplayStream(_i2c_payloads(file), CAPTURE_I2C, timed)
+        self._read_len = 0
+        self._locked = False
+
+    def transfer(self, address, messages):
+        """Replay periphery.I2C.Message transfers."""
+        for message in messages:
+            if message.read:
+                buf = bytearray(len(message.data))
+                self._fill_read(buf)
+                message.data = buf
+            else:
+                self._handle_write(message.data)
+
+    def writeto(self, address, buf, stop=True):
+        """Accept `buf` from the host."""
+        self._handle_write(buf)
+
+    def readfrom_into(self, address, buf):
+        """Read the response to the last read request into `buf`."""
+        self._fill_read(buf)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in):
+        """Accept `buffer_out`, then read into `buffer_in`."""
+        self._handle_write(buffer_out)
+        self._fill_read(buffer_in)
+
+    def try_lock(self):
+        """Take the bus lock."""
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        """Release the bus lock."""
+        self._locked = False
+
+    def close(self):
+        """Close the capture."""
+        self._stream.close()
+
+    def _handle_write(self, data):
+        if len(data) == 0:
+            return
+        if data[0] == 0:
+            self._read_len = data[1] if len(data) > 1 else 0
+        else:
+            self._stream.written(len(data) - 1)
+
+    def _fill_read(self, buf):
+        data = self._stream.read(min(self._read_len, len(buf) - 2))
+        self._read_len = 0
+        remaining = self._stream.available()
+        if remaining == 0:
+            # As with a Notecard, anything held back behind what the host has
+            # now read is sent on its next read.
+            self._stream.release()
+        buf[0] = min(remaining, 255)
+        buf[1] = len(data)
+        buf[2:2 + len(data)] = data
+
+
+def _i2c_payloads(file):
+    """Yield the events of an I2C capture with their framing removed."""
+    events = read_capture(file)
+    try:
+        yield next(events)
+        for kind, capture_time, data in events:
+            if kind == CAPTURE_TX:
+                # Read requests are a 0 followed by the number of bytes wanted.
+                if data[0] == 0:
+                    continue
+                data = data[1:]
+            elif len(data) >= 2:
+                # Reads start with the bytes still available and the number
+                # of bytes in this read.
+                if data[1]:
+                    yield CaptureEvent(kind, capture_time,
+                                       data[2:2 + data[1]])
+                if data[0] == 0:
+                    yield CaptureEvent(_RX_BOUNDARY, capture_time, b'')
+                continue
+
+            if data:
+                yield CaptureEvent(kind, capture_time, data)
+    finally:
+        events.close()
@@ -0,0 +1,105 @@
+"""JSON codecs for encoding requests and decoding responses."""
+
+##
+# @file codec.py
+#
+# @brief JSON codecs for encoding requests and decoding responses.
+#
+# @section description Description
+# A Notecard encodes requests and decodes responses with a codec. The default
+# codec is the standard json module. On CPython, orjson or ujson is used
+# instead when one is installed, because both are much faster on large
+# responses.
+#
+# The CRC of a response is checked on its raw bytes before decoding (see
+# Notecard._crc_error), and the CRC of a request is computed over the string
+# the codec produces. So a codec only has to produce compact JSON.
+
+import json
+import sys
+
+
+class JsonCodec:
+    """Encode and decode JSON with the standard json module."""
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """Encode `obj` as a compact JSON string."""
+        return json.dumps(obj, separators=(',', ':'))
+
+    def loads(self, data):
+        """Decode JSON from `data` (str or a bytes-like object)."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Encode and decode JSON with orjson."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        """Import orjson, raising ImportError if it isn't installed."""
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj):
+        """Encode `obj` as a compact JSON string."""
+        try:
+            return self._orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            # orjson rejects some objects the json module accepts, such as
+            # integers wider than 64 bits and non-string keys.
+            return super().dumps(obj)
+
+    def loads(self, data):
+        """Decode JSON from `data` (str or a bytes-like object)."""
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """Encode and decode JSON with ujson."""
+
+    name = 'ujson'
+
+    def __init__(self):
+        """Import ujson, raising ImportError if it isn't installed."""
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj):
+        """Encode `obj` as a compact JSON string."""
+        return self._ujson.dumps(obj, escape_forward_slashes=False)
+
+    def loads(self, data):
+        """Decode JSON from `data` (str or a bytes-like object)."""
+        if not isinstance(data, (str, bytes)):
+            data = bytes(data)
+        return self._ujson.loads(data)
+
+
+CODECS = {
+    'json': JsonCodec,
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+}
+
+
+def get_codec(name):
+    """Return a new instance of the codec called `name`."""
+    if name not in CODECS:
+        raise ValueError(f'Unknown JSON codec: {name}.')
+
+    return CODECS[name]()
+
+
+def default_codec():
+    """Return the fastest codec available on this platform."""
+    if sys.implementation.name == 'cpython':
+        for codec in (OrjsonCodec, UjsonCodec):
+            try:
+                return codec()
+            except ImportError:
+                pass
+
+    return JsonCodec()
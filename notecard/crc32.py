@@ -1,5 +1,8 @@
 """Module for computing the CRC32 of arbitrary data."""
 
+import sys
+from array import array
+
 crc32_lookup_table = [
     0x00000000, 0x1DB71064, 0x3B6E20C8, 0x26D930AC, 0x76DC4190, 0x6B6B51F4,
     0x4DB26158, 0x5005713C, 0xEDB88320, 0xF00F9344, 0xD6D6A3E8, 0xCB61B38C,
@@ -19,7 +22,7 @@ def _logical_rshift(val, shift_amount, num_bits=32):
     return unsigned_val >> shift_amount
 
 
-def crc32(data):
+def _crc32_half_byte(data):
     """Compute CRC32 of the given data.
 
     Small lookup-table half-byte CRC32 algorithm based on:
@@ -31,3 +34,62 @@ def crc32(data):
         crc = crc32_lookup_table[(crc ^ _logical_rshift(data[idx], 4)) & 0x0F] ^ _logical_rshift(crc, 4)
 
     return ~crc & 0xffffffff
+
+
+def _make_byte_tables():
+    """Build the 256-entry tables for the reflected CRC32 polynomial.
+
+    Each entry is split into its low and high 16 bits, in two arrays, so the
+    tables take 1 KB and the table loop only handles small ints, which
+    MicroPython doesn't allocate on the heap.
+    """
+    low = array('H', bytes(512))
+    high = array('H', bytes(512))
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xEDB88320 if crc & 1 else crc >> 1
+        low[byte] = crc & 0xFFFF
+        high[byte] = crc >> 16
+
+    return low, high
+
+
+# The tables for _crc32_byte_table, which are only built when first used.
+_byte_tables = None
+
+
+def _crc32_byte_table(data):
+    """Compute CRC32 of the given data.
+
+    Standard byte-at-a-time lookup-table algorithm, with the running CRC
+    kept as its low and high 16 bits.
+    """
+    global _byte_tables
+    if _byte_tables is None:
+        _byte_tables = _make_byte_tables()
+    low_table, high_table = _byte_tables
+
+    low = high = 0xFFFF
+    for byte in data:
+        idx = (low ^ byte) & 0xFF
+        low = low_table[idx] ^ ((low >> 8) | ((high & 0xFF) << 8))
+        high = high_table[idx] ^ (high >> 8)
+
+    return ((high << 16) | low) ^ 0xFFFFFFFF
+
+
+def _crc32_zlib(data):
+    """Compute CRC32 of the given data with zlib."""
+    return zlib.crc32(data) & 0xffffffff
+
+
+# Select the fastest backend available on this platform. All backends give
+# identical results.
+if sys.implementation.name == 'cpython':
+    import zlib
+    crc32 = _crc32_zlib
+    CRC32_BACKEND = 'zlib'
+else:
+    crc32 = _crc32_byte_table
+    CRC32_BACKEND = 'table'
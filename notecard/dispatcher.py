@@ -0,0 +1,138 @@
+"""Background transaction dispatcher for note-python."""
+
+##
+# @file dispatcher.py
+#
+# @brief Run Notecard transactions on a dedicated worker thread.
+#
+# @section description Description
+# A TransactionDispatcher owns a Notecard's transport on one worker thread.
+# Other threads hand it requests with `submit` and get a
+# `concurrent.futures.Future` back, so they never block on the transport
+# lock or on request pacing. This module is CPython-only.
+
+import queue
+import threading
+from concurrent.futures import Future
+
+# The maximum number of queued requests handled under one lock acquisition.
+DISPATCHER_MAX_BURST = 16
+
+_STOP = object()
+
+
+class TransactionDispatcher:
+    """Run a Notecard's transactions on a dedicated worker thread.
+
+    Requests queued while the worker is busy are handled together as a
+    burst: the Notecard's lock is taken and its transaction manager started
+    once for the whole burst rather than once per request.
+
+    Example:
+        with TransactionDispatcher(card) as dispatcher:
+            future = dispatcher.submit({'req': 'note.add', 'body': {...}})
+            ...
+            rsp = future.result()
+    """
+
+    def __init__(self, card, max_burst=DISPATCHER_MAX_BURST):
+        """Start the worker thread for `card`."""
+        if max_burst < 1:
+            raise ValueError('max_burst must be at least 1.')
+
+        self._card = card
+        self._max_burst = max_burst
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run,
+                                        name='notecard-dispatcher',
+                                        daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        """Return the dispatcher for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the dispatcher, waiting for queued requests to finish."""
+        self.close()
+
+    def submit(self, req):
+        """Queue `req` and return a Future for its response.
+
+        The Future's result is what `Notecard.Transaction` returns, or the
+        exception it raised.
+        """
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise Exception('Dispatcher is closed.')
+            self._queue.put((req, future))
+
+        return future
+
+    def close(self, wait=True):
+        """Stop accepting requests and stop the worker thread.
+
+        Requests already queued are still sent. If `wait` is True, block until
+        they have been.
+        """
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            burst = [item]
+            while len(burst) < self._max_burst:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+                burst.append(item)
+
+            self._run_burst(burst)
+
+    def _run_burst(self, burst):
+        # Skip requests whose futures were cancelled while queued.
+        burst = [(req, future) for req, future in burst
+                 if future.set_running_or_notify_cancel()]
+        if not burst:
+            return
+
+        card = self._card
+        try:
+            card._begin_burst()
+        except Exception as e:
+            for _, future in burst:
+                future.set_exception(e)
+            return
+
+        try:
+            for req, future in burst:
+                try:
+                    future.set_result(card.Transaction(req, lock=False))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            # Keep the worker alive if releasing the transport fails; the
+            # next burst will surface the problem to its callers.
+            try:
+                card._end_burst()
+            except Exception as e:
+                if card._debug:
+                    print(e)
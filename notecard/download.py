@@ -0,0 +1,268 @@
+"""Large binary file download from Notehub via the Notecard."""
+
+##
+# @file download.py
+#
+# @brief Download a file from a Notehub proxy route a range at a time.
+#
+# @section description Description
+# `download` is the counterpart of `notecard.upload.upload`. Each range of
+# the file is fetched into the Notecard's binary buffer with a binary web.get,
+# read back with card.binary.get, checked against its MD5 and written
+# straight to a file or buffer, so the host never holds more than one range.
+# Failed web.gets are retried, and the range size adapted to the link, by an
+# UploadPolicy, as they are for upload.
+
+import os
+import time
+
+from notecard.binary_helpers import (
+    binary_store_decoded_length,
+    binary_store_receive,
+    binary_store_reset,
+)
+from notecard.upload import (
+    UploadPolicy,
+    _is_buffer,
+    _is_path,
+    _try_web_request,
+)
+
+# Attempts at reading a range from the binary buffer, which fail if its MD5
+# doesn't match, before giving up.
+BINARY_RECEIVE_RETRIES = 5
+
+try:
+    _monotonic = time.monotonic
+except AttributeError:
+    _monotonic = time.time
+
+
+class _BufferWriter:
+    """Writes to a buffer from `offset` on, like a file opened at `offset`."""
+
+    def __init__(self, buf, offset):
+        self._view = memoryview(buf)
+        self._position = offset
+
+    def write(self, data):
+        end = self._position + len(data)
+        if end > len(self._view):
+            raise Exception(
+                f'Download data is longer than the {len(self._view)} byte '
+                'buffer.')
+        self._view[self._position:end] = data
+        self._position = end
+
+
+def _receive_binary_chunk(card, length):
+    """Read `length` bytes from the start of the binary buffer.
+
+    The data is checked against the MD5 the Notecard reports, and read again
+    if it doesn't match.
+
+    Raises:
+        Exception: If reading fails after all retries.
+    """
+    tries_left = BINARY_RECEIVE_RETRIES
+    while True:
+        try:
+            return binary_store_receive(card, 0, length)
+        except Exception:
+            tries_left -= 1
+            if tries_left == 0:
+                raise
+
+
+def download(card, route, dest, target=None, offset=0, length=None,
+             resume=False, max_chunk_size=0, progress_cb=None, policy=None):
+    """Download binary data from a Notehub proxy route via the Notecard.
+
+    The data is fetched in ranges that fit in the Notecard's binary buffer,
+    each with a web.get with binary:true, offset and max, and read from the
+    buffer via card.binary.get, verifying its MD5. Each range is written to
+    `dest` as it arrives.
+
+    Failed web.gets are retried, and the range size adapted to the link,
+    according to `policy`, as `upload` does with web.posts.
+
+    The download ends once `length` bytes have been downloaded or, if
+    `length` isn't given, once the route returns less than a full range.
+
+    To resume an interrupted download, pass the offset to resume from, or
+    download to a path with `resume` set to continue from the end of the
+    file.
+
+    Args:
+        card (Notecard): The Notecard object.
+        route (str): The Notehub proxy route alias.
+        dest: Where to write the data: the path of a file, which is
+            written from `offset` on, a binary file object, which is written
+            from its current position, or a writable buffer, which is
+            written from index `offset` on.
+        target (str, optional): URL path appended to the route (sent as
+            ``name`` in the web.get request).
+        offset (int): The offset into the data to start downloading from.
+        length (int, optional): The length of the data at the route, if
+            known.
+        resume (bool): Start from the end of the file at path `dest`, if it
+            exists, rather than from `offset`.
+        max_chunk_size (int): Maximum range size in bytes. 0 means use the
+            Notecard's maximum buffer capacity.
+        progress_cb (callable, optional): Called after each range with a
+            dict containing progress information. ``total_chunks``,
+            ``percent_complete`` and ``eta_secs`` are None if `length`
+            isn't given.
+        policy (UploadPolicy, optional): How to retry failed web.gets and
+            adapt the range size. Defaults to ``UploadPolicy()``.
+
+    Returns:
+        dict: Download statistics with keys ``bytes_downloaded``,
+        ``chunks``, ``duration_secs``, and ``bytes_per_sec``, the effective
+        throughput including retries and backoff; ``resumed_offset``, the
+        offset it started from; ``retries`` and ``backoff_secs``; and
+        ``chunk_size``, the range size it ended with.
+
+    Raises:
+        ValueError: If ``route`` is empty, ``offset`` or ``length`` is
+            negative, or ``resume`` is set without a path.
+        Exception: If the download fails, or the data doesn't fit in a
+            ``dest`` buffer.
+    """
+    if not route:
+        raise ValueError('route must not be empty.')
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError('offset and length must not be negative.')
+    if resume:
+        if not _is_path(dest):
+            raise ValueError('resume needs dest to be a path.')
+        try:
+            offset = os.stat(dest)[6]
+        except OSError:
+            offset = 0
+
+    rsp = card.Transaction({'req': 'card.binary', 'reset': True})
+    if 'err' in rsp and '{bad-bin}' not in rsp['err']:
+        raise Exception(
+            f'Error querying card.binary: {rsp["err"]}')
+
+    buf_capacity = rsp.get('max', 0)
+    if buf_capacity == 0:
+        raise Exception(
+            'Notecard binary buffer capacity is zero or not reported.')
+
+    if max_chunk_size > 0:
+        chunk_size = min(max_chunk_size, buf_capacity)
+    else:
+        chunk_size = buf_capacity
+
+    state = (policy or UploadPolicy()).start(chunk_size)
+    download_start = _monotonic()
+    bytes_received = offset
+
+    if _is_path(dest):
+        mode = 'wb'
+        if offset:
+            try:
+                os.stat(dest)
+                mode = 'r+b'
+            except OSError:
+                pass
+        out = open(dest, mode)
+        out.seek(offset)
+    elif _is_buffer(dest):
+        out = _BufferWriter(dest, offset)
+    else:
+        out = dest
+
+    try:
+        chunk_idx = offset // chunk_size
+        chunks_received = 0
+        while length is None or bytes_received < length:
+            requested = state.chunk_size
+            if length is not None:
+                requested = min(requested, length - bytes_received)
+
+            web_req = {
+                'req': 'web.get',
+                'route': route,
+                'binary': True,
+                'offset': bytes_received,
+                'max': requested,
+            }
+            if target:
+                web_req['name'] = target
+
+            # Clear the binary buffer, so that a range past the end of the
+            # data leaves it empty.
+            binary_store_reset(card)
+            if not _try_web_request(card, state, web_req):
+                continue
+
+            chunk_len = binary_store_decoded_length(card)
+            if chunk_len > requested:
+                raise Exception(
+                    f'web.get returned {chunk_len} bytes for a range of '
+                    f'{requested}.')
+            if chunk_len == 0:
+                break
+
+            out.write(_receive_binary_chunk(card, chunk_len))
+            state.bytes_transferred += chunk_len
+            bytes_received += chunk_len
+
+            elapsed = _monotonic() - download_start
+            current_bps = chunk_len / elapsed if elapsed > 0 else 0
+            avg_bps = ((bytes_received - offset) / elapsed
+                       if elapsed > 0 else 0)
+
+            chunk_idx += 1
+            chunks_received += 1
+            if progress_cb:
+                total_chunks = percent_complete = eta = None
+                if length is not None:
+                    remaining = length - bytes_received
+                    total_chunks = chunk_idx + (
+                        remaining + state.chunk_size - 1) // state.chunk_size
+                    percent_complete = (bytes_received / length) * 100
+                    eta = remaining / avg_bps if avg_bps > 0 else 0
+                progress_cb({
+                    'chunk': chunk_idx,
+                    'total_chunks': total_chunks,
+                    'bytes_received': bytes_received,
+                    'total_bytes': length,
+                    'percent_complete': percent_complete,
+                    'bytes_per_sec': current_bps,
+                    'avg_bytes_per_sec': avg_bps,
+                    'eta_secs': eta,
+                    'chunk_size': state.chunk_size,
+                })
+
+            if chunk_len < requested:
+                break
+
+        if _is_path(dest) and hasattr(out, 'truncate'):
+            # Drop anything past the end of the data from an earlier
+            # download to the same file. MicroPython files can't be
+            # truncated, so there it's left in place.
+            out.truncate()
+    finally:
+        if _is_path(dest):
+            out.close()
+
+    if length is not None and bytes_received != length:
+        raise Exception(f'Download data ended after {bytes_received} of '
+                        f'{length} bytes.')
+
+    duration = _monotonic() - download_start
+    bytes_downloaded = bytes_received - offset
+    return {
+        'bytes_downloaded': bytes_downloaded,
+        'chunks': chunks_received,
+        'duration_secs': duration,
+        'bytes_per_sec': bytes_downloaded / duration if duration > 0 else 0,
+        'resumed_offset': offset,
+        'retries': state.retries,
+        'backoff_secs': state.backoff_secs,
+        'chunk_size': state.chunk_size,
+    }
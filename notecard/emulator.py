@@ -0,0 +1,620 @@
+"""Local Notecard emulator for testing and benchmarking note-python."""
+
+##
+# @file emulator.py
+#
+# @brief Emulate a Notecard on the serial and serial-over-I2C wire protocols.
+#
+# @section description Description
+# NotecardEmulator models the Notecard side of the wire protocols: newline
+# framed JSON requests, the CRC and sequence number field added by
+# Notecard._crc_add, the card.binary COBS flow, and web.post and web.get with
+# binary payloads. Three transports expose it to OpenSerial and OpenI2C:
+#
+# - EmulatedSerialPort runs the emulator behind a pseudo-terminal. Open its
+#   `port` with pyserial as you would a real Notecard.
+# - EmulatedUART is an in-process stand-in for a pyserial port, for when the
+#   cost of the pseudo-terminal would get in the way (e.g. benchmarks).
+# - EmulatedI2C looks like a periphery.I2C device (and like the machine.I2C and
+#   busio.I2C objects used on MicroPython and CircuitPython). Pass it to
+#   OpenI2C in place of the bus.
+#
+# Response latency, the size and drain rate of the Notecard's input buffer and
+# the size of the binary store are configurable, so transport changes can be
+# measured without hardware. This module is CPython-only, and the serial
+# transport requires a platform with pseudo-terminals (Linux or macOS).
+#
+# Example:
+#     emulator = NotecardEmulator(latency_ms=5)
+#     with EmulatedSerialPort(emulator) as endpoint:
+#         port = serial.Serial(endpoint.port, 115200)
+#         card = notecard.OpenSerial(port)
+#         card.Transaction({'req': 'card.version'})
+
+import errno
+import hashlib
+import json
+import os
+import select
+import threading
+import time
+from notecard.cobs import cobs_decode, cobs_encode
+from notecard.crc32 import crc32
+
+EMULATOR_VERSION = 'notecard-emulator'
+EMULATOR_BINARY_MAX = 130554
+EMULATOR_I2C_ADDRESS = 0x17
+
+_EOP = ord('\n')
+
+
+def _md5_hash(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class NotecardEmulator:
+    """The Notecard side of the wire protocols.
+
+    Requests are handled by functions in `handlers`, keyed by request name.
+    A handler takes the decoded request and returns the response dict, or a
+    (response dict, raw bytes) tuple to follow the JSON response with raw
+    bytes on the wire (as card.binary.get does). Add or replace handlers to
+    emulate other requests.
+
+    Attributes:
+        latency_ms (float): Delay before a response becomes available.
+        request_latency_ms (dict): Per-request overrides of `latency_ms`,
+            keyed by request name.
+        rx_buffer_size (int): Size of the Notecard's input buffer, or None
+            for unlimited. Bytes that arrive while it is full are lost, and
+            the request they belonged to gets an `{io}` error.
+        rx_bytes_per_sec (float): Rate at which the Notecard drains its input
+            buffer, or None to drain it instantly.
+        binary_max (int): Capacity of the binary store, in bytes.
+        requests (list): Every decoded request received, in order.
+        web_posts (list): A dict for each web.post received, holding the
+            request ('req') and, for binary posts, the payload ('payload').
+        web_files (dict): Data served to binary web.gets, keyed by route, or
+            by route and name for requests with a name (e.g.
+            'files/model.bin' for route 'files' and name '/model.bin').
+        notes (dict): Note bodies added with note.add, keyed by file.
+    """
+
+    def __init__(self, latency_ms=0, request_latency_ms=None,
+                 rx_buffer_size=None, rx_bytes_per_sec=None,
+                 binary_max=EMULATOR_BINARY_MAX):
+        """Create an emulated Notecard."""
+        self.latency_ms = latency_ms
+        self.request_latency_ms = dict(request_latency_ms or {})
+        self.rx_buffer_size = rx_buffer_size
+        self.rx_bytes_per_sec = rx_bytes_per_sec
+        self.binary_max = binary_max
+
+        self.requests = []
+        self.web_posts = []
+        self.web_files = {}
+        self.notes = {}
+        self.handlers = {
+            'card.version': self._card_version,
+            'card.binary': self._card_binary,
+            'card.binary.put': self._card_binary_put,
+            'card.binary.get': self._card_binary_get,
+            'note.add': self._note_add,
+            'web.post': self._web_post,
+            'web.get': self._web_get,
+        }
+
+        self._lock = threading.Lock()
+        self._line = bytearray()
+        self._line_overrun = False
+        self._rx_level = 0
+        self._rx_time = None
+        # (ready time, bytes, barrier) tuples waiting to go back to the host.
+        # A barrier entry is held back until everything queued before it has
+        # been read and the transport calls `release`, the way the Notecard
+        # holds back the binary data after a card.binary.get response until
+        # the host has finished reading the response.
+        self._output = []
+        self._binary = bytearray()
+        # The COBS length and MD5 of `_binary`, computed when first needed.
+        self._binary_info = None
+        self._bad_bin = None
+        # The card.binary.put whose COBS data is expected as the next line.
+        self._binary_put = None
+
+    def write(self, data, now=None):
+        """Take bytes written by the host."""
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            accepted = self._accept(len(data), now)
+            for i, byte in enumerate(data):
+                if i >= accepted:
+                    self._line_overrun = True
+                    break
+                if byte == _EOP:
+                    line = bytes(self._line)
+                    overrun = self._line_overrun
+                    self._line = bytearray()
+                    self._line_overrun = False
+                    self._handle_line(line, overrun, now)
+                else:
+                    self._line.append(byte)
+
+    def available(self, now=None):
+        """Return the number of response bytes ready for the host."""
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            count = 0
+            for ready_at, data, barrier in self._output:
+                if ready_at > now or barrier:
+                    break
+                count += len(data)
+            return count
+
+    def release(self):
+        """Make held-back bytes available once everything before is read."""
+        with self._lock:
+            if self._output and self._output[0][2]:
+                ready_at, data, _ = self._output[0]
+                self._output[0] = (ready_at, data, False)
+
+    def next_ready_time(self):
+        """Return when the next queued response is ready, or None."""
+        with self._lock:
+            return self._output[0][0] if self._output else None
+
+    def read(self, size, now=None):
+        """Return up to `size` response bytes that are ready for the host."""
+        if now is None:
+            now = time.monotonic()
+
+        out = bytearray()
+        with self._lock:
+            while self._output and len(out) < size:
+                ready_at, data, barrier = self._output[0]
+                if ready_at > now or barrier:
+                    break
+
+                take = size - len(out)
+                out += data[:take]
+                if take < len(data):
+                    self._output[0] = (ready_at, data[take:], barrier)
+                else:
+                    self._output.pop(0)
+
+        return bytes(out)
+
+    def _accept(self, length, now):
+        """Model the input buffer; return how many of `length` bytes fit."""
+        if self.rx_buffer_size is None:
+            return length
+
+        if self._rx_time is not None:
+            if self.rx_bytes_per_sec is None:
+                self._rx_level = 0
+            else:
+                drained = (now - self._rx_time) * self.rx_bytes_per_sec
+                self._rx_level = max(0, self._rx_level - drained)
+        self._rx_time = now
+
+        accepted = min(length, max(0, int(self.rx_buffer_size
+                                          - self._rx_level)))
+        self._rx_level += accepted
+        return accepted
+
+    def _respond(self, data, now, latency_ms, barrier=False):
+        ready_at = now + latency_ms / 1000
+        # Responses never overtake earlier ones.
+        if self._output:
+            ready_at = max(ready_at, self._output[-1][0])
+        self._output.append((ready_at, bytes(data), barrier))
+
+    def _respond_json(self, rsp, seq_number, now, latency_ms):
+        rsp_string = json.dumps(rsp, separators=(',', ':'))
+        if seq_number is not None:
+            crc = crc32(rsp_string.encode('utf-8'))
+            crc_field = f'"crc":"{seq_number:04x}:{crc:08x}"'
+            if rsp_string == '{}':
+                rsp_string = '{' + crc_field + '}'
+            else:
+                rsp_string = rsp_string[:-1] + ',' + crc_field + '}'
+        self._respond((rsp_string + '\r\n').encode('utf-8'), now, latency_ms)
+
+    def _handle_line(self, line, overrun, now):
+        if self._binary_put is not None:
+            self._handle_binary_put_data(line, overrun)
+            return
+
+        line = line.strip()
+        if not line:
+            # A bare newline is how the host resynchronizes with the Notecard.
+            self._respond(b'\r\n', now, 0)
+            return
+
+        if overrun:
+            self._respond_json({'err': 'serial overrun {io}'}, None, now,
+                               self.latency_ms)
+            return
+
+        try:
+            req = json.loads(line)
+        except ValueError:
+            self._respond_json({'err': 'request is not valid JSON {io}'},
+                               None, now, self.latency_ms)
+            return
+
+        seq_number = None
+        if 'crc' in req:
+            seq_number, crc_ok = self._check_crc(line)
+            if not crc_ok:
+                self._respond_json({'err': 'CRC error {io}'}, seq_number,
+                                   now, self.latency_ms)
+                return
+            del req['crc']
+
+        self.requests.append(req)
+        name = req.get('req', req.get('cmd'))
+        latency_ms = self.request_latency_ms.get(name, self.latency_ms)
+        handler = self.handlers.get(name)
+        if handler is None:
+            rsp, trailer = {'err': f'unknown request: {name}'}, None
+        else:
+            rsp = handler(req)
+            trailer = None
+            if isinstance(rsp, tuple):
+                rsp, trailer = rsp
+
+        if 'req' not in req:
+            # Commands don't get a response.
+            return
+
+        self._respond_json(rsp, seq_number, now, latency_ms)
+        if trailer is not None:
+            self._respond(trailer, now, latency_ms, barrier=True)
+
+    def _check_crc(self, line):
+        """Check a request's CRC field; return (sequence number, valid)."""
+        crc_idx = line.rfind(b'"crc":')
+        value_start = line.find(b'"', crc_idx + 6) + 1
+        value_end = line.find(b'"', value_start)
+        seq_number, _, crc = line[value_start:value_end].partition(b':')
+        try:
+            seq_number = int(seq_number, 16)
+            crc = int(crc, 16)
+        except ValueError:
+            return None, False
+
+        body = line[:crc_idx].rstrip()
+        if body.endswith(b','):
+            body = body[:-1]
+        return seq_number, crc32(body + b'}') == crc
+
+    def _handle_binary_put_data(self, line, overrun):
+        put = self._binary_put
+        self._binary_put = None
+
+        if overrun or len(line) != put['cobs']:
+            self._bad_bin = 'binary data length mismatch {bad-bin}'
+            return
+
+        decoded = cobs_decode(line, _EOP)
+        if 'status' in put and _md5_hash(decoded) != put['status']:
+            self._bad_bin = 'binary data MD5 mismatch {bad-bin}'
+            return
+
+        offset = put.get('offset', 0)
+        if offset + len(decoded) > self.binary_max:
+            self._bad_bin = 'binary data exceeds the binary store {bad-bin}'
+            return
+
+        self._binary[offset:] = decoded
+        self._binary_info = None
+        self._bad_bin = None
+
+    def _card_version(self, req):
+        return {
+            'version': EMULATOR_VERSION,
+            'device': 'dev:000000000000000',
+            'name': 'Blues Wireless Notecard',
+            'body': {'org': 'Blues Wireless', 'product': 'Notecard',
+                     'version': EMULATOR_VERSION},
+        }
+
+    def _card_binary(self, req):
+        if req.get('reset') or req.get('delete'):
+            self._binary = bytearray()
+            self._binary_info = None
+            self._bad_bin = None
+            return {'max': self.binary_max}
+
+        rsp = {'max': self.binary_max}
+        if self._bad_bin is not None:
+            rsp['err'] = self._bad_bin
+            return rsp
+
+        if self._binary:
+            if self._binary_info is None:
+                self._binary_info = (len(cobs_encode(self._binary, _EOP)),
+                                     _md5_hash(self._binary))
+            rsp['length'] = len(self._binary)
+            rsp['cobs'], rsp['status'] = self._binary_info
+        return rsp
+
+    def _card_binary_put(self, req):
+        if 'cobs' not in req:
+            return {'err': 'card.binary.put requires cobs'}
+
+        offset = req.get('offset', 0)
+        if offset > len(self._binary):
+            return {'err': 'offset is beyond the end of the binary data'}
+
+        self._binary_put = req
+        return {}
+
+    def _card_binary_get(self, req):
+        if self._bad_bin is not None:
+            return {'err': self._bad_bin}
+
+        offset = req.get('offset', 0)
+        length = req.get('length', len(self._binary) - offset)
+        if offset + length > len(self._binary):
+            return {'err': 'requested range is beyond the binary data'}
+
+        data = self._binary[offset:offset + length]
+        encoded = cobs_encode(data, _EOP)
+        encoded.append(_EOP)
+        return ({'cobs': len(encoded) - 1, 'status': _md5_hash(data)},
+                encoded)
+
+    def _note_add(self, req):
+        notes = self.notes.setdefault(req.get('file', 'data.qo'), [])
+        notes.append(req.get('body', {}))
+        return {'total': len(notes)}
+
+    def _web_post(self, req):
+        post = {'req': req}
+        if req.get('binary'):
+            if self._bad_bin is not None:
+                return {'err': self._bad_bin}
+            if not self._binary:
+                return {'err': 'no binary data to send {bad-bin}'}
+            if ('status' in req
+                    and _md5_hash(self._binary) != req['status']):
+                return {'err': 'binary data MD5 mismatch {bad-bin}'}
+
+            post['payload'] = bytes(self._binary)
+            # The binary store is cleared once it has been sent.
+            self._binary = bytearray()
+            self._binary_info = None
+
+        self.web_posts.append(post)
+        return {'result': 200}
+
+    def _web_get(self, req):
+        key = req.get('route', '') + req.get('name', '')
+        if key not in self.web_files:
+            return {'result': 404}
+        if not req.get('binary'):
+            return {'result': 200}
+
+        # Serve the requested range into the binary store.
+        offset = req.get('offset', 0)
+        data = self.web_files[key]
+        end = offset + req['max'] if 'max' in req else len(data)
+        self._binary = bytearray(data[offset:end])
+        self._binary_info = None
+        self._bad_bin = None
+        return {'result': 200}
+
+
+class EmulatedSerialPort:
+    """Serve a NotecardEmulator on a pseudo-terminal.
+
+    Open `port` with pyserial (or any serial library) and hand the result to
+    OpenSerial. The emulator runs on a background thread until `close`.
+    """
+
+    def __init__(self, emulator):
+        """Create the pseudo-terminal and start serving `emulator`."""
+        import tty
+
+        self.emulator = emulator
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._running = True
+        self._thread = threading.Thread(target=self._run,
+                                        name='notecard-emulator',
+                                        daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        """Return the endpoint for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the endpoint."""
+        self.close()
+
+    def close(self):
+        """Stop the emulator thread and close the pseudo-terminal."""
+        if not self._running:
+            return
+
+        self._running = False
+        os.write(self._wake_w, b'x')
+        self._thread.join()
+        for fd in (self._master, self._slave, self._wake_r, self._wake_w):
+            os.close(fd)
+
+    def _run(self):
+        unsent = b''
+        while self._running:
+            now = time.monotonic()
+            timeout = None
+            next_ready = self.emulator.next_ready_time()
+            if next_ready is not None:
+                timeout = max(0, next_ready - now)
+
+            writers = [self._master] if unsent else []
+            readable, _, _ = select.select([self._master, self._wake_r],
+                                           writers, [], timeout)
+            if self._wake_r in readable:
+                break
+
+            if self._master in readable:
+                try:
+                    data = os.read(self._master, 4096)
+                except OSError as e:
+                    # EIO means nothing has the terminal open right now.
+                    if e.errno != errno.EIO:
+                        raise
+                    data = b''
+                if data:
+                    self.emulator.write(data)
+
+            if not unsent:
+                self.emulator.release()
+                unsent = self.emulator.read(4096)
+            if unsent:
+                try:
+                    written = os.write(self._master, unsent)
+                    unsent = unsent[written:]
+                except BlockingIOError:
+                    pass
+
+
+class EmulatedUART:
+    """An in-process, pyserial-like port connected to an emulated Notecard.
+
+    Hand it to OpenSerial in place of a serial.Serial. Unlike
+    EmulatedSerialPort, no thread or pseudo-terminal is involved, so it only
+    measures the host side of the serial transport.
+    """
+
+    def __init__(self, emulator):
+        """Connect a new port to `emulator`."""
+        self.emulator = emulator
+
+    @property
+    def in_waiting(self):
+        """Return the number of bytes ready to read."""
+        waiting = self.emulator.available()
+        if waiting == 0:
+            self.emulator.release()
+            waiting = self.emulator.available()
+        return waiting
+
+    def read(self, size=1):
+        """Read up to `size` bytes."""
+        return self.emulator.read(size)
+
+    def write(self, data):
+        """Write `data` to the Notecard."""
+        self.emulator.write(data)
+        return len(data)
+
+    def close(self):
+        """Close the port."""
+        pass
+
+
+class EmulatedI2C:
+    """An I2C bus with an emulated Notecard on it.
+
+    Implements `transfer` from periphery.I2C, `writeto`, `readfrom_into` and
+    `writeto_then_readfrom` from the MicroPython and CircuitPython I2C
+    classes, and the CircuitPython bus lock.
+
+    Attributes:
+        max_transfer (int): The largest payload the emulated Notecard accepts
+            or returns in a single I2C transaction.
+    """
+
+    def __init__(self, emulator, address=EMULATOR_I2C_ADDRESS,
+                 max_transfer=255):
+        """Put `emulator` on a new bus at `address`."""
+        self.emulator = emulator
+        self.address = address
+        self.max_transfer = max_transfer
+        self._read_len = 0
+        self._locked = False
+
+    def transfer(self, address, messages):
+        """Run periphery.I2C.Message transfers against the Notecard."""
+        self._check_address(address)
+        for message in messages:
+            if message.read:
+                buf = bytearray(len(message.data))
+                self._fill_read(buf)
+                message.data = buf
+            else:
+                self._handle_write(bytes(message.data))
+
+    def writeto(self, address, buf, stop=True):
+        """Write `buf` to the Notecard."""
+        self._check_address(address)
+        self._handle_write(bytes(buf))
+
+    def readfrom_into(self, address, buf):
+        """Read the response to the last read request into `buf`."""
+        self._check_address(address)
+        self._fill_read(buf)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in):
+        """Write `buffer_out`, then read into `buffer_in`."""
+        self.writeto(address, buffer_out)
+        self.readfrom_into(address, buffer_in)
+
+    def try_lock(self):
+        """Take the bus lock."""
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        """Release the bus lock."""
+        self._locked = False
+
+    def close(self):
+        """Close the bus."""
+        pass
+
+    def _check_address(self, address):
+        if address != self.address:
+            raise OSError(errno.ENXIO, f'No I2C device at 0x{address:02x}.')
+
+    def _handle_write(self, data):
+        if not data:
+            return
+
+        if data[0] == 0:
+            # A read request: 0 followed by the number of bytes to read.
+            self._read_len = data[1] if len(data) > 1 else 0
+            return
+
+        length = data[0]
+        if length > self.max_transfer or length != len(data) - 1:
+            raise OSError(errno.EIO, 'Malformed serial-over-I2C write.')
+        self.emulator.write(data[1:])
+
+    def _fill_read(self, buf):
+        data = self.emulator.read(min(self._read_len, self.max_transfer))
+        self._read_len = 0
+
+        remaining = self.emulator.available()
+        if remaining == 0:
+            # The host has seen the end of the current output, so let it have
+            # anything held back behind it on its next read.
+            self.emulator.release()
+        buf[0] = min(remaining, 255)
+        buf[1] = len(data)
+        buf[2:2 + len(data)] = data
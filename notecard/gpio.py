@@ -6,14 +6,27 @@ if sys.implementation.name == 'circuitpython':
     import digitalio
 elif sys.implementation.name == 'micropython':
     import machine
-else:
-    try:
-        with open('/etc/os-release', 'r') as f:
-            if 'ID=raspbian' in f.read():
-                raspbian = True
-                import RPi.GPIO as rpi_gpio
-    except IOError:
-        pass
+
+# On other platforms, whether this is Raspbian is only checked, and RPi.GPIO
+# only imported, when a GPIO is first set up.
+rpi_gpio = None
+_rpi_checked = False
+
+
+def _load_rpi_gpio():
+    """Return the RPi.GPIO module if running on Raspbian, otherwise None."""
+    global rpi_gpio, _rpi_checked
+    if not _rpi_checked:
+        _rpi_checked = True
+        try:
+            with open('/etc/os-release', 'r') as f:
+                if 'ID=raspbian' in f.read():
+                    import RPi.GPIO
+                    rpi_gpio = RPi.GPIO
+        except IOError:
+            pass
+
+    return rpi_gpio
 
 
 class GPIO:
@@ -60,7 +73,7 @@ class GPIO:
             return CircuitPythonGPIO(pin, direction, pull, value)
         elif sys.implementation.name == 'micropython':
             return MicroPythonGPIO(pin, direction, pull, value)
-        elif raspbian:
+        elif _load_rpi_gpio() is not None:
             return RpiGPIO(pin, direction, pull, value)
         else:
             raise NotImplementedError(
@@ -0,0 +1,303 @@
+"""Transport metrics for note-python, with Prometheus export."""
+
+##
+# @file metrics.py
+#
+# @brief Count Notecard transactions and export them to Prometheus.
+#
+# @section description Description
+# A TransportMetrics is a transaction observer (see notecard.observer) that
+# keeps running counters and latency histograms for a Notecard. Use
+# `Notecard.GetMetrics` to get the one attached to a Notecard,
+# `render_prometheus` to format metrics in the Prometheus text exposition
+# format and MetricsExporter to serve them over HTTP. This module is
+# CPython-only.
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds, in seconds, of the latency histogram buckets. Notecard
+# transactions range from a few milliseconds to the better part of a minute
+# for a web request.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+                   30, 60)
+
+METRICS_EXPORTER_ADDR = '127.0.0.1'
+METRICS_EXPORTER_PORT = 8000
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """A Prometheus-style histogram of observed values."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """Create an empty histogram with the given bucket upper bounds."""
+        self.buckets = tuple(sorted(buckets))
+        # One count per bucket, plus one for values above the last bound.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Add `value` to the histogram."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return (upper bound, cumulative count) pairs, ending with +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class TransportMetrics:
+    """Counters and latency histograms for a Notecard's transactions.
+
+    Register an instance with `Notecard.AddObserver`, or use the one returned
+    by `Notecard.GetMetrics`. All counters only ever increase.
+
+    Attributes:
+        labels (dict): Labels added to every exported sample, e.g.
+            `{'card': 'gateway-12'}` when exporting several Notecards.
+        transactions (dict): Transactions by request name.
+        failures (dict): Transactions that raised, by request name.
+        retries (int): Attempts that failed in a way that's retried.
+        crc_errors (int): Responses with a bad CRC.
+        sequence_mismatches (int): Responses whose sequence number didn't
+            match the request's.
+        io_errors (int): Responses with an `{io}` error.
+        transport_errors (int): Attempts where the transport raised.
+        resets (int): Resets done by transactions to recover the transport.
+            The reset done when the Notecard is opened, before any observer
+            can be registered, and calls to `Reset` aren't counted.
+        bytes_sent (int): Request bytes sent, including retries.
+        bytes_received (int): Response bytes received, including retries.
+        lock_wait_seconds (float): Time spent waiting for the transport lock,
+            including the lock a TransactionDispatcher takes for each burst,
+            which is counted against the burst's first transaction.
+        latency (dict): A Histogram of transaction durations by request name.
+        response_wait (Histogram): Time from sending a request to the first
+            byte of its response, for every attempt.
+    """
+
+    def __init__(self, labels=None, buckets=LATENCY_BUCKETS):
+        """Create zeroed metrics."""
+        self.labels = dict(labels or {})
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self.transactions = {}
+        self.failures = {}
+        self.retries = 0
+        self.crc_errors = 0
+        self.sequence_mismatches = 0
+        self.io_errors = 0
+        self.transport_errors = 0
+        self.resets = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.lock_wait_seconds = 0
+        self.latency = {}
+        self.response_wait = Histogram(buckets)
+
+    def __call__(self, record):
+        """Count a TransactionRecord. This makes the metrics an observer."""
+        durations = record.durations()
+        req = record.req or ''
+        with self._lock:
+            self.transactions[req] = self.transactions.get(req, 0) + 1
+            if record.error is not None:
+                self.failures[req] = self.failures.get(req, 0) + 1
+            self.retries += record.retries
+            self.crc_errors += record.count('crc')
+            self.sequence_mismatches += record.count('seq')
+            self.io_errors += record.count('io')
+            self.transport_errors += record.count('transport')
+            self.resets += record.resets
+            self.bytes_sent += record.bytes_sent
+            self.bytes_received += record.bytes_received
+            self.lock_wait_seconds += durations.get('lock_wait', 0)
+
+            if req not in self.latency:
+                self.latency[req] = Histogram(self._buckets)
+            self.latency[req].observe(durations['total'])
+            for attempt in record.attempts:
+                times = attempt.timestamps
+                if 'first_byte' in times and 'transmitted' in times:
+                    self.response_wait.observe(times['first_byte']
+                                               - times['transmitted'])
+
+    def collect(self):
+        """Return the metrics as a list of Prometheus metric families.
+
+        Each family is a tuple of (name, type, help, samples), where each
+        sample is a tuple of (sample name, labels, value).
+        """
+        labels = self.labels
+        families = []
+
+        def counter(name, help, value):
+            families.append((name, 'counter', help,
+                             [(name, labels, value)]))
+
+        def by_req(name, help, values):
+            families.append((name, 'counter', help,
+                             [(name, dict(labels, req=req), value)
+                              for req, value in sorted(values.items())]))
+
+        def histogram(name, help, histograms):
+            samples = []
+            for extra, hist in histograms:
+                sample_labels = dict(labels, **extra)
+                for bound, count in hist.cumulative():
+                    samples.append((name + '_bucket',
+                                    dict(sample_labels, le=_format(bound)),
+                                    count))
+                samples.append((name + '_sum', sample_labels, hist.sum))
+                samples.append((name + '_count', sample_labels, hist.count))
+            families.append((name, 'histogram', help, samples))
+
+        with self._lock:
+            by_req('notecard_transactions_total',
+                   'Notecard transactions, by request.', self.transactions)
+            by_req('notecard_transaction_failures_total',
+                   'Notecard transactions that failed, by request.',
+                   self.failures)
+            counter('notecard_retries_total',
+                    'Transaction attempts that failed and were retried.',
+                    self.retries)
+            counter('notecard_crc_errors_total',
+                    'Responses with a bad CRC.', self.crc_errors)
+            counter('notecard_sequence_mismatches_total',
+                    'Responses with an unexpected sequence number.',
+                    self.sequence_mismatches)
+            counter('notecard_io_errors_total',
+                    'Responses with an {io} error.', self.io_errors)
+            counter('notecard_transport_errors_total',
+                    'Transaction attempts where the transport failed.',
+                    self.transport_errors)
+            counter('notecard_resets_total',
+                    'Notecard resets done by transactions to recover the '
+                    'transport, not counting the reset done on open.',
+                    self.resets)
+            counter('notecard_sent_bytes_total',
+                    'Request bytes sent to the Notecard.', self.bytes_sent)
+            counter('notecard_received_bytes_total',
+                    'Response bytes received from the Notecard.',
+                    self.bytes_received)
+            counter('notecard_lock_wait_seconds_total',
+                    'Time spent waiting for the transport lock, including '
+                    'dispatcher bursts.',
+                    self.lock_wait_seconds)
+            histogram('notecard_transaction_duration_seconds',
+                      'Notecard transaction duration, by request.',
+                      [({'req': req}, hist)
+                       for req, hist in sorted(self.latency.items())])
+            histogram('notecard_response_wait_seconds',
+                      'Time from sending a request to its first response '
+                      'byte.', [({}, self.response_wait)])
+
+        return families
+
+
+def _format(value):
+    """Format a sample value the way Prometheus expects."""
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('\n', '\\n')
+            .replace('"', '\\"'))
+
+
+def render_prometheus(*metrics):
+    """Render TransportMetrics in the Prometheus text exposition format.
+
+    Families with the same name from several metrics, e.g. one per Notecard
+    with a distinguishing label, are merged.
+    """
+    families = {}
+    for m in metrics:
+        for name, type, help, samples in m.collect():
+            if name in families:
+                families[name][2].extend(samples)
+            else:
+                families[name] = (type, help, list(samples))
+
+    lines = []
+    for name, (type, help, samples) in families.items():
+        lines.append(f'# HELP {name} {help}')
+        lines.append(f'# TYPE {name} {type}')
+        for sample_name, labels, value in samples:
+            if labels:
+                label_text = ','.join(f'{k}="{_escape(v)}"'
+                                      for k, v in labels.items())
+                sample_name += '{' + label_text + '}'
+            lines.append(f'{sample_name} {_format(value)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Serve TransportMetrics to Prometheus over HTTP from a daemon thread.
+
+    Every GET is answered with `render_prometheus(*metrics)`.
+
+    Example:
+        exporter = MetricsExporter([card.GetMetrics()], port=8000)
+        ...
+        exporter.close()
+    """
+
+    def __init__(self, metrics, port=METRICS_EXPORTER_PORT,
+                 addr=METRICS_EXPORTER_ADDR):
+        """Start serving `metrics`, a list of TransportMetrics.
+
+        Pass `port=0` to pick a free port; `port` is then set to the one
+        chosen. Only local clients can connect unless `addr` is set, e.g. to
+        `''` to listen on every interface.
+        """
+        metrics = list(metrics)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = render_prometheus(*metrics).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((addr, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='notecard-metrics',
+                                        daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        """Return the exporter for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop serving."""
+        self.close()
+
+    def close(self):
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
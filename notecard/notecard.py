@@ -32,30 +32,67 @@
 
 import sys
 import os
-import json
 import time
-from notecard.timeout import start_timeout, has_timed_out
+try:
+    from _thread import get_ident as _thread_ident
+except ImportError:
+    # Ports without threads.
+    def _thread_ident():
+        return 0
+from notecard.timeout import (
+    start_timeout,
+    has_timed_out,
+    remaining_secs,
+    elapsed_secs,
+)
 from notecard.transaction_manager import TransactionManager, NoOpTransactionManager
 from notecard.crc32 import crc32
+from notecard.pacing import PacingProfile
+from notecard.codec import default_codec, get_codec
+from notecard.observer import (TransactionRecord, NULL_ATTEMPT, NULL_RECORD,
+                               monotonic)
+from notecard.retry import (
+    DEFAULT_RETRY_POLICY,
+    RETRY_MAX_ATTEMPTS,
+    RESPONSE_ERROR,
+    IO_ERROR,
+    TRANSPORT_ERROR,
+)
 
 use_periphery = False
 use_serial_lock = False
 
+# periphery and filelock are only imported when an OpenI2C or OpenSerial is
+# created (or SerialLockTimeout is looked up), so that importing the library
+# stays cheap for programs that don't use them.
 if sys.implementation.name == 'cpython' and (sys.platform == 'linux' or sys.platform == 'linux2' or sys.platform == 'darwin'):
     use_periphery = True
-    from periphery import I2C
-
     use_serial_lock = True
-    from filelock import FileLock
-    from filelock import Timeout as SerialLockTimeout
 else:
     class SerialLockTimeout(Exception):
         """A null SerialLockTimeout for when use_serial_lock is False."""
 
         pass
 
+
+def __getattr__(name):
+    """Import filelock's Timeout as SerialLockTimeout on first use."""
+    if name == 'SerialLockTimeout' and use_serial_lock:
+        global SerialLockTimeout
+        from filelock import Timeout as SerialLockTimeout
+        return SerialLockTimeout
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 use_i2c_lock = not use_periphery and sys.implementation.name != 'micropython'
 
+# On Linux, OpenSerial can block on the serial port's file descriptor instead of
+# sleeping between checks for available data.
+use_poll = sys.implementation.name == 'cpython' and sys.platform.startswith('linux')
+if use_poll:
+    import select
+
 NOTECARD_I2C_ADDRESS = 0x17
 NOTECARD_I2C_MAX_TRANSFER_DEFAULT = 255
 
@@ -72,14 +109,50 @@ CARD_REQUEST_SEGMENT_DELAY_MS = 250
 CARD_REQUEST_I2C_CHUNK_DELAY_MS = 20
 # The delay, in miliseconds, to wait after receiving a NACK I2C.
 CARD_REQUEST_I2C_NACK_WAIT_MS = 1000
+# When polling the Notecard over I2C for a response, start with a short delay
+# between polls and double it after each empty poll, up to a cap. Requests that
+# go out to the network (i.e. ones with a longer than usual timeout) start
+# polling at CARD_I2C_POLL_NETWORK_MS.
+CARD_I2C_POLL_MIN_MS = 1
+CARD_I2C_POLL_MAX_MS = 50
+CARD_I2C_POLL_NETWORK_MS = 25
 # The number of times to retry syncing up with the Notecard during a reset
 # before giving up.
 CARD_RESET_SYNC_RETRIES = 10
-# The time, in miliseconds, to drain incoming messages during a reset.
+# The time, in miliseconds, to wait for the Notecard to answer the newline sent
+# during a reset.
 CARD_RESET_DRAIN_MS = 500
+# Once the Notecard has echoed the reset newline, the input has to stay quiet
+# for CARD_RESET_QUIET_RTT_FACTOR times the echo's round trip time, but at least
+# CARD_RESET_QUIET_MIN_MS, before the reset is done. Until a round trip has been
+# measured, CARD_RESET_QUIET_DEFAULT_MS is used. The floor is there because
+# stale output can arrive in bursts tens of milliseconds apart, and a fast
+# echo mustn't let the reset finish in the gap between two of them.
+CARD_RESET_QUIET_MIN_MS = 25
+CARD_RESET_QUIET_DEFAULT_MS = 50
+CARD_RESET_QUIET_RTT_FACTOR = 2
 CARD_INTER_TRANSACTION_TIMEOUT_SEC = 30
 CARD_INTRA_TRANSACTION_TIMEOUT_SEC = 1
-CARD_TRANSACTION_RETRIES = 5
+CARD_TRANSACTION_RETRIES = RETRY_MAX_ATTEMPTS
+
+# How Transaction should handle a response, as determined by
+# Notecard._evaluate_response.
+_RSP_OK = 0
+_RSP_RETRY = 1
+_RSP_FAIL = 2
+_RSP_HEARTBEAT = 3
+_RSP_IO = 4
+
+# The steps yielded by the generators behind Transaction and the transports'
+# I/O loops, each as a tuple of the step and its arguments. Notecard runs them
+# with blocking calls (see Notecard._run_steps) and notecard.aio awaits them,
+# so the sync and async Notecards share one copy of each loop.
+_STEP_SLEEP = 0  # (secs,)
+_STEP_WAIT_READABLE = 1  # (start, timeout_secs, idle_secs)
+_STEP_TRANSMIT = 2  # (data,)
+_STEP_RECEIVE = 3  # ()
+_STEP_TRANSACT = 4  # (req_bytes, rsp_expected, timeout_secs)
+_STEP_RESET = 5  # ()
 
 
 class NoOpContextManager:
@@ -109,6 +182,11 @@ class NoOpSerialLock():
 class Notecard:
     """Base Notecard class."""
 
+    # Whether the transport constructors reset the Notecard. Transports that
+    # can't block in __init__ (e.g. the asyncio ones) leave it to the first
+    # Transaction instead.
+    _reset_on_init = True
+
     def __init__(self, debug=False):
         """Initialize the Notecard object."""
         self._user_agent_app = None
@@ -128,6 +206,21 @@ class Notecard:
         self._last_request_seq_number = 0
         self._card_supports_crc = False
         self._reset_required = True
+        # The thread holding the transport for a burst, or None.
+        self._burst_thread = None
+        # When the burst's wait for the lock started and ended, until the
+        # burst's first transaction records it.
+        self._burst_lock_wait = None
+        self._pacing = PacingProfile(CARD_REQUEST_SEGMENT_DELAY_MS,
+                                     CARD_REQUEST_I2C_CHUNK_DELAY_MS,
+                                     name='default')
+        self._codec = default_codec()
+        self._observers = []
+        self._retry_policy = DEFAULT_RETRY_POLICY
+        self._reset_quiet_secs = CARD_RESET_QUIET_DEFAULT_MS / 1000
+        self._metrics = None
+        # The attempt in progress, for the transport to mark phases on.
+        self._attempt = NULL_ATTEMPT
 
     def _crc_add(self, req_string, seq_number):
         """Add a CRC field to the request.
@@ -153,22 +246,32 @@ class Notecard:
         return req_string_w_crc
 
     def _crc_error(self, rsp_bytes):
-        """Check the CRC in a Notecard response."""
-        rsp_json = json.loads(rsp_bytes)
-        if 'crc' not in rsp_json:
+        """Check the CRC in a Notecard response.
+
+        This works on the raw response bytes so the response only has to be
+        decoded as JSON once, after the check. The Notecard always appends the
+        'crc' field last, so it's the final '"crc":' in the response, followed
+        only by its string value and the closing brace.
+        """
+        crc_idx = rsp_bytes.rfind(b'"crc":')
+        value_start = rsp_bytes.find(b'"', crc_idx + 6) + 1
+        value_end = rsp_bytes.find(b'"', value_start)
+        if (crc_idx == -1 or value_start == 0 or value_end == -1
+                or rsp_bytes[value_end + 1:].strip() != b'}'):
             # If there's not a 'crc' field in the response, it's only an error
             # if the Notecard supports CRC.
             return self._card_supports_crc
 
         self._card_supports_crc = True
 
-        # Extract the sequence number and CRC. We do all this via string
-        # operations instead of decoding the JSON. In Python, numbers with long
-        # decimal parts (e.g. 10.11111111111111123445522123) get truncated in
-        # the decoding process. When re-encoded, the string representation is
-        # also truncated, and so the CRC will be computed over a different
-        # string than was originally sent, resulting in a CRC error.
-        seq_number, crc = rsp_json['crc'].split(':')
+        # Extract the sequence number and CRC. We do all this on the raw bytes
+        # instead of decoding the JSON. In Python, numbers with long decimal
+        # parts (e.g. 10.11111111111111123445522123) get truncated in the
+        # decoding process. When re-encoded, the string representation is also
+        # truncated, and so the CRC would be computed over a different string
+        # than was originally sent, resulting in a CRC error.
+        crc_field = bytes(rsp_bytes[value_start:value_end]).decode()
+        seq_number, _, crc = crc_field.partition(':')
 
         # Convert the received CRC and sequence number to integers for later
         # comparison.
@@ -186,16 +289,11 @@ class Notecard:
                 print(f'Received CRC "{crc}" cannot be converted to integer.')
             return True
 
-        # Remove the 'crc' field from the response.
-        rsp_str = rsp_bytes.decode()
-        rsp_str_crc_removed = rsp_str.split('"crc":')[0]
-        if rsp_str_crc_removed[-1] == ',':
-            rsp_str_crc_removed = rsp_str_crc_removed[:-1] + '}'
-        else:
-            rsp_str_crc_removed = rsp_str_crc_removed.rstrip() + '}'
-
         # Compute the CRC over the response, with the 'crc' field removed.
-        bytes_for_crc_calc = rsp_str_crc_removed.encode('utf-8')
+        bytes_for_crc_calc = rsp_bytes[:crc_idx].rstrip()
+        if bytes_for_crc_calc[-1:] == b',':
+            bytes_for_crc_calc = bytes_for_crc_calc[:-1]
+        bytes_for_crc_calc += b'}'
         computed_crc = crc32(bytes_for_crc_calc)
 
         if seq_number_as_int != self._last_request_seq_number:
@@ -203,6 +301,7 @@ class Notecard:
                 print('Sequence number mismatch. Expected ' + \
                       f'{self._last_request_seq_number}, received ' + \
                       f'{seq_number_as_int}.')
+            self._attempt.set_outcome('seq')
             return True
         elif crc_as_int != computed_crc:
             if self._debug:
@@ -225,7 +324,7 @@ class Notecard:
         rsp_expected = 'req' in req
 
         # If this is a request and not a command, add a CRC.
-        req_string = json.dumps(req, separators=(',', ':'))
+        req_string = self._codec.dumps(req)
         if rsp_expected:
             req_string = self._crc_add(req_string,
                                        self._last_request_seq_number)
@@ -240,6 +339,57 @@ class Notecard:
         # Encode the request string as UTF-8 bytes.
         return (req_string.encode('utf-8'), rsp_expected)
 
+    def _evaluate_response(self, rsp_bytes):
+        """Decide how Transaction should handle a raw response.
+
+        Returns a tuple of the decoded response (None if it couldn't be
+        decoded) and one of _RSP_OK, _RSP_RETRY, _RSP_FAIL, _RSP_HEARTBEAT or
+        _RSP_IO.
+        """
+        attempt = self._attempt
+        if self._crc_error(rsp_bytes):
+            if self._debug:
+                print('CRC error on response from Notecard.')
+            attempt.set_outcome('crc')
+            return None, _RSP_RETRY
+
+        try:
+            rsp_json = self._codec.loads(rsp_bytes)
+        except Exception as e:
+            if self._debug:
+                print(e)
+            attempt.set_outcome('parse')
+            return None, _RSP_RETRY
+
+        if 'err' in rsp_json:
+            if '{io}' in rsp_json['err'] and '{not-supported}' not in rsp_json['err']:
+                if self._debug:
+                    print('Response has error field indicating ' + \
+                          f'I/O error: {rsp_json}')
+
+                attempt.set_outcome('io')
+                return rsp_json, _RSP_IO
+            elif '{bad-bin}' in rsp_json['err']:
+                if self._debug:
+                    print('Response has error field indicating ' + \
+                          f'binary I/O error: {rsp_json}')
+                    print('Not eligible for retry.')
+
+                attempt.set_outcome('bad-bin')
+                return rsp_json, _RSP_FAIL
+            elif '{heartbeat}' in rsp_json['err']:
+                if self._debug:
+                    try:
+                        print(f'[DEBUG] {rsp_json["status"]}')
+                    except:
+                        pass
+
+                attempt.set_outcome('heartbeat')
+                return rsp_json, _RSP_HEARTBEAT
+
+        attempt.set_outcome('ok')
+        return rsp_json, _RSP_OK
+
     def _transaction_timeout_seconds(self, req):
         """Determine the timeout to use, in seconds, for the transaction.
 
@@ -284,7 +434,7 @@ class Notecard:
 
         return timeout_secs
 
-    def Transaction(self, req, lock=True):
+    def Transaction(self, req, lock=True, retry_policy=None):
         """Send a request to the Notecard and read back a response.
 
         If the request is a command (indicated by using 'cmd' in the request
@@ -292,113 +442,235 @@ class Notecard:
 
         The underlying transport channel (serial or I2C) is locked for the
         duration of the request and response if `lock` is True.
+
+        Failed attempts are retried according to `retry_policy`, or the
+        policy set with SetRetryPolicy if it's None.
         """
+        record = TransactionRecord(req) if self._observers else NULL_RECORD
         rsp_json = None
         timeout_secs = self._transaction_timeout_seconds(req)
         req_bytes, rsp_expected = self._prepare_request(req)
-
-        if self._reset_required:
-            self.Reset()
+        record.mark('encoded')
 
         try:
-            self._transaction_manager.start(CARD_INTER_TRANSACTION_TIMEOUT_SEC)
-            if lock:
-                self.lock()
-
-            retries_left = CARD_TRANSACTION_RETRIES
-            error = False
-            if rsp_expected:
-                while retries_left > 0:
-                    try:
-                        rsp_bytes = self._transact(
-                            req_bytes, rsp_expected=True,
-                            timeout_secs=timeout_secs)
-                    except Exception as e:
-                        if self._debug:
-                            print(e)
-
-                        error = True
-                        self.Reset()
-                        retries_left -= 1
-                        time.sleep(0.5)
-                        continue
-
-                    if self._crc_error(rsp_bytes):
-                        if self._debug:
-                            print('CRC error on response from Notecard.')
-
-                        error = True
-                        retries_left -= 1
-                        time.sleep(0.5)
-                        continue
+            if self._reset_required:
+                record.mark('reset_start')
+                self.Reset()
+                record.mark('reset_end')
+
+            # Only the thread that started a burst is part of it. Other threads
+            # wait for the lock, and start the transaction manager once they
+            # have it, after the burst has ended.
+            in_burst = self._in_burst()
+            if in_burst and self._burst_lock_wait is not None:
+                if record is not NULL_RECORD:
+                    (record.timestamps['lock_start'],
+                     record.timestamps['lock_end']) = self._burst_lock_wait
+                self._burst_lock_wait = None
+            try:
+                if lock:
+                    record.mark('lock_start')
+                    self.lock()
+                    record.mark('lock_end')
+                if not in_burst:
+                    record.mark('tm_start')
+                    self._transaction_manager.start(
+                        CARD_INTER_TRANSACTION_TIMEOUT_SEC)
+                    record.mark('tm_end')
+
+                rsp_json = self._run_steps(self._transaction_steps(
+                    req, req_bytes, rsp_expected, timeout_secs, record,
+                    retry_policy))
+
+            finally:
+                self._attempt = NULL_ATTEMPT
+                if not in_burst:
+                    self._transaction_manager.stop()
+
+                if lock:
+                    self.unlock()
+        except Exception as e:
+            if record is not NULL_RECORD:
+                record.error = str(e)
+            raise
+        finally:
+            if record is not NULL_RECORD:
+                record.mark('end')
+                self._notify_observers(record)
 
-                    try:
-                        rsp_json = json.loads(rsp_bytes)
-                    except Exception as e:
-                        if self._debug:
-                            print(e)
+        if self._debug and rsp_json is not None:
+            print(rsp_json)
 
-                        error = True
-                        retries_left -= 1
-                        time.sleep(0.5)
-                        continue
+        return rsp_json
 
-                    if 'err' in rsp_json:
-                        if '{io}' in rsp_json['err'] and '{not-supported}' not in rsp_json['err']:
-                            if self._debug:
-                                print('Response has error field indicating ' + \
-                                      f'I/O error: {rsp_json}')
-
-                            error = True
-                            retries_left -= 1
-                            time.sleep(0.5)
-                            continue
-                        elif '{bad-bin}' in rsp_json['err']:
-                            if self._debug:
-                                print('Response has error field indicating ' + \
-                                      f'binary I/O error: {rsp_json}')
-                                print('Not eligible for retry.')
-
-                            error = True
-                            break
-                        elif '{heartbeat}' in rsp_json['err']:
-                            if self._debug:
-                                try:
-                                    print(f'[DEBUG] {rsp_json["status"]}')
-                                except:
-                                    pass
-
-                            error = False
-                            continue
+    def _transaction_steps(self, req, req_bytes, rsp_expected, timeout_secs,
+                           record, retry_policy):
+        """Yield the steps of a transaction's attempts and return its response.
 
-                    error = False
-                    break
-            else:
+        Decides, for each attempt, whether to retry it and how long to wait
+        first, according to the retry policy, and records it in `record`.
+        """
+        policy = retry_policy or self._retry_policy
+        retry = policy.start(req)
+        rsp_json = None
+        error = False
+        if rsp_expected:
+            while True:
+                attempt = record.begin_attempt(len(req_bytes))
+                self._attempt = attempt
                 try:
-                    self._transact(req_bytes, rsp_expected=False,
-                                   timeout_secs=timeout_secs)
+                    rsp_bytes = yield (_STEP_TRANSACT, req_bytes, True,
+                                       timeout_secs)
                 except Exception as e:
-                    error = True
                     if self._debug:
                         print(e)
 
-            self._last_request_seq_number += 1
+                    attempt.set_outcome('transport')
+                    error = True
+                    delay_secs = retry.next_delay(TRANSPORT_ERROR)
+                    if delay_secs is None:
+                        break
+
+                    if retry.rule(TRANSPORT_ERROR).reset:
+                        attempt.mark('reset_start')
+                        yield (_STEP_RESET,)
+                        attempt.mark('reset_end')
+                    yield (_STEP_SLEEP, delay_secs)
+                    continue
 
-            if error:
-                self._reset_required = True
-                raise Exception('Failed to transact with Notecard.')
+                attempt.received(len(rsp_bytes))
+                rsp_json, verdict = self._evaluate_response(rsp_bytes)
+                if verdict == _RSP_RETRY or verdict == _RSP_IO:
+                    kind = IO_ERROR if verdict == _RSP_IO else RESPONSE_ERROR
+                    error = True
+                    delay_secs = retry.next_delay(kind)
+                    if delay_secs is None:
+                        # With its own rule, an {io} error that isn't retried
+                        # is returned like any other error response.
+                        error = kind != IO_ERROR or policy.io is None
+                        break
+
+                    if retry.rule(kind).reset:
+                        attempt.mark('reset_start')
+                        yield (_STEP_RESET,)
+                        attempt.mark('reset_end')
+                    yield (_STEP_SLEEP, delay_secs)
+                    continue
+                elif verdict == _RSP_FAIL:
+                    error = True
+                    break
+                elif verdict == _RSP_HEARTBEAT:
+                    error = False
+                    continue
 
-        finally:
-            if lock:
-                self.unlock()
+                error = False
+                break
+        else:
+            attempt = record.begin_attempt(len(req_bytes))
+            self._attempt = attempt
+            try:
+                yield (_STEP_TRANSACT, req_bytes, False, timeout_secs)
+                attempt.set_outcome('ok')
+            except Exception as e:
+                attempt.set_outcome('transport')
+                error = True
+                if self._debug:
+                    print(e)
 
-            self._transaction_manager.stop()
+        self._last_request_seq_number += 1
 
-        if self._debug and rsp_json is not None:
-            print(rsp_json)
+        if error:
+            self._reset_required = True
+            raise Exception('Failed to transact with Notecard.')
 
         return rsp_json
 
+    def _run_steps(self, steps):
+        """Run a step generator to completion and return what it returns.
+
+        Each step is done with a blocking call, and its result sent back into
+        the generator, or its exception thrown into it.
+        """
+        result = None
+        error = None
+        while True:
+            try:
+                if error is None:
+                    step = steps.send(result)
+                else:
+                    step = steps.throw(error)
+            except StopIteration as e:
+                return e.value
+
+            result = None
+            error = None
+            try:
+                kind = step[0]
+                if kind == _STEP_SLEEP:
+                    time.sleep(step[1])
+                elif kind == _STEP_WAIT_READABLE:
+                    self._wait_for_data(step[1], step[2], step[3])
+                elif kind == _STEP_TRANSMIT:
+                    self.transmit(step[1])
+                elif kind == _STEP_RECEIVE:
+                    result = self.receive()
+                elif kind == _STEP_TRANSACT:
+                    result = self._transact(step[1], rsp_expected=step[2],
+                                            timeout_secs=step[3])
+                else:
+                    self.Reset()
+            except Exception as e:
+                error = e
+
+    def _reset_echo_received(self, rtt_secs):
+        """Adapt the reset quiet time to the round trip of a newline echo."""
+        quiet_secs = max(CARD_RESET_QUIET_MIN_MS / 1000,
+                         CARD_RESET_QUIET_RTT_FACTOR * rtt_secs)
+        self._reset_quiet_secs = min(quiet_secs, CARD_RESET_DRAIN_MS / 1000)
+
+    def _notify_observers(self, record):
+        """Pass a finished TransactionRecord to each observer."""
+        for observer in self._observers:
+            try:
+                observer(record)
+            except Exception as e:
+                if self._debug:
+                    print(f'Transaction observer failed: {e}')
+
+    def _begin_burst(self):
+        """Hold the transport for a burst of back-to-back transactions.
+
+        Takes the lock and starts the transaction manager once. Until
+        `_end_burst` is called, Transaction calls made by this thread with
+        lock=False don't restart the transaction manager. A reset, if one is
+        needed, is left to the first Transaction, so observers see it, as is
+        the time spent waiting for the lock.
+        """
+        lock_start = monotonic()
+        self.lock()
+        self._burst_lock_wait = (lock_start, monotonic())
+        try:
+            self._transaction_manager.start(
+                CARD_INTER_TRANSACTION_TIMEOUT_SEC)
+        except Exception:
+            self.unlock()
+            raise
+
+        self._burst_thread = _thread_ident()
+
+    def _end_burst(self):
+        """Release the transport held by `_begin_burst`."""
+        self._burst_thread = None
+        self._burst_lock_wait = None
+        try:
+            self._transaction_manager.stop()
+        finally:
+            self.unlock()
+
+    def _in_burst(self):
+        """Return whether the calling thread is in a burst."""
+        return self._burst_thread == _thread_ident()
+
     def Command(self, req):
         """Send a command to the Notecard.
 
@@ -428,13 +700,88 @@ class Notecard:
         """Set the pins used for RTX and CTX."""
         self._transaction_manager = TransactionManager(rtx_pin, ctx_pin)
 
+    def SetPacingProfile(self, profile):
+        """Set the delays used to pace writes to the Notecard.
+
+        `profile` is a PacingProfile or the name of a preset ('conservative',
+        'default' or 'aggressive').
+        """
+        if isinstance(profile, str):
+            profile = PacingProfile.preset(profile)
+        self._pacing = profile
+
+    def GetPacingProfile(self):
+        """Return the PacingProfile in use."""
+        return self._pacing
+
+    def SetCodec(self, codec):
+        """Set the codec used to encode requests and decode responses.
+
+        `codec` is a codec object (see notecard.codec) or the name of one
+        ('json', 'orjson' or 'ujson').
+        """
+        if isinstance(codec, str):
+            codec = get_codec(codec)
+        self._codec = codec
+
+    def GetCodec(self):
+        """Return the codec in use."""
+        return self._codec
+
+    def SetRetryPolicy(self, policy):
+        """Set the notecard.retry.RetryPolicy used by Transaction."""
+        self._retry_policy = policy
+
+    def GetRetryPolicy(self):
+        """Return the RetryPolicy in use."""
+        return self._retry_policy
+
+    def AddObserver(self, observer):
+        """Call `observer` with a TransactionRecord after every transaction.
+
+        See notecard.observer for what the record holds. Observers are called
+        on the thread that ran the transaction, after the transport has been
+        released. Exceptions raised by an observer are ignored.
+        """
+        # Replace rather than append to the list, so a transaction running
+        # on another thread never sees it change while notifying observers.
+        self._observers = self._observers + [observer]
+
+    def RemoveObserver(self, observer):
+        """Stop calling `observer` after every transaction."""
+        self._observers = [o for o in self._observers if o != observer]
+
+    def GetMetrics(self):
+        """Return this Notecard's notecard.metrics.TransportMetrics.
+
+        The metrics are created and registered as an observer on the first
+        call, so Notecards that never ask for metrics don't pay for them.
+        CPython only.
+        """
+        if self._metrics is None:
+            from notecard.metrics import TransportMetrics
+
+            self._metrics = TransportMetrics()
+            self.AddObserver(self._metrics)
+        return self._metrics
+
 
 class OpenSerial(Notecard):
     """Notecard class for Serial communication."""
 
+    # Whether the serial FileLock is held per thread. The asyncio card takes
+    # and releases it from different threads, so it shares one lock state.
+    _serial_lock_thread_local = True
+
     def _transact(self, req_bytes, rsp_expected,
                   timeout_secs=CARD_INTER_TRANSACTION_TIMEOUT_SEC):
-        self.transmit(req_bytes)
+        return self._run_steps(
+            self._transact_steps(req_bytes, rsp_expected, timeout_secs))
+
+    def _transact_steps(self, req_bytes, rsp_expected, timeout_secs):
+        """Yield the steps of `_transact`. See `Notecard._run_steps`."""
+        yield (_STEP_TRANSMIT, req_bytes)
+        self._attempt.mark('transmitted')
 
         if not rsp_expected:
             return
@@ -445,14 +792,49 @@ class OpenSerial(Notecard):
                 raise Exception('Timed out while querying Notecard for ' + \
                                 'available data.')
 
-            # Delay for 10 ms before checking for available data again.
-            time.sleep(.01)
+            # Without a pollable UART, delay for 10 ms before checking for
+            # available data again.
+            yield (_STEP_WAIT_READABLE, start, timeout_secs, .01)
 
-        return self.receive()
+        self._attempt.mark('first_byte')
+        return (yield (_STEP_RECEIVE,))
+
+    def _wait_for_data(self, start, timeout_secs, idle_secs):
+        """Wait for data from the Notecard, for a _STEP_WAIT_READABLE step.
+
+        Blocks on the UART when it can be polled, otherwise sleeps for
+        `idle_secs`, if it's not 0.
+        """
+        if self._poller is not None:
+            self._wait_readable(start, timeout_secs)
+        elif idle_secs:
+            time.sleep(idle_secs)
+
+    def _wait_readable(self, start, timeout_secs):
+        """Block until the UART is readable or the timeout expires.
+
+        Only used when the UART exposes a pollable file descriptor. A
+        `timeout_secs` of 0 means wait indefinitely.
+        """
+        if len(self._rx_pending) > 0:
+            return
+
+        if timeout_secs == 0:
+            self._poller.poll()
+        else:
+            remaining_ms = int(remaining_secs(start, timeout_secs) * 1000) + 1
+            self._poller.poll(max(remaining_ms, 0))
 
     def receive(self, timeout_secs=CARD_INTRA_TRANSACTION_TIMEOUT_SEC,
                 delay=True):
         """Read a newline-terminated batch of data from the Notecard."""
+        return self._run_steps(self._receive_steps(timeout_secs, delay))
+
+    def _receive_steps(self, timeout_secs, delay):
+        """Yield the steps of `receive`. See `Notecard._run_steps`."""
+        if self._bulk_receive:
+            return (yield from self._receive_bulk_steps(timeout_secs, delay))
+
         data = bytearray()
         received_newline = False
         start = start_timeout()
@@ -463,10 +845,8 @@ class OpenSerial(Notecard):
                     raise Exception('Timed out waiting to receive data from' + \
                                     ' Notecard.')
 
-                # Sleep while awaiting the first byte (lazy). After the first
-                # byte, start to spin for the remaining bytes (greedy).
-                if delay and len(data) == 0:
-                    time.sleep(.001)
+                yield (_STEP_WAIT_READABLE, start, timeout_secs,
+                       self._receive_idle_secs(data, delay))
 
             timeout_secs = CARD_INTRA_TRANSACTION_TIMEOUT_SEC
             start = start_timeout()
@@ -476,8 +856,65 @@ class OpenSerial(Notecard):
 
         return data
 
+    def _receive_bulk_steps(self, timeout_secs, delay):
+        """Yield the steps of reading a newline-terminated batch in bulk.
+
+        Rather than reading one byte at a time, drain everything waiting in the
+        UART's input buffer with a single read and search that chunk for the
+        newline. Any bytes that arrive after the newline (e.g. the binary data
+        that follows a card.binary.get response) are held in `_rx_pending` and
+        returned by the next call.
+        """
+        data = self._rx_pending
+        self._rx_pending = bytearray()
+        search_from = 0
+        start = start_timeout()
+
+        while True:
+            newline_idx = data.find(b'\n', search_from)
+            if newline_idx != -1:
+                break
+            search_from = len(data)
+
+            while not self._available():
+                if timeout_secs != 0 and has_timed_out(start, timeout_secs):
+                    raise Exception('Timed out waiting to receive data from' + \
+                                    ' Notecard.')
+
+                yield (_STEP_WAIT_READABLE, start, timeout_secs,
+                       self._receive_idle_secs(data, delay))
+
+            timeout_secs = CARD_INTRA_TRANSACTION_TIMEOUT_SEC
+            start = start_timeout()
+            chunk = self._read_available()
+            if chunk:
+                data.extend(chunk)
+
+        if newline_idx + 1 < len(data):
+            self._rx_pending = data[newline_idx + 1:]
+            del data[newline_idx + 1:]
+
+        return data
+
+    def _receive_idle_secs(self, data, delay):
+        """Return how long to sleep between checks for data without a poller.
+
+        Sleep while awaiting the first byte (lazy). After the first byte,
+        start to spin for the remaining bytes (greedy).
+        """
+        if delay and len(data) == 0:
+            return .001
+
+        return 0
+
     def transmit(self, data, delay=True):
         """Send `data` to the Notecard."""
+        self._run_steps(self._transmit_steps(data, delay))
+
+    def _transmit_steps(self, data, delay):
+        """Yield the steps of `transmit`. See `Notecard._run_steps`."""
+        # Write segments as views into `data` rather than copies.
+        data = memoryview(data)
         seg_off = 0
         seg_left = len(data)
 
@@ -487,35 +924,48 @@ class OpenSerial(Notecard):
                 seg_len = CARD_REQUEST_SEGMENT_MAX_LEN
 
             self.uart.write(data[seg_off:seg_off + seg_len])
+            self._last_segment_sent = start_timeout()
             seg_off += seg_len
             seg_left -= seg_len
 
             if delay:
-                time.sleep(CARD_REQUEST_SEGMENT_DELAY_MS / 1000)
+                yield (_STEP_SLEEP, self._pacing.segment_delay_ms / 1000)
 
     def _available_micropython(self):
         return self.uart.any()
 
     def _available_default(self):
-        return self.uart.in_waiting > 0
+        return len(self._rx_pending) > 0 or self.uart.in_waiting > 0
 
     def _read_byte(self):
         """Read a single byte from the Notecard."""
         return self.uart.read(1)
 
+    def _read_available(self):
+        """Read all the bytes currently waiting in the UART's input buffer."""
+        return self.uart.read(self.uart.in_waiting)
+
     def Reset(self):
         """Reset the Notecard."""
         if self._debug:
             print('Resetting Notecard serial communications.')
 
-        # Delay to give the Notecard a chance to process any segment sent prior
-        # to the coming reset sequence.
-        time.sleep(CARD_REQUEST_SEGMENT_DELAY_MS / 1000)
+        # Give the Notecard a chance to process any segment sent prior to the
+        # coming reset sequence. Transmits paced with the segment delay have
+        # already waited for it.
+        if self._last_segment_sent is not None:
+            wait_secs = remaining_secs(self._last_segment_sent,
+                                       self._pacing.segment_delay_ms / 1000)
+            if wait_secs > 0:
+                time.sleep(wait_secs)
 
         notecard_ready = False
         try:
             self.lock()
 
+            # Anything held over from a previous bulk read is stale.
+            self._rx_pending = bytearray()
+
             for i in range(CARD_RESET_SYNC_RETRIES):
                 try:
                     # Send a newline to the Notecard to terminate any partial
@@ -529,21 +979,41 @@ class OpenSerial(Notecard):
                     time.sleep(CARD_RESET_DRAIN_MS / 1000)
                     continue
 
+                sent = start_timeout()
                 something_found = False
                 non_control_char_found = False
-                # Drain serial for 500 ms.
-                start = start_timeout()
-                while not has_timed_out(start, CARD_RESET_DRAIN_MS / 1000):
+                # When the Notecard echoed the newline with nothing but
+                # control characters, and when anything was last received.
+                echo_received = None
+                last_received = None
+                start = sent
+                while True:
                     while self._available():
                         something_found = True
                         data = self._read_byte()
+                        last_received = start_timeout()
                         if data[0] != ord('\n') and data[0] != ord('\r'):
                             non_control_char_found = True
+                            echo_received = None
                             # Reset the timer with each non-control character.
-                            start = start_timeout()
+                            start = last_received
+                        elif (data[0] == ord('\n') and not non_control_char_found
+                              and echo_received is None):
+                            echo_received = last_received
+                            self._reset_echo_received(elapsed_secs(sent))
+
+                    # Once the newline's been echoed, or the Notecard has sent
+                    # something stale, wait for the input to go quiet rather
+                    # than draining for the full CARD_RESET_DRAIN_MS.
+                    if ((echo_received is not None or non_control_char_found)
+                            and has_timed_out(last_received,
+                                              self._reset_quiet_secs)):
+                        break
+                    if has_timed_out(start, CARD_RESET_DRAIN_MS / 1000):
+                        break
 
                     # If there was no data read from the Notecard, wait 1 ms and
-                    # try again. Keep doing this for CARD_RESET_DRAIN_MS.
+                    # try again.
                     time.sleep(.001)
 
                 if not something_found:
@@ -561,12 +1031,12 @@ class OpenSerial(Notecard):
                     notecard_ready = True
                     break
 
+                # Stale data has stopped arriving, or the Notecard didn't answer
+                # within CARD_RESET_DRAIN_MS, so there's nothing to gain by
+                # waiting longer before sending the next newline.
                 if self._debug:
                     print('Retrying reset...')
 
-                # Wait CARD_RESET_DRAIN_MS before trying again.
-                time.sleep(CARD_RESET_DRAIN_MS / 1000)
-
             if not notecard_ready:
                 raise Exception('Failed to reset Notecard.')
 
@@ -597,16 +1067,27 @@ class OpenSerial(Notecard):
         self._user_agent['req_port'] = str(uart_id)
 
         self.uart = uart_id
+        # Bytes read past the end of a response by `_receive_bulk`.
+        self._rx_pending = bytearray()
+        # When the last segment was written, so Reset knows how long the
+        # Notecard may still need to process it.
+        self._last_segment_sent = None
 
         if use_serial_lock:
+            from filelock import FileLock
+
             if lock_path is None:
                 lock_path = os.environ.get('NOTECARD_SERIAL_LOCK_PATH', '/tmp/serial.lock')
-            self.lock_handle = FileLock(lock_path)
+            self.lock_handle = FileLock(
+                lock_path, thread_local=self._serial_lock_thread_local)
         else:
             self.lock_handle = NoOpSerialLock()
 
         if sys.implementation.name == 'micropython':
             self._available = self._available_micropython
+            # MicroPython's uart.any() doesn't reliably report how many bytes
+            # are waiting, so read a byte at a time.
+            self._bulk_receive = False
         else:
             if hasattr(self.uart, 'in_waiting'):
                 self._available = self._available_default
@@ -614,36 +1095,60 @@ class OpenSerial(Notecard):
                 raise NotImplementedError('Serial communications with the ' + \
                                           'Notecard are not supported for ' + \
                                           'this platform.')
-
-        self.Reset()
+            self._bulk_receive = hasattr(self.uart, 'read')
+
+        self._fd = None
+        self._poller = None
+        if use_poll:
+            try:
+                fd = self.uart.fileno()
+            except (AttributeError, OSError, ValueError):
+                fd = None
+
+            if isinstance(fd, int):
+                self._fd = fd
+                self._poller = select.poll()
+                self._poller.register(fd, select.POLLIN)
+
+        if self._reset_on_init:
+            self.Reset()
 
 
 class OpenI2C(Notecard):
     """Notecard class for I2C communication."""
 
     def _read(self, length):
-        """Perform a serial-over-I2C read."""
-        initiate_read = bytearray(2)
-        # 0 indicates we are reading from the Notecard.
-        initiate_read[0] = 0
-        # This indicates how many bytes we are prepared to read.
+        """Perform a serial-over-I2C read.
+
+        The buffers used are allocated once, in __init__, so polling doesn't
+        churn the heap. The data returned is a memoryview of the read buffer,
+        so it's only valid until the next read.
+        """
+        initiate_read = self._initiate_read
+        # This indicates how many bytes we are prepared to read. The first
+        # byte is always 0, which indicates we are reading from the Notecard.
         initiate_read[1] = length
-        # read_buf is a buffer to store the data we're reading.
+        # read_buf is a view of the buffer to store the data we're reading.
         # length accounts for the payload and the +2 is for the header. The
         # header sent by the Notecard has one byte to indicate the number of
         # bytes still available to read and a second byte to indicate the number
-        # of bytes coming in the current packet.
-        read_buf = bytearray(length + 2)
+        # of bytes coming in the current packet. Polls, which only read the
+        # header, and full-size reads use views made up front.
+        if length == 0:
+            read_buf = self._read_header
+            data = b''
+        elif length == self.max:
+            read_buf = self._read_buf
+            data = self._read_data
+        else:
+            read_buf = self._read_buf[:length + 2]
+            data = read_buf[2:]
 
         self._platform_read(initiate_read, read_buf)
-        # First two bytes are the header.
-        header = read_buf[0:2]
         # The number of bytes still available to read after this packet.
-        available = header[0]
+        available = read_buf[0]
         # The number of data bytes in this packet.
-        data_len = header[1]
-        # The rest is the data.
-        data = read_buf[2:]
+        data_len = read_buf[1]
 
         if len(data) != data_len:
             raise Exception('Serial-over-I2C error: reported data length ' + \
@@ -659,11 +1164,16 @@ class OpenI2C(Notecard):
     def receive(self, timeout_secs=CARD_INTRA_TRANSACTION_TIMEOUT_SEC,
                 delay=True):
         """Read a newline-terminated batch of data from the Notecard."""
+        return self._run_steps(self._receive_steps(timeout_secs, delay))
+
+    def _receive_steps(self, timeout_secs, delay):
+        """Yield the steps of `receive`. See `Notecard._run_steps`."""
         read_len = 0
         received_newline = False
         timeout_secs = CARD_INTER_TRANSACTION_TIMEOUT_SEC
         start = start_timeout()
         received_data = bytearray()
+        poll_delay_ms = CARD_I2C_POLL_MIN_MS
 
         while True:
             available, data = self._read(read_len)
@@ -672,6 +1182,7 @@ class OpenI2C(Notecard):
 
                 timeout_secs = CARD_INTRA_TRANSACTION_TIMEOUT_SEC
                 start = start_timeout()
+                poll_delay_ms = CARD_I2C_POLL_MIN_MS
 
                 if not received_newline:
                     received_newline = data[-1] == ord('\n')
@@ -693,12 +1204,19 @@ class OpenI2C(Notecard):
                                 'Notecard.')
 
             if delay:
-                time.sleep(0.05)
+                yield (_STEP_SLEEP, poll_delay_ms / 1000)
+                poll_delay_ms = min(poll_delay_ms * 2, CARD_I2C_POLL_MAX_MS)
 
         return received_data
 
     def transmit(self, data, delay=True):
         """Send `data` to the Notecard."""
+        self._run_steps(self._transmit_steps(data, delay))
+
+    def _transmit_steps(self, data, delay):
+        """Yield the steps of `transmit`. See `Notecard._run_steps`."""
+        # Write chunks as views into `data` rather than copies.
+        data = memoryview(data)
         chunk_offset = 0
         data_left = len(data)
         sent_in_seg = 0
@@ -706,7 +1224,7 @@ class OpenI2C(Notecard):
         while data_left > 0:
             # Delay for 5ms. This prevents a fast host from hammering a
             # slow/busy Notecard with requests.
-            time.sleep(.005)
+            yield (_STEP_SLEEP, .005)
 
             chunk_len = min(data_left, self.max)
             write_data = data[chunk_offset:chunk_offset + chunk_len]
@@ -716,42 +1234,63 @@ class OpenI2C(Notecard):
             data_left -= chunk_len
             sent_in_seg += chunk_len
 
-            # We delay for CARD_REQUEST_SEGMENT_DELAY_MS ms every time a full
+            # We delay for the pacing profile's segment delay every time a full
             # "segment" of data has been transmitted.
             if sent_in_seg > CARD_REQUEST_SEGMENT_MAX_LEN:
                 sent_in_seg -= CARD_REQUEST_SEGMENT_MAX_LEN
 
                 if delay:
-                    time.sleep(CARD_REQUEST_SEGMENT_DELAY_MS / 1000)
+                    yield (_STEP_SLEEP, self._pacing.segment_delay_ms / 1000)
 
             if delay:
-                time.sleep(CARD_REQUEST_I2C_CHUNK_DELAY_MS / 1000)
+                yield (_STEP_SLEEP, self._pacing.chunk_delay_ms / 1000)
 
     def _transact(self, req_bytes, rsp_expected,
                   timeout_secs=CARD_INTER_TRANSACTION_TIMEOUT_SEC):
-        self.transmit(req_bytes)
+        return self._run_steps(
+            self._transact_steps(req_bytes, rsp_expected, timeout_secs))
+
+    def _transact_steps(self, req_bytes, rsp_expected, timeout_secs):
+        """Yield the steps of `_transact`. See `Notecard._run_steps`."""
+        yield (_STEP_TRANSMIT, req_bytes)
+        self._attempt.mark('transmitted')
 
         if not rsp_expected:
             return
 
-        # Delay for 5ms. This prevents a fast host from hammering a slow/busy
-        # Notecard with requests.
-        time.sleep(0.005)
-
-        # Query the Notecard every 50 ms to see if there's data available to
-        # read.
+        # Query the Notecard to see if there's data available to read. Poll
+        # tightly at first, so quick requests like card.version are picked up
+        # within a few milliseconds, then back off so a slow request doesn't
+        # hammer a busy Notecard.
         start = start_timeout()
-        available = 0
-        while available == 0:
+        poll_delay_ms = self._response_poll_start_ms(timeout_secs)
+        while True:
+            yield (_STEP_SLEEP, poll_delay_ms / 1000)
+
             available, _ = self._read(0)
+            if available > 0:
+                break
 
             if timeout_secs != 0 and has_timed_out(start, timeout_secs):
                 raise Exception('Timed out while querying Notecard for ' + \
                                 'available data.')
 
-            time.sleep(0.05)
+            poll_delay_ms = min(poll_delay_ms * 2, CARD_I2C_POLL_MAX_MS)
 
-        return self.receive()
+        self._attempt.mark('first_byte')
+        return (yield (_STEP_RECEIVE,))
+
+    def _response_poll_start_ms(self, timeout_secs):
+        """Pick the initial response poll delay for a transaction.
+
+        `timeout_secs` comes from `_transaction_timeout_seconds`. A longer than
+        usual timeout means the request goes out to the network (e.g. web.*),
+        so there's no point polling for the response every millisecond.
+        """
+        if timeout_secs > CARD_INTER_TRANSACTION_TIMEOUT_SEC:
+            return CARD_I2C_POLL_NETWORK_MS
+
+        return CARD_I2C_POLL_MIN_MS
 
     def Reset(self):
         """Reset the Notecard."""
@@ -773,12 +1312,18 @@ class OpenI2C(Notecard):
                     time.sleep(CARD_REQUEST_I2C_NACK_WAIT_MS / 1000)
                     continue
 
-                time.sleep(CARD_REQUEST_SEGMENT_DELAY_MS / 1000)
-
+                sent = start_timeout()
                 something_found = False
                 non_control_char_found = False
-
-                start = start_timeout()
+                # When the Notecard echoed the newline with nothing but
+                # control characters, and when anything was last received.
+                echo_received = None
+                last_received = None
+
+                # Poll for the echo the way _transact polls for a response,
+                # rather than waiting a full segment delay up front.
+                poll_delay_ms = CARD_I2C_POLL_MIN_MS
+                start = sent
                 read_len = 0
                 while not has_timed_out(start, CARD_RESET_DRAIN_MS / 1000):
                     try:
@@ -786,11 +1331,13 @@ class OpenI2C(Notecard):
                     except Exception as e:
                         if self._debug:
                             print(e)
-                        time.sleep(CARD_REQUEST_SEGMENT_DELAY_MS / 1000)
+                        time.sleep(self._pacing.segment_delay_ms / 1000)
                         continue
 
                     if len(data) > 0:
                         something_found = True
+                        last_received = start_timeout()
+                        poll_delay_ms = CARD_I2C_POLL_MIN_MS
                         # The Notecard responds to a bare `\n` with `\r\n`. If
                         # we get any other characters back, it means the host
                         # and Notecard aren't synced up yet, and we need to
@@ -798,13 +1345,33 @@ class OpenI2C(Notecard):
                         for byte in data:
                             if byte != ord('\n') and byte != ord('\r'):
                                 non_control_char_found = True
+                                echo_received = None
                                 # Reset the timer with each non-control
                                 # character.
-                                start = start_timeout()
+                                start = last_received
+                            elif (byte == ord('\n')
+                                  and not non_control_char_found
+                                  and echo_received is None):
+                                echo_received = last_received
+                                self._reset_echo_received(elapsed_secs(sent))
 
                     read_len = min(available, self.max)
 
-                    time.sleep(CARD_REQUEST_I2C_CHUNK_DELAY_MS / 1000)
+                    # Once the newline's been echoed, or the Notecard has sent
+                    # something stale, stop as soon as there's nothing more to
+                    # read for the quiet time.
+                    if (read_len == 0 and last_received is not None
+                            and (echo_received is not None
+                                 or non_control_char_found)
+                            and has_timed_out(last_received,
+                                              self._reset_quiet_secs)):
+                        break
+
+                    # Like receive, read what's available straight away.
+                    if read_len == 0:
+                        time.sleep(poll_delay_ms / 1000)
+                        poll_delay_ms = min(poll_delay_ms * 2,
+                                            CARD_I2C_POLL_MAX_MS)
 
                 if not something_found:
                     if self._debug:
@@ -821,11 +1388,11 @@ class OpenI2C(Notecard):
                     notecard_ready = True
                     break
 
+                # Stale data has stopped arriving, or the Notecard didn't answer
+                # within CARD_RESET_DRAIN_MS, so there's nothing to gain by
+                # waiting longer before sending the next newline.
                 if self._debug:
                     print('Retrying reset...')
-
-                # Wait CARD_RESET_DRAIN_MS before trying again.
-                time.sleep(CARD_RESET_DRAIN_MS / 1000)
         finally:
             self.unlock()
 
@@ -836,7 +1403,7 @@ class OpenI2C(Notecard):
 
     def _cpython_write(self, length, data):  # noqa: D403
         """CPython implementation of serial-over-I2C write."""
-        msgs = [I2C.Message(length + data)]
+        msgs = [self._i2c_message(length + data)]
         self.i2c.transfer(self.addr, msgs)
 
     def _non_cpython_write(self, length, data):
@@ -845,13 +1412,19 @@ class OpenI2C(Notecard):
 
     def _cpython_read(self, initiate_read_msg, read_buf):  # noqa: D403
         """CPython implementation of serial-over-I2C read."""
-        msgs = [
-            I2C.Message(initiate_read_msg),
-            I2C.Message(read_buf, read=True)
-        ]
+        # periphery doesn't take memoryviews, and swaps the data read into the
+        # message as a new buffer of the same length rather than filling the
+        # one given. That buffer serves as the placeholder for the next read
+        # of that length, so read messages are kept, one per length, instead
+        # of allocating a placeholder for every read.
+        length = len(read_buf)
+        read_msg = self._read_msgs.get(length)
+        if read_msg is None:
+            read_msg = self._i2c_message(bytearray(length), read=True)
+            self._read_msgs[length] = read_msg
+        msgs = [self._i2c_message(initiate_read_msg), read_msg]
         self.i2c.transfer(self.addr, msgs)
-        read_bytes = msgs[1].data
-        read_buf[:len(read_bytes)] = read_bytes
+        read_buf[:] = read_msg.data
 
     def _micropython_read(self, initiate_read_msg, read_buf):  # noqa: D403
         """MicroPython implementation of serial-over-I2C read."""
@@ -912,6 +1485,12 @@ class OpenI2C(Notecard):
         else:
             self.max = max_transfer
 
+        # Buffers reused by every _read. See _read for their layout.
+        self._initiate_read = bytearray(2)
+        self._read_buf = memoryview(bytearray(self.max + 2))
+        self._read_header = self._read_buf[:2]
+        self._read_data = self._read_buf[2:]
+
         if sys.implementation.name == 'micropython':
             self._platform_write = self._non_cpython_write
             self._platform_read = self._micropython_read
@@ -919,7 +1498,12 @@ class OpenI2C(Notecard):
             self._platform_write = self._non_cpython_write
             self._platform_read = self._circuitpython_read
         else:
+            from periphery import I2C
+
+            self._i2c_message = I2C.Message
+            self._read_msgs = {}
             self._platform_write = self._cpython_write
             self._platform_read = self._cpython_read
 
-        self.Reset()
+        if self._reset_on_init:
+            self.Reset()
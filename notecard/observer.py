@@ -0,0 +1,206 @@
+"""Per-transaction timing records for Notecard observers."""
+
+##
+# @file observer.py
+#
+# @brief Per-transaction timing records for Notecard observers.
+#
+# @section description Description
+# Functions registered with Notecard.AddObserver are called with a
+# TransactionRecord after every transaction. The record holds monotonic
+# timestamps for each phase of the transaction and a TransactionAttempt for
+# each time the request was sent, so slow transactions can be broken down into
+# reset, lock wait, transmit (including pacing), waiting for the first byte of
+# the response, receiving and retries.
+#
+# When no observer is registered, the Notecard uses the shared null record and
+# attempt defined here, whose methods do nothing.
+
+import time
+
+if hasattr(time, 'monotonic'):
+    monotonic = time.monotonic
+else:
+    def monotonic():
+        """Return a monotonic clock reading in seconds."""
+        return time.ticks_ms() / 1000
+
+# Attempt outcomes that cause the request to be retried.
+RETRY_OUTCOMES = ('crc', 'seq', 'parse', 'io', 'transport')
+
+
+class TransactionAttempt:
+    """One attempt at sending a request and reading the response.
+
+    Attributes:
+        timestamps (dict): Monotonic times, in seconds, keyed by phase:
+            'start' (before transmitting), 'transmitted', 'first_byte' (the
+            response started to arrive), 'received', 'end', and
+            'reset_start'/'reset_end' if the attempt was followed by a reset.
+        bytes_sent (int): Bytes of request sent.
+        bytes_received (int): Bytes of response received.
+        outcome (str): 'ok', 'heartbeat', 'bad-bin', or one of the retried
+            outcomes 'crc', 'seq' (the response's sequence number didn't
+            match the request's), 'parse', 'io' (an `{io}` error response)
+            and 'transport' (the transport raised).
+    """
+
+    def __init__(self, bytes_sent):
+        """Start an attempt to send `bytes_sent` bytes."""
+        self.timestamps = {'start': monotonic()}
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        self.outcome = None
+
+    def mark(self, phase):
+        """Record that `phase` was reached now."""
+        self.timestamps[phase] = monotonic()
+
+    def received(self, nbytes):
+        """Record that a response of `nbytes` bytes has been received."""
+        self.timestamps['received'] = monotonic()
+        self.bytes_received = nbytes
+
+    def set_outcome(self, outcome):
+        """Record the outcome of the attempt, unless one is already set."""
+        if self.outcome is None:
+            self.outcome = outcome
+
+    def to_dict(self):
+        """Return the attempt as a dict."""
+        return {
+            'timestamps': dict(self.timestamps),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'outcome': self.outcome,
+        }
+
+
+class TransactionRecord:
+    """Timing and outcome of one Notecard transaction.
+
+    Attributes:
+        req (str): The request (or command) name.
+        timestamps (dict): Monotonic times, in seconds, keyed by phase:
+            'start', 'encoded', 'reset_start'/'reset_end' (if a reset was
+            required before sending), 'tm_start'/'tm_end' (starting the
+            transaction manager), 'lock_start'/'lock_end' and 'end'.
+        attempts (list): A TransactionAttempt for each time the request was
+            sent.
+        error (str): The error the transaction failed with, or None.
+    """
+
+    def __init__(self, req):
+        """Start a record for the request `req`."""
+        self.timestamps = {'start': monotonic()}
+        self.req = req.get('req', req.get('cmd'))
+        self.attempts = []
+        self.error = None
+
+    def mark(self, phase):
+        """Record that `phase` was reached now."""
+        self.timestamps[phase] = monotonic()
+
+    def begin_attempt(self, bytes_sent):
+        """Start and return a new TransactionAttempt."""
+        attempt = TransactionAttempt(bytes_sent)
+        self.attempts.append(attempt)
+        return attempt
+
+    def count(self, outcome):
+        """Return the number of attempts with the given outcome."""
+        return sum(1 for a in self.attempts if a.outcome == outcome)
+
+    @property
+    def bytes_sent(self):
+        """Return the bytes sent over all attempts."""
+        return sum(a.bytes_sent for a in self.attempts)
+
+    @property
+    def bytes_received(self):
+        """Return the bytes received over all attempts."""
+        return sum(a.bytes_received for a in self.attempts)
+
+    @property
+    def retries(self):
+        """Return the number of attempts that failed and were retried.
+
+        The last attempt is never retried, whatever its outcome.
+        """
+        return sum(1 for a in self.attempts[:-1]
+                   if a.outcome in RETRY_OUTCOMES)
+
+    @property
+    def resets(self):
+        """Return the number of times the Notecard was reset."""
+        return (('reset_start' in self.timestamps)
+                + sum(1 for a in self.attempts
+                      if 'reset_start' in a.timestamps))
+
+    def durations(self):
+        """Return the time spent in each phase, in seconds.
+
+        Phases that didn't happen are left out. 'reset', 'transmit', 'wait'
+        (for the first byte of the response) and 'receive' are summed over
+        all attempts.
+        """
+        durations = {}
+
+        def add(name, times, start, end):
+            if start in times and end in times:
+                durations[name] = (durations.get(name, 0)
+                                   + times[end] - times[start])
+
+        add('encode', self.timestamps, 'start', 'encoded')
+        add('reset', self.timestamps, 'reset_start', 'reset_end')
+        add('transaction_manager', self.timestamps, 'tm_start', 'tm_end')
+        add('lock_wait', self.timestamps, 'lock_start', 'lock_end')
+        for attempt in self.attempts:
+            times = attempt.timestamps
+            add('transmit', times, 'start', 'transmitted')
+            add('wait', times, 'transmitted', 'first_byte')
+            add('receive', times, 'first_byte', 'received')
+            add('reset', times, 'reset_start', 'reset_end')
+        add('total', self.timestamps, 'start', 'end')
+
+        return durations
+
+    def to_dict(self):
+        """Return the record as a dict."""
+        return {
+            'req': self.req,
+            'timestamps': dict(self.timestamps),
+            'attempts': [a.to_dict() for a in self.attempts],
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'retries': self.retries,
+            'resets': self.resets,
+            'error': self.error,
+        }
+
+
+class _NullAttempt:
+    """Stands in for a TransactionAttempt when nothing is observing."""
+
+    def mark(self, phase):
+        pass
+
+    def received(self, nbytes):
+        pass
+
+    def set_outcome(self, outcome):
+        pass
+
+
+class _NullRecord:
+    """Stands in for a TransactionRecord when nothing is observing."""
+
+    def mark(self, phase):
+        pass
+
+    def begin_attempt(self, bytes_sent):
+        return NULL_ATTEMPT
+
+
+NULL_ATTEMPT = _NullAttempt()
+NULL_RECORD = _NullRecord()
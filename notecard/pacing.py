@@ -0,0 +1,180 @@
+"""Pacing profiles for writes to the Notecard."""
+
+##
+# @file pacing.py
+#
+# @brief Pacing profiles for writes to the Notecard.
+#
+# @section description Description
+# The Notecard has a fixed size interrupt buffer, so requests are written to it
+# in segments (and, over I2C, chunks) with a pause after each. This module
+# holds the pause lengths in a PacingProfile, provides conservative, default
+# and aggressive presets, and can calibrate a profile against the attached
+# Notecard.
+
+import json
+
+from notecard.retry import NO_RETRY
+
+# Segment and chunk delays, in milliseconds, for each preset. The default
+# preset uses the delays recommended by the serial-over-I2C protocol guide.
+PACING_PRESETS = {
+    'conservative': (500, 50),
+    'default': (250, 20),
+    'aggressive': (50, 5),
+}
+
+# Candidate (segment delay, chunk delay) pairs tried by calibrate, slowest
+# first.
+CALIBRATION_CANDIDATES = [
+    (250, 20),
+    (150, 15),
+    (100, 10),
+    (50, 5),
+    (25, 2),
+    (10, 1),
+]
+CALIBRATION_PROBES = 3
+
+
+class PacingProfile:
+    """Delays used to pace writes to the Notecard.
+
+    Attributes:
+        segment_delay_ms (int): Pause after each segment of
+            CARD_REQUEST_SEGMENT_MAX_LEN bytes.
+        chunk_delay_ms (int): Pause after each I2C chunk.
+        name (str): A label for the profile.
+    """
+
+    def __init__(self, segment_delay_ms, chunk_delay_ms, name='custom'):
+        """Create a profile with the given delays."""
+        if segment_delay_ms < 0 or chunk_delay_ms < 0:
+            raise ValueError('Pacing delays must not be negative.')
+
+        self.segment_delay_ms = segment_delay_ms
+        self.chunk_delay_ms = chunk_delay_ms
+        self.name = name
+
+    def __repr__(self):
+        """Return a string representation of the profile."""
+        return (f'PacingProfile({self.segment_delay_ms}, '
+                f'{self.chunk_delay_ms}, name={self.name!r})')
+
+    def __eq__(self, other):
+        """Compare two profiles by their delays."""
+        return (isinstance(other, PacingProfile)
+                and self.segment_delay_ms == other.segment_delay_ms
+                and self.chunk_delay_ms == other.chunk_delay_ms)
+
+    @classmethod
+    def preset(cls, name):
+        """Return the preset profile called `name`."""
+        if name not in PACING_PRESETS:
+            raise ValueError(f'Unknown pacing preset: {name}.')
+
+        segment_delay_ms, chunk_delay_ms = PACING_PRESETS[name]
+        return cls(segment_delay_ms, chunk_delay_ms, name=name)
+
+    def to_dict(self):
+        """Return the profile as a dict."""
+        return {
+            'name': self.name,
+            'segment_delay_ms': self.segment_delay_ms,
+            'chunk_delay_ms': self.chunk_delay_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        """Create a profile from a dict produced by `to_dict`."""
+        return cls(d['segment_delay_ms'], d['chunk_delay_ms'],
+                   name=d.get('name', 'custom'))
+
+    def save(self, path):
+        """Save the profile to `path` as JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """Load a profile saved with `save`."""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def _probe_ok(card, probe_req):
+    """Send `probe_req` and report whether the Notecard handled it cleanly.
+
+    Probes aren't retried, so a profile that only works some of the time
+    fails.
+    """
+    try:
+        rsp = card.Transaction(probe_req, retry_policy=NO_RETRY)
+    except Exception as e:
+        if card._debug:
+            print(e)
+        return False
+
+    return 'err' not in rsp or '{io}' not in rsp['err']
+
+
+def calibrate(card, probe_req=None, probes=CALIBRATION_PROBES,
+              candidates=None, path=None):
+    """Find the fastest pacing profile the attached Notecard handles reliably.
+
+    Candidate delays are tried from slowest to fastest. Each candidate must
+    get `probes` clean responses to `probe_req` in a row; calibration stops at
+    the first candidate that causes an `{io}` error or a failed transaction.
+    The fastest passing candidate is applied to `card` and returned.
+
+    Args:
+        card (Notecard): The Notecard object.
+        probe_req (dict, optional): The request used to exercise the link.
+            Defaults to a card.version request padded so that it spans
+            several segments.
+        probes (int): Number of probe requests per candidate.
+        candidates (list, optional): (segment_delay_ms, chunk_delay_ms)
+            pairs, slowest first. Defaults to `CALIBRATION_CANDIDATES`.
+        path (str, optional): If given, save the resulting profile here.
+
+    Returns:
+        PacingProfile: The calibrated profile.
+
+    Raises:
+        Exception: If even the slowest candidate fails.
+    """
+    if probe_req is None:
+        probe_req = {'req': 'card.version', 'pad': 'x' * 700}
+    if candidates is None:
+        candidates = CALIBRATION_CANDIDATES
+
+    original = card.GetPacingProfile()
+    best = None
+    for segment_delay_ms, chunk_delay_ms in candidates:
+        profile = PacingProfile(segment_delay_ms, chunk_delay_ms,
+                                name='calibrated')
+        card.SetPacingProfile(profile)
+
+        passed = True
+        for _ in range(probes):
+            if not _probe_ok(card, probe_req):
+                passed = False
+                break
+
+        if not passed:
+            if card._debug:
+                print(f'Pacing calibration: {profile} failed.')
+            break
+
+        best = profile
+
+    if best is None:
+        card.SetPacingProfile(original)
+        raise Exception('Pacing calibration failed: the Notecard did not '
+                        'respond cleanly to any candidate profile.')
+
+    card.SetPacingProfile(best)
+    if path is not None:
+        best.save(path)
+
+    return best
@@ -0,0 +1,333 @@
+"""A pool of Notecards driven in parallel."""
+
+##
+# @file pool.py
+#
+# @brief Drive several Notecards on separate ports and buses in parallel.
+#
+# @section description Description
+# A NotecardPool opens a set of Notecards concurrently, so their resets
+# overlap, and gives each one a TransactionDispatcher worker thread. Requests
+# can be fanned out to every card with `map` or routed to the least busy card
+# with `submit`. Cards that keep failing, at open, in requests or in health
+# checks, are dropped from the pool; a card that hangs only ties up its own
+# worker thread. This module is CPython-only.
+
+import threading
+from concurrent.futures import Future, TimeoutError, wait
+
+from notecard.dispatcher import TransactionDispatcher
+
+# Consecutive failures after which a card is dropped from the pool.
+POOL_MAX_FAILURES = 3
+# How long, in seconds, a health check waits for each card.
+POOL_HEALTH_TIMEOUT_SECS = 5
+POOL_HEALTH_REQUEST = {'req': 'card.version'}
+# How long, in seconds, the pool waits for its cards to open.
+POOL_OPEN_TIMEOUT_SECS = 30
+
+
+class _PoolFuture(Future):
+    """A Future for a pool request, noting whether its outcome is counted.
+
+    Each request counts once towards its card's failures: when it completes,
+    or when `map` gives up waiting for it, whichever comes first.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.counted = False
+
+
+def _open(opener, future):
+    """Open a card with `opener`, setting `future` to the result."""
+    try:
+        future.set_result(opener())
+    except Exception as e:
+        future.set_exception(e)
+
+
+class PoolMember:
+    """A Notecard in a NotecardPool.
+
+    Attributes:
+        name: The card's name in the pool.
+        card (Notecard): The Notecard, or None if it failed to open.
+        alive (bool): False once the card has been dropped from the pool.
+        in_flight (int): Requests submitted to the card and not yet done.
+        failures (int): Consecutive failed requests.
+        last_error (Exception): The most recent failure, if any.
+    """
+
+    def __init__(self, name):
+        """Create a member that hasn't been opened yet."""
+        self.name = name
+        self.card = None
+        self.dispatcher = None
+        self.alive = False
+        self.in_flight = 0
+        self.failures = 0
+        self.last_error = None
+
+
+class NotecardPool:
+    """A set of Notecards, each with its own worker thread.
+
+    Example:
+        pool = NotecardPool({
+            'uart0': lambda: notecard.OpenSerial(serial.Serial('/dev/ttyS0')),
+            'uart1': lambda: notecard.OpenSerial(serial.Serial('/dev/ttyS1')),
+            'i2c1': lambda: notecard.OpenI2C(I2C('/dev/i2c-1'), 0, 0),
+        })
+        versions = pool.map({'req': 'card.version'}, timeout=5)
+        pool.submit({'req': 'note.add', 'body': {...}}).result()
+        pool.close()
+    """
+
+    def __init__(self, openers, max_failures=POOL_MAX_FAILURES,
+                 health_req=None, debug=False,
+                 open_timeout=POOL_OPEN_TIMEOUT_SECS):
+        """Open every Notecard in parallel.
+
+        Args:
+            openers (dict): Maps a name for each card to a callable that opens
+                and returns it, e.g. by constructing an OpenSerial, which
+                resets the Notecard. A list of callables is named by index.
+            max_failures (int): Consecutive failures after which a card is
+                dropped.
+            health_req (dict): The request sent by `check_health`. Defaults to
+                a card.version request.
+            debug (bool): Print why cards are dropped.
+            open_timeout (float): Seconds to wait for the cards to open.
+                Cards that take longer, e.g. because their reset hangs, are
+                left out of the pool, and their openers left running.
+
+        Raises:
+            Exception: If none of the cards could be opened.
+        """
+        if not isinstance(openers, dict):
+            openers = dict(enumerate(openers))
+
+        self._max_failures = max_failures
+        self._health_req = health_req or POOL_HEALTH_REQUEST
+        self._debug = debug
+        self._lock = threading.Lock()
+        self._members = {name: PoolMember(name) for name in openers}
+        # Breaks ties between equally busy cards, so they take turns.
+        self._next = 0
+
+        # Each card is opened on a daemon thread rather than by an executor,
+        # whose threads would keep the process from exiting while an opener
+        # hangs.
+        futures = {}
+        for name, opener in openers.items():
+            future = futures[name] = Future()
+            threading.Thread(target=_open, args=(opener, future),
+                             name=f'notecard-pool-open-{name}',
+                             daemon=True).start()
+        wait(futures.values(), timeout=open_timeout)
+
+        for name, future in futures.items():
+            member = self._members[name]
+            if not future.done():
+                member.last_error = TimeoutError(
+                    f'Notecard {name!r} didn\'t open within {open_timeout} '
+                    'seconds.')
+                if self._debug:
+                    print(member.last_error)
+                continue
+
+            try:
+                member.card = future.result()
+            except Exception as e:
+                member.last_error = e
+                if self._debug:
+                    print(f'Notecard {name!r} failed to open: {e}')
+                continue
+
+            member.dispatcher = TransactionDispatcher(member.card)
+            member.alive = True
+
+        if not self.healthy():
+            raise Exception('None of the Notecards in the pool could be '
+                            'opened.')
+
+    def __enter__(self):
+        """Return the pool for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the pool."""
+        self.close()
+
+    @property
+    def members(self):
+        """Return the PoolMembers, by name, including dropped ones."""
+        return dict(self._members)
+
+    def healthy(self):
+        """Return the names of the cards still in the pool."""
+        with self._lock:
+            return [m.name for m in self._members.values() if m.alive]
+
+    def card(self, name):
+        """Return the Notecard called `name`."""
+        return self._members[name].card
+
+    def submit(self, req):
+        """Send `req` to the least busy card and return a Future.
+
+        The card with the fewest requests in flight gets the request. The
+        Future's result is the response, or the exception the transaction
+        raised. It can't be cancelled.
+        """
+        with self._lock:
+            alive = [m for m in self._members.values() if m.alive]
+            if not alive:
+                raise Exception('No healthy Notecards in the pool.')
+
+            self._next = (self._next + 1) % len(alive)
+            rotated = alive[self._next:] + alive[:self._next]
+            member = min(rotated, key=lambda m: m.in_flight)
+            member.in_flight += 1
+
+        return self._submit_to(member, req)
+
+    def submit_to(self, name, req):
+        """Send `req` to the card called `name` and return a Future."""
+        member = self._members[name]
+        with self._lock:
+            if not member.alive:
+                raise Exception(f'Notecard {name!r} is not in the pool.')
+            member.in_flight += 1
+
+        return self._submit_to(member, req)
+
+    def map(self, req, timeout=None):
+        """Send `req` to every card and wait for their responses.
+
+        Returns:
+            dict: The response from each card, by name, or the exception its
+                transaction raised. Cards that haven't answered within
+                `timeout` seconds get a `concurrent.futures.TimeoutError`,
+                which counts as a failure.
+        """
+        futures = {}
+        for name in self.healthy():
+            try:
+                futures[name] = self.submit_to(name, req)
+            except Exception as e:
+                futures[name] = None
+                if self._debug:
+                    print(e)
+
+        pending = [f for f in futures.values() if f is not None]
+        wait(pending, timeout=timeout)
+
+        results = {}
+        for name, future in futures.items():
+            if future is None:
+                continue
+            if not future.done():
+                error = TimeoutError(f'Notecard {name!r} did not respond '
+                                     f'within {timeout} seconds.')
+                if self._count(future):
+                    self._record_failure(self._members[name], error)
+                results[name] = error
+            elif future.exception() is not None:
+                results[name] = future.exception()
+            else:
+                results[name] = future.result()
+
+        return results
+
+    def check_health(self, timeout=POOL_HEALTH_TIMEOUT_SECS):
+        """Send the health request to every card and drop dead ones.
+
+        A card that raises or doesn't answer within `timeout` seconds has a
+        failure counted against it, and is dropped after `max_failures` in a
+        row. Slow or dead cards don't hold up the others beyond `timeout`.
+
+        Returns:
+            dict: Whether each card still in the pool answered, by name.
+        """
+        results = self.map(self._health_req, timeout=timeout)
+        return {name: not isinstance(result, Exception)
+                for name, result in results.items()}
+
+    def close(self, wait=True):
+        """Stop every card's worker thread.
+
+        Requests already queued are still sent. If `wait` is True, block until
+        they have been, except on cards that have been dropped.
+        """
+        with self._lock:
+            # Dropped cards' dispatchers have already been closed.
+            members = [m for m in self._members.values() if m.alive]
+            for member in members:
+                member.alive = False
+
+        for member in members:
+            member.dispatcher.close(wait=wait)
+
+    def _submit_to(self, member, req):
+        try:
+            inner = member.dispatcher.submit(req)
+        except Exception as e:
+            self._finish(member, e)
+            raise
+
+        # Hand back a Future that's only resolved once the card's failure
+        # count is up to date, so whoever waits on it sees the card dropped.
+        # It's already running, so it can't be cancelled.
+        future = _PoolFuture()
+        future.set_running_or_notify_cancel()
+
+        def done(inner):
+            error = inner.exception()
+            with self._lock:
+                member.in_flight -= 1
+            if self._count(future):
+                self._record_outcome(member, error)
+            if error is None:
+                future.set_result(inner.result())
+            else:
+                future.set_exception(error)
+
+        inner.add_done_callback(done)
+        return future
+
+    def _count(self, future):
+        """Return True if `future`'s outcome hasn't been counted yet."""
+        with self._lock:
+            if future.counted:
+                return False
+            future.counted = True
+            return True
+
+    def _finish(self, member, error):
+        with self._lock:
+            member.in_flight -= 1
+        self._record_outcome(member, error)
+
+    def _record_outcome(self, member, error):
+        if error is None:
+            with self._lock:
+                member.failures = 0
+        else:
+            self._record_failure(member, error)
+
+    def _record_failure(self, member, error):
+        with self._lock:
+            member.failures += 1
+            member.last_error = error
+            drop = member.alive and member.failures >= self._max_failures
+            if drop:
+                member.alive = False
+
+        if drop:
+            if self._debug:
+                print(f'Dropping Notecard {member.name!r} from the pool: '
+                      f'{error}')
+            # Don't wait: the card's worker may be stuck in a transaction.
+            member.dispatcher.close(wait=False)
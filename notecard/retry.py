@@ -0,0 +1,179 @@
+"""Retry policies for Notecard transactions."""
+
+##
+# @file retry.py
+#
+# @brief Retry policies for Notecard transactions.
+#
+# @section description Description
+# A RetryPolicy decides whether, and after how long, Notecard.Transaction
+# retries a request that failed. Failures come in three kinds, each with its
+# own RetryRule: bad responses (a CRC or sequence number mismatch or a
+# response that isn't valid JSON), `{io}` errors from the Notecard, which use
+# the bad response rule unless given their own, and transport errors (the
+# transport raised, e.g. on a timeout). Rules can back off exponentially with
+# jitter, and a policy can bound the total time spent on a request and opt
+# requests out of retries by name.
+#
+# The default policy matches the library's long-standing behavior: up to
+# CARD_TRANSACTION_RETRIES attempts, 500 ms apart, with a reset before
+# retrying after a transport error.
+
+import random
+
+from notecard.timeout import start_timeout, elapsed_secs
+
+# The number of attempts the default policy makes at a request.
+RETRY_MAX_ATTEMPTS = 5
+# The default delay, in seconds, before retrying.
+RETRY_DELAY_SECS = 0.5
+
+# The kinds of failure passed to RetryState.next_delay.
+RESPONSE_ERROR = 'response'
+IO_ERROR = 'io'
+TRANSPORT_ERROR = 'transport'
+
+
+class RetryRule:
+    """How to retry after one kind of failure.
+
+    The delay before the nth retry of this kind is
+    `delay_secs * backoff ** (n - 1)`, capped at `max_delay_secs`. With
+    `jitter` set, a random fraction of up to `jitter` of that delay is taken
+    off, so hosts sharing a bus don't retry in lockstep; `jitter=1` gives
+    "full jitter".
+
+    Attributes:
+        max_retries (int): Retries allowed for this kind of failure, or None
+            to only be limited by the policy.
+        delay_secs (float): Delay before the first retry.
+        backoff (float): Factor the delay grows by with each retry.
+        max_delay_secs (float): Cap on the delay, or None.
+        jitter (float): Fraction of the delay, from 0 to 1, to randomize.
+        reset (bool): Reset the Notecard before retrying.
+    """
+
+    def __init__(self, max_retries=None, delay_secs=RETRY_DELAY_SECS,
+                 backoff=1, max_delay_secs=None, jitter=0, reset=False):
+        """Create a rule."""
+        if delay_secs < 0 or backoff < 1:
+            raise ValueError('Retry delay must not be negative and backoff '
+                             'must be at least 1.')
+        if not 0 <= jitter <= 1:
+            raise ValueError('Retry jitter must be between 0 and 1.')
+
+        self.max_retries = max_retries
+        self.delay_secs = delay_secs
+        self.backoff = backoff
+        self.max_delay_secs = max_delay_secs
+        self.jitter = jitter
+        self.reset = reset
+
+    def delay(self, retry_number):
+        """Return the delay, in seconds, before retry number `retry_number`."""
+        delay_secs = self.delay_secs * self.backoff ** (retry_number - 1)
+        if self.max_delay_secs is not None:
+            delay_secs = min(delay_secs, self.max_delay_secs)
+        if self.jitter:
+            delay_secs -= delay_secs * self.jitter * random.random()
+        return delay_secs
+
+
+class RetryPolicy:
+    """When and how Notecard.Transaction retries a failed request.
+
+    Attach a policy to a Notecard with `Notecard.SetRetryPolicy`, or pass one
+    to a single `Notecard.Transaction` call.
+
+    Attributes:
+        max_attempts (int): Attempts at a request, including the first.
+        crc (RetryRule): Rule for bad responses: CRC and sequence number
+            mismatches and responses that can't be decoded.
+        transport (RetryRule): Rule for transport errors.
+        io (RetryRule): Rule for `{io}` errors, or None to retry them like
+            bad responses, with `crc`. With an `io` rule, an `{io}` error
+            that isn't retried is returned by Transaction, like other error
+            responses, rather than raised, so the caller can tell it apart
+            from the Notecard failing to answer.
+        deadline_secs (float): If set, no retry is started that would begin
+            more than this long after the request was first sent.
+        no_retry (tuple): Names of requests that are never retried, e.g.
+            ones that aren't safe to repeat.
+    """
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, crc=None,
+                 transport=None, deadline_secs=None, no_retry=(), io=None):
+        """Create a policy. Rules default to those of the default policy."""
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1.')
+
+        self.max_attempts = max_attempts
+        self.crc = crc if crc is not None else RetryRule()
+        self.transport = (transport if transport is not None
+                          else RetryRule(reset=True))
+        self.deadline_secs = deadline_secs
+        self.no_retry = tuple(no_retry)
+        self.io = io
+
+    def with_io(self, io):
+        """Return a copy of this policy with `io` as its `{io}` error rule."""
+        return RetryPolicy(self.max_attempts, self.crc, self.transport,
+                           self.deadline_secs, self.no_retry, io)
+
+    def start(self, req):
+        """Return the RetryState for a transaction of `req`."""
+        name = req.get('req', req.get('cmd'))
+        max_attempts = 1 if name in self.no_retry else self.max_attempts
+        return RetryState(self, max_attempts)
+
+
+class RetryState:
+    """Tracks the retries of one transaction against its RetryPolicy."""
+
+    def __init__(self, policy, max_attempts):
+        """Start tracking a transaction."""
+        self._policy = policy
+        self._attempts_left = max_attempts - 1
+        self._retries = {}
+        self._start = start_timeout()
+
+    def rule(self, kind):
+        """Return the rule for RESPONSE_ERROR, IO_ERROR or TRANSPORT_ERROR."""
+        if kind == TRANSPORT_ERROR:
+            return self._policy.transport
+        if kind == IO_ERROR and self._policy.io is not None:
+            return self._policy.io
+        return self._policy.crc
+
+    def next_delay(self, kind):
+        """Return the delay before retrying after a `kind` failure, or None.
+
+        `kind` is RESPONSE_ERROR, IO_ERROR or TRANSPORT_ERROR. None means
+        the request shouldn't be retried. Otherwise, the retry is counted
+        against the policy.
+        """
+        if self._attempts_left <= 0:
+            return None
+
+        if kind == IO_ERROR and self._policy.io is None:
+            # Without their own rule, {io} errors count as bad responses.
+            kind = RESPONSE_ERROR
+
+        rule = self.rule(kind)
+        retries = self._retries.get(kind, 0) + 1
+        if rule.max_retries is not None and retries > rule.max_retries:
+            return None
+
+        delay_secs = rule.delay(retries)
+        deadline_secs = self._policy.deadline_secs
+        if (deadline_secs is not None
+                and elapsed_secs(self._start) + delay_secs > deadline_secs):
+            return None
+
+        self._attempts_left -= 1
+        self._retries[kind] = retries
+        return delay_secs
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -36,3 +36,19 @@ def has_timed_out(start, timeout_secs):
 def start_timeout():
     """Start the timeout interval for I2C communication."""
     return ticks_ms() if not use_rtc else time.time()
+
+
+def elapsed_secs(start):
+    """Return the time, in seconds, since `start`."""
+    if not use_rtc:
+        return ticks_diff(ticks_ms(), start) / 1000
+    else:
+        return time.time() - start
+
+
+def remaining_secs(start, timeout_secs):
+    """Return the time left, in seconds, before a timeout interval expires."""
+    if not use_rtc:
+        return timeout_secs - ticks_diff(ticks_ms(), start) / 1000
+    else:
+        return start + timeout_secs - time.time()
@@ -1,10 +1,13 @@
 """High-speed binary file upload to Notehub via the Notecard."""
 
+import json
+import os
 import sys
 import time
 
 from notecard.cobs import cobs_encode
 from notecard.notecard import Notecard
+from notecard.retry import RetryRule
 
 if sys.implementation.name == 'cpython':
     import hashlib
@@ -13,11 +16,44 @@ if sys.implementation.name == 'cpython':
         """Create an MD5 digest of the given data."""
         return hashlib.md5(data).hexdigest()
 else:
-    from .md5 import digest as _md5_hash
+    def _md5_hash(data):
+        """Create an MD5 digest of the given data.
+
+        The pure-Python MD5 is only loaded the first time it's needed.
+        """
+        from .md5 import digest
+        return digest(data)
 
 BINARY_STAGE_RETRIES = 50
 WEB_POST_RETRIES = 20
-WEB_POST_RETRY_DELAY_SECS = 15
+# The delay before the first retry of a web.post, which doubles with each
+# further retry of the same chunk, up to WEB_POST_RETRY_MAX_DELAY_SECS.
+WEB_POST_RETRY_DELAY_SECS = 2
+WEB_POST_RETRY_MAX_DELAY_SECS = 120
+# The smallest chunk upload shrinks to after web.post timeouts.
+UPLOAD_MIN_CHUNK_SIZE = 4096
+# The number of web.posts in a row that must succeed before upload doubles
+# its chunk size again.
+UPLOAD_GROW_AFTER = 4
+
+# The kinds of web.post and web.get failure, as returned by _web_failure.
+WEB_SERVER_ERROR = 'server'
+WEB_TIMEOUT = 'timeout'
+WEB_CLIENT_ERROR = 'client'
+WEB_TRANSPORT_ERROR = 'transport'
+
+# Transaction doesn't retry a web.post or web.get after an {io} error, but
+# returns it, as upload and download retry the chunk themselves. Otherwise the
+# card's own retry policy applies, so CRC errors and the like, which are local
+# glitches that say nothing about the link to Notehub, are still retried by
+# Transaction.
+_WEB_IO_RULE = RetryRule(max_retries=0)
+# How many chunks upload prepares ahead of the one being sent. Chunks are
+# prepared on a worker thread, which needs concurrent.futures, so only
+# CPython prepares ahead by default.
+UPLOAD_PIPELINE_DEPTH = 1 if sys.implementation.name == 'cpython' else 0
+# The size of the blocks hashed to identify the data of a resumable upload.
+UPLOAD_HASH_BLOCK_SIZE = 65536
 
 try:
     _monotonic = time.monotonic
@@ -25,7 +61,14 @@ except AttributeError:
     _monotonic = time.time
 
 
-def _stage_binary_chunk(card, chunk_data):
+def _encode_chunk(chunk_data):
+    """COBS-encode a chunk and terminate it with a newline, for staging."""
+    encoded = cobs_encode(chunk_data, ord('\n'))
+    encoded.append(ord('\n'))
+    return encoded
+
+
+def _stage_binary_chunk(card, chunk_data, encoded=None):
     """Stage a binary chunk into the Notecard's binary buffer.
 
     Performs card.binary.put + raw byte transmit + verification, with
@@ -34,17 +77,20 @@ def _stage_binary_chunk(card, chunk_data):
 
     Args:
         card (Notecard): The Notecard object.
-        chunk_data (bytearray): The raw chunk data to stage.
+        chunk_data (bytes-like): The raw chunk data to stage.
+        encoded (bytearray, optional): The chunk as returned by
+            `_encode_chunk`, if it's already been encoded.
 
     Raises:
         Exception: If staging fails after all retries.
     """
-    encoded = cobs_encode(bytearray(chunk_data), ord('\n'))
+    if encoded is None:
+        encoded = _encode_chunk(chunk_data)
     req = {
         'req': 'card.binary.put',
-        'cobs': len(encoded),
+        # Not counting the newline.
+        'cobs': len(encoded) - 1,
     }
-    encoded.append(ord('\n'))
     expected_len = len(chunk_data)
 
     tries_left = BINARY_STAGE_RETRIES
@@ -95,18 +141,498 @@ def _stage_binary_chunk(card, chunk_data):
     raise Exception('Failed to stage binary data after retries.')
 
 
+def _web_failure(rsp):
+    """Return the kind of failure a web request's response is, or None.
+
+    `{timeout}` errors, and 408 and 504 results, are timeouts, which a
+    smaller chunk may avoid. Other 4xx results are client errors, which
+    retrying won't fix. Anything else, like a 5xx result, a 429 or an error
+    from the Notecard, is a server error.
+    """
+    result_code = rsp.get('result', 0)
+    err = rsp.get('err')
+    if err is None and result_code < 300:
+        return None
+    if err is not None:
+        if '{timeout}' in err:
+            return WEB_TIMEOUT
+        return WEB_SERVER_ERROR
+    if result_code in (408, 504):
+        return WEB_TIMEOUT
+    if 400 <= result_code < 500 and result_code != 429:
+        return WEB_CLIENT_ERROR
+    return WEB_SERVER_ERROR
+
+
+class UploadPolicy:
+    """How upload and download retry web requests and adapt the chunk size.
+
+    Each failed web.post or web.get is retried after a delay from the
+    RetryRule for its kind of failure, counting the retries of that kind for
+    the chunk. After a timeout, the chunk size is also halved, down to
+    `min_chunk_size`, and the chunk is split, or a smaller one requested,
+    before it's retried. Once `grow_after` requests in a row succeed, the
+    chunk size is doubled, back up to the size the transfer started with.
+    Client errors, like a 404 for a route that doesn't exist, aren't
+    retried.
+
+    Attributes:
+        max_retries (int): Retries allowed for each chunk's web request.
+        server (RetryRule): Rule for server errors: 5xx and 429 results, and
+            errors from the Notecard other than timeouts, like `{io}`.
+        timeout (RetryRule): Rule for timeouts: `{timeout}` errors, and 408
+            and 504 results.
+        transport (RetryRule): Rule for web request transactions that fail
+            even after Transaction's own retries, e.g. because the Notecard
+            didn't answer. The chunk size is left as it is, as the failure
+            is local rather than on the link to Notehub.
+        min_chunk_size (int): Smallest chunk size to shrink to.
+        grow_after (int): Successful posts in a row after which the chunk
+            size is doubled, or 0 to never grow it.
+    """
+
+    def __init__(self, max_retries=None, server=None, timeout=None,
+                 min_chunk_size=UPLOAD_MIN_CHUNK_SIZE,
+                 grow_after=UPLOAD_GROW_AFTER, transport=None):
+        """Create a policy. Rules default to exponential backoff."""
+        if min_chunk_size < 1:
+            raise ValueError('min_chunk_size must be at least 1.')
+
+        self.max_retries = (max_retries if max_retries is not None
+                            else WEB_POST_RETRIES)
+        self.server = server if server is not None else self._default_rule()
+        self.timeout = (timeout if timeout is not None
+                        else self._default_rule())
+        self.transport = (transport if transport is not None
+                          else self._default_rule())
+        self.min_chunk_size = min_chunk_size
+        self.grow_after = grow_after
+
+    @staticmethod
+    def _default_rule():
+        return RetryRule(delay_secs=WEB_POST_RETRY_DELAY_SECS, backoff=2,
+                         max_delay_secs=WEB_POST_RETRY_MAX_DELAY_SECS,
+                         jitter=0.5)
+
+    def start(self, max_chunk_size):
+        """Return the UploadState for a transfer of up to `max_chunk_size`."""
+        return UploadState(self, max_chunk_size)
+
+
+class UploadState:
+    """Tracks the chunk size and retries of one transfer against its policy.
+
+    Attributes:
+        chunk_size (int): The size to transfer chunks at.
+        retries (int): Web request retries so far.
+        backoff_secs (float): Time spent waiting before retries so far.
+        bytes_transferred (int): Bytes transferred so far, including those
+            of requests that failed.
+    """
+
+    def __init__(self, policy, max_chunk_size):
+        """Start tracking a transfer."""
+        self._policy = policy
+        self._max_chunk_size = max_chunk_size
+        self._min_chunk_size = min(policy.min_chunk_size, max_chunk_size)
+        self._successes = 0
+        self._chunk_retries = {}
+        self.chunk_size = max_chunk_size
+        self.retries = 0
+        self.backoff_secs = 0
+        self.bytes_transferred = 0
+
+    def succeeded(self):
+        """Note that a chunk was transferred, growing the chunk size if due."""
+        self._chunk_retries = {}
+        self._successes += 1
+        grow_after = self._policy.grow_after
+        if (grow_after and self._successes >= grow_after
+                and self.chunk_size < self._max_chunk_size):
+            self.chunk_size = min(self.chunk_size * 2, self._max_chunk_size)
+            self._successes = 0
+
+    def next_delay(self, kind):
+        """Return the delay before retrying after a `kind` failure, or None.
+
+        None means the chunk shouldn't be retried. Otherwise, the retry is
+        counted, and after a timeout the chunk size is shrunk.
+        """
+        self._successes = 0
+        chunk_retries = sum(self._chunk_retries.values())
+        if (kind == WEB_CLIENT_ERROR
+                or chunk_retries >= self._policy.max_retries):
+            return None
+
+        retries = self._chunk_retries.get(kind, 0) + 1
+        self._chunk_retries[kind] = retries
+        self.retries += 1
+        if kind == WEB_TIMEOUT:
+            self.chunk_size = max(self.chunk_size // 2, self._min_chunk_size)
+            delay_secs = self._policy.timeout.delay(retries)
+        elif kind == WEB_TRANSPORT_ERROR:
+            delay_secs = self._policy.transport.delay(retries)
+        else:
+            delay_secs = self._policy.server.delay(retries)
+        self.backoff_secs += delay_secs
+        return delay_secs
+
+
+def _is_path(data):
+    return isinstance(data, str) or hasattr(data, '__fspath__')
+
+
+def _is_file(data):
+    return hasattr(data, 'readinto') or hasattr(data, 'read')
+
+
+def _is_seekable(f):
+    """Return whether file object `f` can seek."""
+    seekable = getattr(f, 'seekable', None)
+    if seekable is not None:
+        return seekable()
+    # MicroPython's files have no seekable.
+    return hasattr(f, 'seek') and hasattr(f, 'tell')
+
+
+def _is_buffer(data):
+    try:
+        memoryview(data)
+    except TypeError:
+        return False
+    return True
+
+
+def _file_length(f):
+    """Return the bytes left in file object `f`, or None if unknown."""
+    try:
+        position = f.tell()
+        end = f.seek(0, 2)
+        f.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - position
+
+
+def _source_length(data, length):
+    """Return the number of bytes to upload from `data`, or None."""
+    if length is not None:
+        return length
+    if data is None:
+        return 0
+    if _is_path(data):
+        # st_size, in a way that also works on MicroPython.
+        return os.stat(data)[6]
+    if _is_file(data):
+        return _file_length(data)
+    if _is_buffer(data):
+        return len(memoryview(data))
+    return None
+
+
+def _file_chunks(f, bufs, length):
+    """Yield views of the buffers in `bufs`, in turn, filled from file `f`.
+
+    Reads until the end of the file, or until `length` bytes if it's not
+    None.
+    """
+    views = [memoryview(buf) for buf in bufs]
+    buf_idx = 0
+    while length is None or length > 0:
+        view = views[buf_idx]
+        buf_idx = (buf_idx + 1) % len(views)
+        size = len(view) if length is None else min(len(view), length)
+        filled = 0
+        while filled < size:
+            if hasattr(f, 'readinto'):
+                n = f.readinto(view[filled:size])
+            else:
+                piece = f.read(size - filled)
+                n = len(piece)
+                view[filled:filled + n] = piece
+            if not n:
+                break
+            filled += n
+
+        if filled:
+            yield view[:filled]
+        if filled < size:
+            return
+        if length is not None:
+            length -= filled
+
+
+def _iterator_chunks(pieces, bufs):
+    """Yield views of the buffers in `bufs`, in turn, filled from `pieces`.
+
+    `pieces` is an iterable of bytes-like objects.
+    """
+    views = [memoryview(buf) for buf in bufs]
+    buf_idx = 0
+    view = views[0]
+    filled = 0
+    for piece in pieces:
+        piece = memoryview(piece)
+        while len(piece) > 0:
+            n = min(len(piece), len(view) - filled)
+            view[filled:filled + n] = piece[:n]
+            filled += n
+            piece = piece[n:]
+            if filled == len(view):
+                yield view
+                buf_idx = (buf_idx + 1) % len(views)
+                view = views[buf_idx]
+                filled = 0
+
+    if filled:
+        yield view[:filled]
+
+
+def _chunks(data, chunk_size, length, buffers=1, start=0):
+    """Yield the chunks of `data` to upload, each up to `chunk_size` bytes.
+
+    Bytes-like data is chunked into views, without copying. Files, whether
+    given by path or as binary file objects, and iterators of bytes-like
+    objects are read into `buffers` buffers of `chunk_size` bytes, reused in
+    turn, so each chunk is only valid until `buffers` more have been read.
+
+    Chunks start `start` bytes into the data, which can't be an iterator if
+    `start` isn't 0. `length` is counted from the beginning of the data.
+    """
+    if length is not None:
+        length -= start
+
+    if _is_buffer(data):
+        data_view = memoryview(data)[start:]
+        if length is not None:
+            data_view = data_view[:length]
+        for offset in range(0, len(data_view), chunk_size):
+            yield data_view[offset:offset + chunk_size]
+        return
+
+    bufs = [bytearray(chunk_size) for _ in range(buffers)]
+    if _is_path(data):
+        with open(data, 'rb') as f:
+            f.seek(start)
+            yield from _file_chunks(f, bufs, length)
+    elif _is_file(data):
+        if start:
+            data.seek(start, 1)
+        yield from _file_chunks(data, bufs, length)
+    else:
+        yield from _iterator_chunks(data, bufs)
+
+
+def _content_hash(data, length):
+    """Return a digest of the first `length` bytes of `data`.
+
+    The data is read in blocks, so large files aren't read into memory, and
+    the digest is the MD5 of the blocks' MD5s. A file object is left at the
+    position it was at.
+    """
+    position = data.tell() if _is_file(data) else None
+    digests = [_md5_hash(block)
+               for block in _chunks(data, UPLOAD_HASH_BLOCK_SIZE, length)]
+    if position is not None:
+        data.seek(position)
+    return _md5_hash(''.join(digests).encode('utf-8'))
+
+
+class UploadJournal:
+    """A file recording the progress of uploads, so they can be resumed.
+
+    Pass a journal to `upload`. Each upload is identified by a hash of its
+    data, its length, its route and its target. Once the web.post of each of
+    its chunks has been acknowledged, the end of the chunk is appended to the
+    journal, which is flushed to disk. If the upload is interrupted, e.g. by
+    the process restarting, uploading the same data to the same route and
+    target with the same journal continues from the last acknowledged
+    offset. An upload's entries are removed once it completes.
+
+    Entries are JSON lines, so a line torn by a crash is just ignored.
+    """
+
+    def __init__(self, path):
+        """Open the journal at `path`, which is created if needed."""
+        self.path = path
+        self._offsets = {}
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._offsets[entry['key']] = entry['offset']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+
+    def offset(self, key):
+        """Return the acknowledged offset of the upload `key`, or 0."""
+        return self._offsets.get(key, 0)
+
+    def record(self, key, offset):
+        """Record that upload `key` has been acknowledged up to `offset`."""
+        self._offsets[key] = offset
+        self._append(json.dumps({'key': key, 'offset': offset}) + '\n')
+
+    def finish(self, key):
+        """Remove upload `key` from the journal."""
+        if self._offsets.pop(key, None) is None:
+            return
+
+        # Rewrite the journal with just the other uploads' latest entries.
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for other_key, offset in self._offsets.items():
+                f.write(json.dumps({'key': other_key, 'offset': offset}))
+                f.write('\n')
+            self._sync(f)
+        getattr(os, 'replace', os.rename)(tmp_path, self.path)
+
+    def _append(self, line):
+        with open(self.path, 'a') as f:
+            f.write(line)
+            self._sync(f)
+
+    def _sync(self, f):
+        f.flush()
+        if hasattr(os, 'fsync'):
+            os.fsync(f.fileno())
+
+
+def _prepare_next_chunk(chunks):
+    """Read the next chunk from `chunks`, and hash and encode it.
+
+    Returns:
+        tuple: The chunk, its MD5 digest and its encoding for staging, or
+            None once there are no chunks left.
+    """
+    chunk_data = next(chunks, None)
+    if chunk_data is None:
+        return None
+    return chunk_data, _md5_hash(chunk_data), _encode_chunk(chunk_data)
+
+
+def _web_post_request(route, target, label, content_type, offset, length,
+                      total_len):
+    """Return the web.post request for `length` bytes at `offset`."""
+    req = {
+        'req': 'web.post',
+        'route': route,
+        'binary': True,
+        'content': content_type,
+        'offset': offset,
+    }
+    if target:
+        req['name'] = target
+    if label:
+        req['label'] = label
+    # Only set total for segmented uploads, matching the Go implementation.
+    # This tells Notehub to expect multiple segments and reassemble them.
+    if length < total_len:
+        req['total'] = total_len
+    return req
+
+
+def _try_web_request(card, state, req):
+    """Send web request `req`, and return True if it succeeds.
+
+    If it fails, the failure is counted against `state`, which may shrink the
+    chunk size, and False is returned once it's time to retry.
+
+    Raises:
+        Exception: If the request fails and can't be retried.
+    """
+    try:
+        rsp = card.Transaction(
+            req, retry_policy=card.GetRetryPolicy().with_io(_WEB_IO_RULE))
+    except Exception as e:
+        kind, err_detail = WEB_TRANSPORT_ERROR, str(e)
+    else:
+        kind = _web_failure(rsp)
+        if kind is None:
+            state.succeeded()
+            return True
+        err_detail = rsp.get('err', f'HTTP {rsp.get("result", 0)}')
+
+    delay_secs = state.next_delay(kind)
+    if delay_secs is None:
+        if kind == WEB_CLIENT_ERROR:
+            raise Exception(f'{req["req"]} failed: {err_detail}')
+        raise Exception(f'{req["req"]} failed after retries: {err_detail}')
+    if delay_secs:
+        time.sleep(delay_secs)
+    return False
+
+
+def _post_piece(card, state, piece, piece_md5, encoded, web_req):
+    """Stage `piece` and post it with `web_req`, retrying per `state`.
+
+    Returns True once the post succeeds, or False if a timeout shrank the
+    chunk size below the length of the piece, which should then be split.
+
+    Raises:
+        Exception: If the post fails and can't be retried.
+    """
+    web_req['status'] = piece_md5
+    _stage_binary_chunk(card, piece, encoded)
+    while True:
+        state.bytes_transferred += len(piece)
+        if _try_web_request(card, state, web_req):
+            return True
+        if len(piece) > state.chunk_size:
+            return False
+        _stage_binary_chunk(card, piece, encoded)
+
+
+def _upload_stats(state, bytes_uploaded, chunks, duration, resume_offset):
+    """Return the statistics `upload` returns."""
+    return {
+        'bytes_uploaded': bytes_uploaded,
+        'chunks': chunks,
+        'duration_secs': duration,
+        'bytes_per_sec': bytes_uploaded / duration if duration > 0 else 0,
+        'resumed_offset': resume_offset,
+        'retries': state.retries,
+        'backoff_secs': state.backoff_secs,
+        'bytes_transferred': state.bytes_transferred,
+        'chunk_size': state.chunk_size,
+    }
+
+
 def upload(card, data, route, target=None, label=None,
            content_type='application/octet-stream', max_chunk_size=0,
-           progress_cb=None):
+           progress_cb=None, length=None,
+           pipeline_depth=UPLOAD_PIPELINE_DEPTH, journal=None, policy=None):
     """Upload binary data to a Notehub proxy route via the Notecard.
 
     The data is chunked to fit in the Notecard's binary buffer, staged
     via card.binary.put, and sent to Notehub via web.post with
     binary:true.
 
+    While a chunk is being staged and posted, the next `pipeline_depth`
+    chunks are read, MD5-hashed and COBS-encoded on a worker thread, so that
+    work overlaps the transfer and the wait for Notehub.
+
+    Files and iterators are read a chunk at a time into `pipeline_depth + 1`
+    buffers that are reused in turn, so the memory used is bounded by the
+    size of the Notecard's binary buffer rather than the size of the upload.
+
+    Failed web.posts are retried, and the chunk size adapted to the link,
+    according to `policy`: by default, with exponential backoff, halving the
+    chunk size after timeouts and doubling it again after a run of successful
+    posts.
+
+    With a `journal`, an interrupted upload of the same data to the same
+    route and target continues from the last chunk Notehub acknowledged,
+    rather than from the beginning.
+
     Args:
         card (Notecard): The Notecard object.
-        data (bytes or bytearray): The binary data to upload.
+        data: The binary data to upload: a bytes-like object, the path of a
+            file, a binary file object, which is read from its current
+            position, or an iterable of bytes-like objects.
         route (str): The Notehub proxy route alias.
         target (str, optional): URL path appended to the route (sent as
             ``name`` in the web.post request).
@@ -116,20 +642,54 @@ def upload(card, data, route, target=None, label=None,
             Notecard's maximum buffer capacity.
         progress_cb (callable, optional): Called after each chunk with a dict
             containing progress information.
+        length (int, optional): The number of bytes to upload. Defaults to
+            all of `data`, or the rest of a file. Required for iterables and
+            for files whose size can't be determined, like pipes.
+        pipeline_depth (int): Chunks to prepare ahead of the one being sent.
+            0 prepares each chunk just before it's sent, without a worker
+            thread.
+        journal (UploadJournal, optional): Records the upload's progress,
+            and resumes it if it was interrupted. `data` must be a path, a
+            buffer or a seekable file, as it's read in full to hash it
+            before the upload starts, which adds a full extra read.
+        policy (UploadPolicy, optional): How to retry failed web.posts and
+            adapt the chunk size. Defaults to ``UploadPolicy()``.
 
     Returns:
         dict: Upload statistics with keys ``bytes_uploaded``, ``chunks``,
-        ``duration_secs``, and ``bytes_per_sec``.
+        ``duration_secs``, and ``bytes_per_sec``, the effective throughput
+        including retries and backoff, for the data sent by this call;
+        ``resumed_offset``, the offset it resumed from; ``retries``,
+        ``backoff_secs`` and ``bytes_transferred``, which includes failed
+        posts; and ``chunk_size``, the chunk size it ended with.
 
     Raises:
-        ValueError: If ``route`` is empty or ``data`` is empty.
-        Exception: If the upload fails.
+        ValueError: If ``route`` is empty, ``data`` is empty, ``length``
+            is needed but wasn't given, or ``journal`` is given with an
+            iterable or a file that can't seek.
+        Exception: If the upload fails, or ``data`` doesn't hold ``length``
+            bytes.
     """
     if not route:
         raise ValueError('route must not be empty.')
-    if not data:
+    total_len = _source_length(data, length)
+    if total_len is None:
+        raise ValueError('length must be given to upload from an iterable '
+                         'or a file of unknown size.')
+    if total_len <= 0:
         raise ValueError('data must not be empty.')
 
+    resume_offset = 0
+    if journal is not None:
+        if not (_is_buffer(data) or _is_path(data) or _is_file(data)):
+            raise ValueError('journal can\'t be used to upload from an '
+                             'iterable.')
+        if _is_file(data) and not _is_seekable(data):
+            raise ValueError('journal needs a path, buffer or seekable file.')
+        journal_key = '{}|{}|{}|{}'.format(
+            route, target or '', total_len, _content_hash(data, total_len))
+        resume_offset = journal.offset(journal_key)
+
     rsp = card.Transaction({'req': 'card.binary', 'reset': True})
     if 'err' in rsp and '{bad-bin}' not in rsp['err']:
         raise Exception(
@@ -145,76 +705,102 @@ def upload(card, data, route, target=None, label=None,
     else:
         chunk_size = buf_capacity
 
-    total_len = len(data)
-    total_chunks = (total_len + chunk_size - 1) // chunk_size
+    state = (policy or UploadPolicy()).start(chunk_size)
+    if resume_offset >= total_len:
+        # The journal shows the upload already finished.
+        journal.finish(journal_key)
+        return _upload_stats(state, 0, 0, 0, resume_offset)
+
     upload_start = _monotonic()
-    bytes_sent = 0
-
-    for chunk_idx in range(total_chunks):
-        offset = chunk_idx * chunk_size
-        end = min(offset + chunk_size, total_len)
-        chunk_data = data[offset:end]
-        chunk_len = len(chunk_data)
-        chunk_md5 = _md5_hash(chunk_data)
-
-        _stage_binary_chunk(card, chunk_data)
-
-        web_req = {
-            'req': 'web.post',
-            'route': route,
-            'binary': True,
-            'content': content_type,
-            'offset': offset,
-            'status': chunk_md5,
-        }
-        if target:
-            web_req['name'] = target
-        if label:
-            web_req['label'] = label
-        # Only set total for multi-chunk (segmented) uploads, matching
-        # the Go implementation. This tells Notehub to expect multiple
-        # segments and reassemble them.
-        if total_chunks > 1:
-            web_req['total'] = total_len
-
-        web_tries = WEB_POST_RETRIES
-        while web_tries > 0:
-            rsp = card.Transaction(web_req)
-            result_code = rsp.get('result', 0)
-            if result_code >= 300 or 'err' in rsp:
-                web_tries -= 1
-                if web_tries == 0:
-                    err_detail = rsp.get('err', f'HTTP {result_code}')
-                    raise Exception(
-                        f'web.post failed after retries: {err_detail}')
-                time.sleep(WEB_POST_RETRY_DELAY_SECS)
-                _stage_binary_chunk(card, chunk_data)
-                continue
-            break
-
-        bytes_sent += chunk_len
-        elapsed = _monotonic() - upload_start
-        current_bps = chunk_len / elapsed if elapsed > 0 else 0
-        avg_bps = bytes_sent / elapsed if elapsed > 0 else 0
-        remaining = total_len - bytes_sent
-        eta = remaining / avg_bps if avg_bps > 0 else 0
-
-        if progress_cb:
-            progress_cb({
-                'chunk': chunk_idx + 1,
-                'total_chunks': total_chunks,
-                'bytes_sent': bytes_sent,
-                'total_bytes': total_len,
-                'percent_complete': (bytes_sent / total_len) * 100,
-                'bytes_per_sec': current_bps,
-                'avg_bytes_per_sec': avg_bps,
-                'eta_secs': eta,
-            })
-
-    duration = _monotonic() - upload_start
-    return {
-        'bytes_uploaded': bytes_sent,
-        'chunks': total_chunks,
-        'duration_secs': duration,
-        'bytes_per_sec': bytes_sent / duration if duration > 0 else 0,
-    }
+    bytes_sent = resume_offset
+    chunks = _chunks(data, chunk_size, length, pipeline_depth + 1,
+                     resume_offset)
+
+    executor = None
+    if pipeline_depth > 0:
+        from concurrent.futures import ThreadPoolExecutor
+
+        # A single worker prepares the chunks one after another, in order.
+        executor = ThreadPoolExecutor(max_workers=1,
+                                      thread_name_prefix='notecard-upload')
+        prepared = [executor.submit(_prepare_next_chunk, chunks)
+                    for _ in range(pipeline_depth)]
+
+    try:
+        chunk_idx = resume_offset // chunk_size
+        chunks_sent = 0
+        while True:
+            if executor is None:
+                chunk = _prepare_next_chunk(chunks)
+            else:
+                prepared.append(executor.submit(_prepare_next_chunk, chunks))
+                chunk = prepared.pop(0).result()
+            if chunk is None:
+                break
+
+            chunk_data, chunk_md5, encoded = chunk
+            if bytes_sent + len(chunk_data) > total_len:
+                raise Exception(
+                    f'Upload data is longer than {total_len} bytes.')
+
+            # Post the chunk in pieces of the current chunk size, which may
+            # shrink as the pieces are posted.
+            pending = memoryview(chunk_data)
+            while pending:
+                piece_len = min(len(pending), state.chunk_size)
+                if piece_len == len(chunk_data):
+                    piece, piece_md5, piece_encoded = (
+                        chunk_data, chunk_md5, encoded)
+                else:
+                    piece = pending[:piece_len]
+                    piece_md5, piece_encoded = _md5_hash(piece), None
+
+                web_req = _web_post_request(route, target, label,
+                                            content_type, bytes_sent,
+                                            piece_len, total_len)
+                if not _post_piece(card, state, piece, piece_md5,
+                                   piece_encoded, web_req):
+                    # The chunk size shrank, so split the piece.
+                    continue
+                pending = pending[piece_len:]
+
+                bytes_sent += piece_len
+                if journal is not None:
+                    journal.record(journal_key, bytes_sent)
+                elapsed = _monotonic() - upload_start
+                current_bps = piece_len / elapsed if elapsed > 0 else 0
+                avg_bps = ((bytes_sent - resume_offset) / elapsed
+                           if elapsed > 0 else 0)
+                remaining = total_len - bytes_sent
+                eta = remaining / avg_bps if avg_bps > 0 else 0
+
+                chunk_idx += 1
+                chunks_sent += 1
+                if progress_cb:
+                    progress_cb({
+                        'chunk': chunk_idx,
+                        'total_chunks': chunk_idx + (
+                            remaining + state.chunk_size - 1)
+                        // state.chunk_size,
+                        'bytes_sent': bytes_sent,
+                        'total_bytes': total_len,
+                        'percent_complete': (bytes_sent / total_len) * 100,
+                        'bytes_per_sec': current_bps,
+                        'avg_bytes_per_sec': avg_bps,
+                        'eta_secs': eta,
+                        'chunk_size': state.chunk_size,
+                    })
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        chunks.close()
+
+    if bytes_sent != total_len:
+        raise Exception(f'Upload data ended after {bytes_sent} of '
+                        f'{total_len} bytes.')
+
+    if journal is not None:
+        journal.finish(journal_key)
+
+    return _upload_stats(state, bytes_sent - resume_offset, chunks_sent,
+                         _monotonic() - upload_start, resume_offset)
@@ -0,0 +1,355 @@
+import asyncio
+import os
+import sys
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from filelock import FileLock
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import aio, card as card_api, note  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+
+class FakeUART:
+    """A pyserial-like UART that answers each request line via `responder`."""
+
+    def __init__(self, responder, latency=0):
+        self.responder = responder
+        self.latency = latency
+        self.tx = bytearray()
+        self.rx = bytearray()
+        self.ready_at = 0
+
+    @property
+    def in_waiting(self):
+        return len(self.rx) if time.monotonic() >= self.ready_at else 0
+
+    def read(self, size=1):
+        data = bytes(self.rx[:size])
+        del self.rx[:size]
+        return data
+
+    def write(self, data):
+        self.tx += data
+        while b'\n' in self.tx:
+            line, _, rest = bytes(self.tx).partition(b'\n')
+            self.tx = bytearray(rest)
+            rsp = self.responder(line)
+            if rsp is not None:
+                self.rx += rsp
+                self.ready_at = time.monotonic() + self.latency
+
+
+def echo_version(line):
+    if line == b'':
+        return b'\r\n'
+    return b'{"version":"notecard-8.1.3"}\r\n'
+
+
+@pytest.fixture
+def arrange_serial():
+    def _arrange_serial(responder=echo_version, latency=0):
+        card = aio.AsyncOpenSerial(FakeUART(responder, latency))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        card._reset_required = False
+
+        return card
+
+    yield _arrange_serial
+
+
+@pytest.fixture
+def arrange_transaction_test():
+    def _arrange_transaction_test():
+        card = aio.AsyncOpenSerial(MagicMock())
+        card.Reset = AsyncMock()
+        card._transact = AsyncMock(return_value=b'{}\r\n')
+        card._crc_error = MagicMock(return_value=False)
+
+        return card
+
+    with patch('notecard.aio.asyncio.sleep', new=AsyncMock()):
+        yield _arrange_transaction_test
+
+
+class TestAsyncNotecard:
+    # __init__ tests.
+    @patch('notecard.notecard.OpenSerial.Reset')
+    def test_serial_init_defers_reset(self, reset_mock):
+        card = aio.AsyncOpenSerial(MagicMock())
+
+        reset_mock.assert_not_called()
+        assert card._reset_required
+
+    @patch('notecard.notecard.OpenI2C.Reset')
+    def test_i2c_init_defers_reset(self, reset_mock):
+        card = aio.AsyncOpenI2C(MagicMock(), 0, 0)
+
+        reset_mock.assert_not_called()
+        assert card._reset_required
+
+    def test_serial_keeps_file_lock(self, tmp_path):
+        lock_path = str(tmp_path / 'serial.lock')
+        with patch('notecard.notecard.use_serial_lock', new=True):
+            card = aio.AsyncOpenSerial(MagicMock(), lock_path=lock_path)
+
+        assert isinstance(card.lock_handle, FileLock)
+        assert card.lock_handle.lock_file == lock_path
+        assert isinstance(card.transaction_lock, asyncio.Lock)
+
+    def test_transaction_waits_for_file_lock_without_blocking_loop(
+            self, tmp_path):
+        lock_path = str(tmp_path / 'serial.lock')
+        with patch('notecard.notecard.use_serial_lock', new=True):
+            card = aio.AsyncOpenSerial(FakeUART(echo_version),
+                                       lock_path=lock_path)
+        card.SetPacingProfile(PacingProfile(0, 0))
+        card._reset_required = False
+        # Another process holding the serial port.
+        other = FileLock(lock_path, thread_local=False)
+        other.acquire()
+
+        async def run():
+            task = asyncio.create_task(
+                card.Transaction({'req': 'card.version'}))
+            await asyncio.sleep(0.2)
+            waiting = not task.done()
+            other.release()
+            return waiting, await task
+
+        waiting, rsp = asyncio.run(run())
+
+        assert waiting
+        assert rsp == {'version': 'notecard-8.1.3'}
+        assert not card.lock_handle.is_locked
+        assert not card.transaction_lock.locked()
+
+    # Reset tests.
+    @patch('notecard.notecard.OpenSerial.Reset')
+    def test_reset_runs_transport_reset(self, reset_mock):
+        card = aio.AsyncOpenSerial(MagicMock())
+
+        asyncio.run(card.Reset())
+
+        reset_mock.assert_called_once()
+
+    # Transaction tests.
+    def test_transaction_returns_response(self, arrange_serial):
+        card = arrange_serial()
+
+        rsp = asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        assert rsp == {'version': 'notecard-8.1.3'}
+
+    def test_transaction_resets_first_if_required(
+            self, arrange_transaction_test):
+        card = arrange_transaction_test()
+        card._reset_required = True
+
+        asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        card.Reset.assert_awaited_once()
+
+    def test_transaction_retries_on_crc_error(self, arrange_transaction_test):
+        card = arrange_transaction_test()
+        card._crc_error.side_effect = [True, False]
+
+        asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        assert card._transact.await_count == 2
+
+    def test_transaction_resets_and_retries_on_transport_error(
+            self, arrange_transaction_test):
+        card = arrange_transaction_test()
+        card._reset_required = False
+        card._transact.side_effect = [Exception('boom'), b'{}\r\n']
+
+        asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        card.Reset.assert_awaited_once()
+
+    def test_transaction_raises_after_retries_exhausted(
+            self, arrange_transaction_test):
+        card = arrange_transaction_test()
+        card._reset_required = False
+        card._crc_error.return_value = True
+
+        with pytest.raises(Exception, match='Failed to transact'):
+            asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        assert card._transact.await_count == notecard.CARD_TRANSACTION_RETRIES
+        assert card._reset_required
+
+    def test_transaction_releases_lock_after_error(
+            self, arrange_transaction_test):
+        card = arrange_transaction_test()
+        card._crc_error.return_value = True
+
+        with pytest.raises(Exception):
+            asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        assert not card.transaction_lock.locked()
+
+    def test_transaction_does_not_block_event_loop(self, arrange_serial):
+        card = arrange_serial(latency=0.2)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            task = asyncio.create_task(ticker())
+            rsp = await card.Transaction({'req': 'card.version'})
+            task.cancel()
+            return rsp
+
+        rsp = asyncio.run(run())
+
+        assert rsp == {'version': 'notecard-8.1.3'}
+        assert len(ticks) > 5
+
+    def test_command_does_not_return_response(self, arrange_serial):
+        card = arrange_serial()
+
+        rsp = asyncio.run(card.Command({'cmd': 'card.version'}))
+
+        assert rsp is None
+
+    def test_fluent_api_helpers_are_awaitable(self, arrange_serial):
+        card = arrange_serial()
+
+        async def run():
+            version = await card_api.version(card)
+            added = await note.add(card, file='data.qo', body={'temp': 21})
+            return version, added
+
+        version, added = asyncio.run(run())
+
+        assert version == {'version': 'notecard-8.1.3'}
+        assert added == {'version': 'notecard-8.1.3'}
+
+    # receive tests.
+    def test_receive_holds_bytes_after_newline(self, arrange_serial):
+        card = arrange_serial()
+        card.uart.rx += b'{}\r\nbinary\n'
+
+        async def run():
+            return await card.receive(), await card.receive()
+
+        first, second = asyncio.run(run())
+
+        assert first == bytearray(b'{}\r\n')
+        assert second == bytearray(b'binary\n')
+
+    @pytest.mark.parametrize('idle_secs', [0, 0.01])
+    def test_wait_readable_sleeps_idle_interval_without_fd(self, idle_secs):
+        card = aio.AsyncOpenSerial(MagicMock())
+        card._fd = None
+
+        with patch('notecard.aio.asyncio.sleep', new=AsyncMock()) as sleep:
+            asyncio.run(card._wait_readable_async(time.monotonic(), 1,
+                                                  idle_secs))
+
+        sleep.assert_awaited_once_with(idle_secs)
+
+    # I2C tests.
+    def test_i2c_transaction_returns_response(self):
+        card = aio.AsyncOpenI2C(MagicMock(), 0, 0)
+        card._reset_required = False
+        card.SetPacingProfile(PacingProfile(0, 0))
+        card._write = MagicMock()
+        card._read = MagicMock(side_effect=[
+            (4, bytearray()),
+            (4, bytearray()),
+            (0, bytearray(b'{}\r\n')),
+        ])
+
+        rsp = asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        assert rsp == {}
+
+    def test_i2c_transmit_paces_like_sync_card(self):
+        def arrange(card):
+            card.SetPacingProfile(PacingProfile(250, 20))
+            card._write = MagicMock()
+            card.max = 100
+            return card
+
+        with patch('notecard.notecard.OpenI2C.Reset'):
+            sync_card = arrange(notecard.OpenI2C(MagicMock(), 0, 0))
+        async_card = arrange(aio.AsyncOpenI2C(MagicMock(), 0, 0))
+        data = bytearray(600)
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            sync_card.transmit(data)
+        with patch('notecard.aio.asyncio.sleep', new=AsyncMock()) as \
+                async_sleep_mock:
+            asyncio.run(async_card.transmit(data))
+
+        assert async_sleep_mock.call_args_list == sleep_mock.call_args_list
+        assert async_card._write.call_count == sync_card._write.call_count
+
+
+class TestAsyncUpload:
+    def test_upload_drives_async_card(self):
+        card = aio.AsyncOpenSerial(MagicMock())
+        data = bytearray(range(64))
+
+        async def transaction(req, lock=True, retry_policy=None):
+            r = req['req']
+            if r == 'card.binary' and req.get('reset'):
+                return {'max': 1024}
+            if r == 'card.binary':
+                return {'length': len(data)}
+            if r == 'web.post':
+                return {'result': 200}
+            return {}
+
+        card.Transaction = AsyncMock(side_effect=transaction)
+        card.transmit = AsyncMock()
+        progress = []
+
+        async def run():
+            stats = await aio.upload(card, data, 'my-route',
+                                     progress_cb=progress.append)
+            # Let the progress callback scheduled on the loop run.
+            await asyncio.sleep(0)
+            return stats
+
+        stats = asyncio.run(run())
+
+        assert stats['bytes_uploaded'] == len(data)
+        card.transmit.assert_awaited_once()
+        assert len(progress) == 1
+        assert not card.transaction_lock.locked()
+
+
+class TestAsyncDownload:
+    def test_download_drives_async_card(self):
+        from notecard.emulator import EmulatedUART, NotecardEmulator
+
+        emulator = NotecardEmulator()
+        emulator.web_files['files'] = bytes(range(256)) * 4
+        card = aio.AsyncOpenSerial(EmulatedUART(emulator))
+        buf = bytearray(1024)
+        progress = []
+
+        async def run():
+            stats = await aio.download(card, 'files', buf,
+                                       max_chunk_size=300,
+                                       progress_cb=progress.append)
+            await asyncio.sleep(0)
+            return stats
+
+        stats = asyncio.run(run())
+
+        assert buf == emulator.web_files['files']
+        assert stats['chunks'] == 4
+        assert len(progress) == 4
+        assert not card.transaction_lock.locked()
@@ -33,31 +33,31 @@ def arrange_test():
 
 @pytest.fixture
 def arrange_rx_test(arrange_test):
-    def _arrange_rx_test(bad_md5=False):
-        card = arrange_test()
+    # Don't actually do any COBS decoding. Just return the received data.
+    with patch('notecard.binary_helpers.cobs_decode') as cobs_decode_mock:
+        def _arrange_rx_test(bad_md5=False):
+            card = arrange_test()
 
-        # Set up receive.
-        rx_data = bytearray.fromhex('deadbeef0a')
-        card.receive = MagicMock(return_value=rx_data)
-
-        # Set up Transaction.
-        if bad_md5:
-            rsp = {'status': 'abc'}
-        else:
-            # This is the MD5 of 0xdeadbeef. Note that 0x0a is omitted -- that's
-            # the newline that terminates the binary payload. It isn't included
-            # in the MD5 calculation.
-            rsp = {'status': '2f249230a8e7c2bf6005ccd2679259ec'}
-        card.Transaction.return_value = rsp
-
-        # Don't actually do any COBS decoding. Just return the received data.
-        # data minus the newline.
-        notecard.binary_helpers.cobs_decode = MagicMock(
-            return_value=rx_data[:-1])
+            # Set up receive.
+            rx_data = bytearray.fromhex('deadbeef0a')
+            card.receive = MagicMock(return_value=rx_data)
 
-        return card
+            # Set up Transaction.
+            if bad_md5:
+                rsp = {'status': 'abc'}
+            else:
+                # This is the MD5 of 0xdeadbeef. Note that 0x0a is omitted --
+                # that's the newline that terminates the binary payload. It
+                # isn't included in the MD5 calculation.
+                rsp = {'status': '2f249230a8e7c2bf6005ccd2679259ec'}
+            card.Transaction.return_value = rsp
+
+            # The received data minus the newline.
+            cobs_decode_mock.return_value = rx_data[:-1]
 
-    yield _arrange_rx_test
+            return card
+
+        yield _arrange_rx_test
 
 
 @pytest.fixture
@@ -435,6 +435,14 @@ class TestBinaryStoreTransmit:
 
         assert notecard.binary_helpers.cobs_encode.call_args[0][0] == tx_data
 
+    def test_does_not_copy_tx_data(self, tx_data, arrange_tx_test):
+        offset = 0
+        card = arrange_tx_test()
+
+        binary_store_transmit(card, tx_data, offset)
+
+        assert notecard.binary_helpers.cobs_encode.call_args[0][0] is tx_data
+
     def test_calls_cobs_encode_with_newline_as_eop(
             self, tx_data, arrange_tx_test):
         offset = 0
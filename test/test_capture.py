@@ -0,0 +1,172 @@
+import io
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import binary_helpers  # noqa: E402
+from notecard.capture import (  # noqa: E402
+    CAPTURE_I2C,
+    CAPTURE_RX,
+    CAPTURE_SERIAL,
+    CAPTURE_TX,
+    CaptureWriter,
+    RecordingI2C,
+    RecordingUART,
+    ReplayI2C,
+    ReplayUART,
+    read_capture,
+)
+from notecard.emulator import EmulatedI2C, EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+PAYLOAD = bytes(range(256)) * 4
+
+
+def open_serial(port):
+    card = notecard.OpenSerial(port)
+    card.SetPacingProfile(PacingProfile(0, 0))
+    return card
+
+
+def open_i2c(bus):
+    card = notecard.OpenI2C(bus, 0, 0)
+    card.SetPacingProfile(PacingProfile(0, 0))
+    return card
+
+
+def session(card):
+    """Run some requests, including a binary round trip, and return results."""
+    results = [card.Transaction({'req': 'card.version'})]
+    binary_helpers.binary_store_reset(card)
+    binary_helpers.binary_store_transmit(card, PAYLOAD, 0)
+    results.append(bytes(binary_helpers.binary_store_receive(
+        card, 0, len(PAYLOAD))))
+    results.append(card.Transaction({'req': 'note.add', 'body': {'temp': 21.5}}))
+    return results
+
+
+@pytest.fixture
+def serial_capture(tmp_path):
+    path = tmp_path / 'serial.ncap'
+    with RecordingUART(EmulatedUART(NotecardEmulator()), path) as port:
+        results = session(open_serial(port))
+
+    return path, results
+
+
+class TestRecording:
+    def test_events_are_streamed_to_file(self):
+        file = io.BytesIO()
+        port = RecordingUART(EmulatedUART(NotecardEmulator()), file)
+
+        open_serial(port).Transaction({'req': 'card.version'})
+
+        # The reset and the transaction are on file before the capture ends.
+        assert len(file.getvalue()) > 0
+        events = list(read_capture(io.BytesIO(file.getvalue())))[1:]
+        assert len(events) == port.capture.events
+        assert {e.kind for e in events} == {CAPTURE_TX, CAPTURE_RX}
+        assert b'card.version' in b''.join(
+            e.data for e in events if e.kind == CAPTURE_TX)
+
+    def test_capture_includes_binary_phase(self, serial_capture):
+        path, results = serial_capture
+        events = list(read_capture(path))
+
+        assert events[0] == CAPTURE_SERIAL
+        assert results[1] == PAYLOAD
+        received = b''.join(e.data for e in events[1:]
+                            if e.kind == CAPTURE_RX)
+        # The COBS-encoded payload, terminated by a newline.
+        assert notecard.cobs.cobs_encode(bytearray(PAYLOAD),
+                                         ord('\n')) + b'\n' in received
+
+    def test_timestamps_increase(self, serial_capture):
+        path, _ = serial_capture
+        times = [e.time for e in list(read_capture(path))[1:]]
+
+        assert times == sorted(times)
+
+    def test_other_attributes_come_from_port(self):
+        uart = EmulatedUART(NotecardEmulator())
+        uart.baudrate = 9600
+
+        assert RecordingUART(uart, io.BytesIO()).baudrate == 9600
+
+    def test_rejects_non_capture(self):
+        with pytest.raises(Exception, match='Not a Notecard capture'):
+            list(read_capture(io.BytesIO(b'{"req":"card.version"}\n')))
+
+    def test_rejects_truncated_capture(self):
+        file = io.BytesIO()
+        CaptureWriter(file, CAPTURE_SERIAL).write(CAPTURE_TX, b'hello')
+
+        with pytest.raises(Exception, match='Truncated'):
+            list(read_capture(io.BytesIO(file.getvalue()[:-1])))
+
+
+class TestReplay:
+    def test_serial_replay_reproduces_session(self, serial_capture):
+        path, results = serial_capture
+
+        port = ReplayUART(path, timed=False)
+        assert session(open_serial(port)) == results
+        port.close()
+
+    def test_i2c_replay_reproduces_session(self, tmp_path):
+        path = tmp_path / 'i2c.ncap'
+        with RecordingI2C(EmulatedI2C(NotecardEmulator()), path) as bus:
+            results = session(open_i2c(bus))
+
+        assert next(read_capture(path)) == CAPTURE_I2C
+        assert session(open_i2c(ReplayI2C(path, timed=False))) == results
+
+    def test_i2c_replay_with_smaller_reads(self, tmp_path):
+        path = tmp_path / 'i2c.ncap'
+        with RecordingI2C(EmulatedI2C(NotecardEmulator()), path) as bus:
+            expected = open_i2c(bus).Transaction({'req': 'card.version'})
+
+        card = notecard.OpenI2C(ReplayI2C(path, timed=False), 0, 32)
+        card.SetPacingProfile(PacingProfile(0, 0))
+
+        assert card.Transaction({'req': 'card.version'}) == expected
+
+    def test_timed_replay_keeps_response_latency(self, tmp_path):
+        path = tmp_path / 'slow.ncap'
+        emulator = NotecardEmulator(
+            request_latency_ms={'card.version': 100})
+        with RecordingUART(EmulatedUART(emulator), path) as port:
+            open_serial(port).Transaction({'req': 'card.version'})
+
+        card = open_serial(ReplayUART(path))
+        start = time.monotonic()
+        card.Transaction({'req': 'card.version'})
+        timed = time.monotonic() - start
+
+        card = open_serial(ReplayUART(path, timed=False))
+        start = time.monotonic()
+        card.Transaction({'req': 'card.version'})
+        untimed = time.monotonic() - start
+
+        assert timed >= 0.09
+        assert untimed < 0.05
+
+    def test_response_waits_for_request(self, serial_capture):
+        path, _ = serial_capture
+        port = ReplayUART(path, timed=False)
+
+        # Nothing is readable until the reset newline has been written.
+        assert port.in_waiting == 0
+        port.write(b'\n')
+        assert port.in_waiting > 0
+
+    def test_rejects_capture_from_other_transport(self, serial_capture):
+        path, _ = serial_capture
+
+        with pytest.raises(Exception, match='different transport'):
+            ReplayI2C(path)
@@ -0,0 +1,111 @@
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import codec  # noqa: E402
+from notecard.codec import (  # noqa: E402
+    JsonCodec,
+    OrjsonCodec,
+    UjsonCodec,
+    default_codec,
+    get_codec,
+)
+
+
+def available_codecs():
+    codecs = [JsonCodec()]
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.fixture(params=available_codecs(), ids=lambda c: c.name)
+def any_codec(request):
+    return request.param
+
+
+class TestCodecs:
+    def test_dumps_is_compact_and_matches_json_module(self, any_codec):
+        req = {'req': 'note.add', 'file': 'data.qo',
+               'body': {'temp': 21.5, 'url': 'a/b', 'ok': True}}
+
+        assert any_codec.dumps(req) == JsonCodec().dumps(req)
+
+    @pytest.mark.parametrize('data', [
+        b'{"total":42,"changes":{"a":[1,2.5,null]}}\r\n',
+        bytearray(b'{"total":42}\r\n'),
+        '{"total":42}',
+    ])
+    def test_loads_accepts_str_and_bytes_like(self, any_codec, data):
+        assert any_codec.loads(data) == JsonCodec().loads(data)
+
+    def test_orjson_falls_back_to_json_module_on_type_error(self):
+        pytest.importorskip('orjson')
+        orjson_codec = OrjsonCodec()
+        req = {'req': 'note.add', 'body': {'big': 1 << 70}}
+
+        assert orjson_codec.dumps(req) == JsonCodec().dumps(req)
+
+    def test_get_codec_raises_on_unknown_name(self):
+        with pytest.raises(ValueError, match='Unknown JSON codec'):
+            get_codec('yaml')
+
+    def test_default_codec_prefers_installed_fast_codec(self):
+        # available_codecs lists installed codecs in order of preference,
+        # after the json module.
+        codecs = available_codecs()
+        expected = codecs[1].name if len(codecs) > 1 else 'json'
+
+        assert default_codec().name == expected
+
+    def test_default_codec_is_json_module_when_no_fast_codec(self):
+        with patch.object(codec.OrjsonCodec, '__init__',
+                          side_effect=ImportError), \
+                patch.object(codec.UjsonCodec, '__init__',
+                             side_effect=ImportError):
+            assert default_codec().name == 'json'
+
+    def test_default_codec_is_json_module_off_cpython(self, monkeypatch):
+        monkeypatch.setattr(sys.implementation, 'name', 'micropython')
+
+        assert default_codec().name == 'json'
+
+
+class TestNotecardCodec:
+    def test_set_codec_accepts_name(self):
+        card = notecard.Notecard()
+
+        card.SetCodec('json')
+
+        assert isinstance(card.GetCodec(), JsonCodec)
+        assert card.GetCodec().name == 'json'
+
+    def test_prepare_request_crc_matches_with_any_codec(self, any_codec):
+        card = notecard.Notecard()
+        card.SetCodec(any_codec)
+
+        req_bytes, _ = card._prepare_request({'req': 'card.version'})
+        req_string = req_bytes.decode().rstrip('\n')
+        body, crc_field = req_string.split(',"crc":')
+        crc = int(crc_field.strip('"}').split(':')[1], 16)
+
+        assert crc == notecard.notecard.crc32((body + '}').encode())
+
+    def test_evaluate_response_uses_codec(self, any_codec):
+        card = notecard.Notecard()
+        card.SetCodec(any_codec)
+
+        with patch.object(any_codec, 'loads',
+                          wraps=any_codec.loads) as loads_mock:
+            rsp_json, _ = card._evaluate_response(b'{"total":42}\r\n')
+
+        assert rsp_json == {'total': 42}
+        loads_mock.assert_called_once()
@@ -0,0 +1,73 @@
+import importlib
+import os
+import random
+import sys
+import pytest
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from notecard.crc32 import (  # noqa: E402
+    crc32,
+    _crc32_byte_table,
+    _crc32_half_byte,
+    _crc32_zlib,
+)
+
+BACKENDS = [_crc32_half_byte, _crc32_byte_table, _crc32_zlib]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('data,expected', [
+    (b'', 0x00000000),
+    (b'123456789', 0xCBF43926),
+    (b'{"req":"card.version"}', _crc32_half_byte(b'{"req":"card.version"}')),
+])
+def test_known_values(backend, data, expected):
+    assert backend(data) == expected
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backends_agree_on_random_data(backend):
+    rng = random.Random(1234)
+    for length in (1, 15, 16, 255, 1024):
+        data = bytes(rng.randrange(256) for _ in range(length))
+
+        assert backend(data) == _crc32_half_byte(data)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_accepts_bytearray_and_memoryview(backend):
+    data = bytearray(range(256))
+
+    assert backend(data) == backend(memoryview(data)) == backend(bytes(data))
+
+
+def test_uses_zlib_on_cpython():
+    crc32_module = importlib.import_module('notecard.crc32')
+
+    assert crc32_module.CRC32_BACKEND == 'zlib'
+    assert crc32 is _crc32_zlib
+
+
+def test_uses_byte_table_elsewhere(monkeypatch):
+    monkeypatch.setattr(sys.implementation, 'name', 'micropython')
+    monkeypatch.delitem(sys.modules, 'notecard.crc32')
+
+    crc32_module = importlib.import_module('notecard.crc32')
+
+    assert crc32_module.CRC32_BACKEND == 'table'
+    assert crc32_module.crc32(b'123456789') == 0xCBF43926
+
+
+def test_byte_table_is_built_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'notecard.crc32')
+    crc32_module = importlib.import_module('notecard.crc32')
+
+    assert crc32_module._byte_tables is None
+
+    crc32_module._crc32_byte_table(b'123456789')
+
+    low, high = crc32_module._byte_tables
+    assert low.typecode == high.typecode == 'H'
+    assert len(low) == len(high) == 256
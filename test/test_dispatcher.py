@@ -0,0 +1,207 @@
+import os
+import sys
+import threading
+import pytest
+from concurrent.futures import CancelledError
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard.dispatcher import TransactionDispatcher  # noqa: E402
+
+
+@pytest.fixture
+def arrange_dispatcher_test():
+    with patch('notecard.notecard.time.sleep'):
+        def _arrange_dispatcher_test():
+            card = notecard.Notecard()
+            card._reset_required = False
+            card.Reset = MagicMock()
+            card.lock = MagicMock()
+            card.unlock = MagicMock()
+            card._transaction_manager = MagicMock()
+            card._transact = MagicMock(return_value=b'{}\r\n')
+            card._crc_error = MagicMock(return_value=False)
+
+            return card
+
+        yield _arrange_dispatcher_test
+
+
+def block_first_transact(card):
+    """Make the first _transact wait until the returned event is set."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def transact(*args, **kwargs):
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+        return b'{}\r\n'
+
+    card._transact.side_effect = transact
+    return started, release
+
+
+class TestTransactionDispatcher:
+    def test_submit_returns_future_with_response(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        card._transact.return_value = b'{"version":"notecard-8.1.3"}\r\n'
+
+        with TransactionDispatcher(card) as dispatcher:
+            future = dispatcher.submit({'req': 'card.version'})
+
+            assert future.result(5) == {'version': 'notecard-8.1.3'}
+
+    def test_future_carries_transaction_exception(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        card._crc_error.return_value = True
+
+        with TransactionDispatcher(card) as dispatcher:
+            future = dispatcher.submit({'req': 'card.version'})
+
+            with pytest.raises(Exception, match='Failed to transact'):
+                future.result(5)
+
+    def test_queued_requests_share_one_lock_and_manager_start(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        started, release = block_first_transact(card)
+
+        with TransactionDispatcher(card) as dispatcher:
+            first = dispatcher.submit({'req': 'card.version'})
+            started.wait(5)
+            queued = [dispatcher.submit({'req': 'note.add'}) for _ in range(3)]
+            release.set()
+            for future in [first] + queued:
+                future.result(5)
+
+        assert card._transact.call_count == 4
+        # One burst for the first request, one for the three queued behind it.
+        assert card.lock.call_count == 2
+        assert card._transaction_manager.start.call_count == 2
+        assert card._transaction_manager.stop.call_count == 2
+        assert card.unlock.call_count == 2
+
+    def test_burst_resets_notecard_first_if_required(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        card._reset_required = True
+
+        def reset():
+            card._reset_required = False
+
+        card.Reset.side_effect = reset
+
+        with TransactionDispatcher(card) as dispatcher:
+            dispatcher.submit({'req': 'card.version'}).result(5)
+
+        card.Reset.assert_called_once()
+
+    def test_burst_reset_is_seen_by_observers(self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        card._reset_required = True
+        records = []
+        card.AddObserver(records.append)
+
+        def reset():
+            card._reset_required = False
+
+        card.Reset.side_effect = reset
+
+        with TransactionDispatcher(card) as dispatcher:
+            dispatcher.submit({'req': 'card.version'}).result(5)
+
+        assert records[0].resets == 1
+
+    def test_burst_lock_wait_is_seen_by_observers(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        card.lock.side_effect = lambda: threading.Event().wait(0.05)
+        records = []
+        card.AddObserver(records.append)
+
+        with TransactionDispatcher(card) as dispatcher:
+            dispatcher.submit({'req': 'card.version'}).result(5)
+
+        assert records[0].durations()['lock_wait'] >= 0.05
+        assert card._burst_lock_wait is None
+
+    def test_lock_failure_fails_whole_burst(self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        card.lock.side_effect = Exception('Failed to acquire I2C lock.')
+
+        with TransactionDispatcher(card) as dispatcher:
+            future = dispatcher.submit({'req': 'card.version'})
+
+            with pytest.raises(Exception, match='Failed to acquire'):
+                future.result(5)
+
+        card._transact.assert_not_called()
+        card._transaction_manager.start.assert_not_called()
+
+    def test_cancelled_requests_are_skipped(self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        started, release = block_first_transact(card)
+
+        with TransactionDispatcher(card) as dispatcher:
+            dispatcher.submit({'req': 'card.version'})
+            started.wait(5)
+            cancelled = dispatcher.submit({'req': 'note.add'})
+            cancelled.cancel()
+            release.set()
+
+        with pytest.raises(CancelledError):
+            cancelled.result(0)
+        assert card._transact.call_count == 1
+
+    def test_close_sends_queued_requests_then_rejects_new_ones(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        dispatcher = TransactionDispatcher(card)
+        futures = [dispatcher.submit({'req': 'note.add'}) for _ in range(3)]
+
+        dispatcher.close()
+
+        assert all(f.done() for f in futures)
+        with pytest.raises(Exception, match='Dispatcher is closed'):
+            dispatcher.submit({'req': 'note.add'})
+
+    def test_transaction_outside_burst_starts_manager(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+
+        card.Transaction({'req': 'card.version'})
+
+        card._transaction_manager.start.assert_called_once()
+        card._transaction_manager.stop.assert_called_once()
+
+    def test_other_thread_starts_manager_after_burst(
+            self, arrange_dispatcher_test):
+        card = arrange_dispatcher_test()
+        transport = threading.Lock()
+        card.lock.side_effect = transport.acquire
+        card.unlock.side_effect = transport.release
+        events = []
+        card._transaction_manager.start.side_effect = (
+            lambda *args: events.append('start'))
+        card._transaction_manager.stop.side_effect = (
+            lambda: events.append('stop'))
+
+        card._begin_burst()
+        other = threading.Thread(
+            target=card.Transaction, args=({'req': 'card.version'},))
+        other.start()
+        # The other thread isn't part of the burst, so it waits for the lock
+        # rather than running with the burst's manager.
+        other.join(0.2)
+        assert other.is_alive()
+        card._end_burst()
+        other.join(5)
+
+        assert card._transact.call_count == 1
+        assert events == ['start', 'stop', 'start', 'stop']
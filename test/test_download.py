@@ -0,0 +1,237 @@
+import io
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import binary_helpers  # noqa: E402
+from notecard.download import download  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+from notecard.upload import UploadPolicy  # noqa: E402
+
+DATA = bytes(range(256)) * 14
+
+
+@pytest.fixture
+def emulator():
+    """An emulated Notecard whose 'files' route serves DATA."""
+    emulator = NotecardEmulator()
+    emulator.web_files['files'] = DATA
+    return emulator
+
+
+@pytest.fixture
+def card(emulator):
+    card = notecard.OpenSerial(EmulatedUART(emulator))
+    card.SetPacingProfile(PacingProfile(0, 0))
+    return card
+
+
+def web_gets(emulator):
+    return [(r['offset'], r['max']) for r in emulator.requests
+            if r['req'] == 'web.get']
+
+
+class TestDownload:
+    def test_downloads_to_path(self, card, emulator, tmp_path):
+        path = tmp_path / 'model.bin'
+
+        result = download(card, 'files', path, max_chunk_size=1000)
+
+        assert path.read_bytes() == DATA
+        assert web_gets(emulator) == [(0, 1000), (1000, 1000), (2000, 1000),
+                                      (3000, 1000)]
+        assert result['bytes_downloaded'] == len(DATA)
+        assert result['chunks'] == 4
+
+    def test_downloads_to_file_object(self, card):
+        f = io.BytesIO(b'header')
+        f.seek(0, 2)
+
+        download(card, 'files', f, max_chunk_size=1000)
+
+        assert f.getvalue() == b'header' + DATA
+
+    def test_downloads_to_buffer(self, card):
+        buf = bytearray(len(DATA))
+
+        download(card, 'files', buf, max_chunk_size=1000)
+
+        assert buf == DATA
+
+    def test_raises_if_buffer_is_too_small(self, card):
+        with pytest.raises(Exception, match='longer than the 100 byte'):
+            download(card, 'files', bytearray(100))
+
+    def test_sends_target_as_name(self, card, emulator):
+        emulator.web_files['files/model.bin'] = DATA[:10]
+        buf = bytearray(10)
+
+        download(card, 'files', buf, target='/model.bin')
+
+        assert buf == DATA[:10]
+
+    def test_ends_with_empty_range_at_end_of_data(self, card, emulator):
+        emulator.web_files['files'] = DATA[:2000]
+
+        result = download(card, 'files', io.BytesIO(), max_chunk_size=1000)
+
+        assert web_gets(emulator) == [(0, 1000), (1000, 1000), (2000, 1000)]
+        assert result['chunks'] == 2
+
+    def test_stops_at_length(self, card, emulator):
+        emulator.web_files['files'] = DATA[:2000]
+
+        download(card, 'files', io.BytesIO(), length=2000,
+                 max_chunk_size=1000)
+
+        assert web_gets(emulator) == [(0, 1000), (1000, 1000)]
+
+    def test_raises_if_data_is_shorter_than_length(self, card):
+        with pytest.raises(Exception, match='ended after 3584 of 4000'):
+            download(card, 'files', io.BytesIO(), length=4000)
+
+    def test_raises_on_client_error(self, card):
+        with pytest.raises(Exception, match='web.get failed: HTTP 404'):
+            download(card, 'missing', io.BytesIO())
+
+    def test_validates_arguments(self, card):
+        with pytest.raises(ValueError, match='route'):
+            download(card, '', io.BytesIO())
+        with pytest.raises(ValueError, match='negative'):
+            download(card, 'files', io.BytesIO(), offset=-1)
+        with pytest.raises(ValueError, match='resume'):
+            download(card, 'files', io.BytesIO(), resume=True)
+
+
+class TestResumedDownload:
+    def test_resumes_from_end_of_file(self, card, emulator, tmp_path):
+        path = tmp_path / 'model.bin'
+        path.write_bytes(DATA[:1500])
+
+        result = download(card, 'files', path, resume=True,
+                          max_chunk_size=1000)
+
+        assert path.read_bytes() == DATA
+        assert web_gets(emulator)[0] == (1500, 1000)
+        assert result['resumed_offset'] == 1500
+        assert result['bytes_downloaded'] == len(DATA) - 1500
+
+    def test_resume_without_file_starts_at_beginning(self, card, tmp_path):
+        path = tmp_path / 'model.bin'
+
+        result = download(card, 'files', path, resume=True)
+
+        assert path.read_bytes() == DATA
+        assert result['resumed_offset'] == 0
+
+    def test_offset_truncates_stale_data(self, card, tmp_path):
+        path = tmp_path / 'model.bin'
+        path.write_bytes(DATA[:1000] + bytes(5000))
+
+        download(card, 'files', path, offset=1000)
+
+        assert path.read_bytes() == DATA
+
+    def test_file_without_truncate(self, card, tmp_path):
+        class UntruncatableFile:
+            """A file like MicroPython's, which has no truncate."""
+
+            def __init__(self, f):
+                self._f = f
+
+            def __getattr__(self, name):
+                if name == 'truncate':
+                    raise AttributeError(name)
+                return getattr(self._f, name)
+
+        path = tmp_path / 'model.bin'
+        path.write_bytes(DATA[:1000])
+        real_open = open
+
+        with patch('builtins.open',
+                   lambda *args: UntruncatableFile(real_open(*args))):
+            download(card, 'files', str(path), resume=True)
+
+        assert path.read_bytes() == DATA
+
+    def test_offset_into_buffer(self, card):
+        buf = bytearray(len(DATA))
+
+        download(card, 'files', buf, offset=1000)
+
+        assert buf == bytes(1000) + DATA[1000:]
+
+
+class TestDownloadRetries:
+    def test_rereads_range_with_bad_md5(self, card):
+        receive = binary_helpers.binary_store_receive
+        calls = []
+
+        def flaky_receive(card, offset, length):
+            calls.append(length)
+            if len(calls) == 1:
+                raise Exception('Computed MD5 does not match received MD5.')
+            return receive(card, offset, length)
+
+        buf = bytearray(len(DATA))
+        with patch('notecard.download.binary_store_receive',
+                   side_effect=flaky_receive):
+            download(card, 'files', buf)
+
+        assert calls == [len(DATA), len(DATA)]
+        assert buf == DATA
+
+    def test_shrinks_range_after_timeouts(self, card, emulator):
+        web_get = emulator.handlers['web.get']
+
+        def flaky_web_get(req):
+            # Ranges of more than 1000 bytes time out.
+            if req['max'] > 1000:
+                return {'err': 'request timed out {timeout}'}
+            return web_get(req)
+
+        emulator.handlers['web.get'] = flaky_web_get
+        buf = bytearray(len(DATA))
+        policy = UploadPolicy(min_chunk_size=500, grow_after=0)
+
+        with patch('notecard.upload.time.sleep'):
+            result = download(card, 'files', buf, max_chunk_size=2000,
+                              policy=policy)
+
+        assert buf == DATA
+        assert web_gets(emulator) == [(0, 2000), (0, 1000), (1000, 1000),
+                                      (2000, 1000), (3000, 1000)]
+        assert result['retries'] == 1
+        assert result['backoff_secs'] > 0
+        assert result['chunk_size'] == 1000
+
+
+class TestDownloadProgress:
+    def test_reports_progress_per_range(self, card):
+        progress = []
+
+        download(card, 'files', io.BytesIO(), length=len(DATA),
+                 max_chunk_size=1000, progress_cb=progress.append)
+
+        assert [p['chunk'] for p in progress] == [1, 2, 3, 4]
+        assert [p['total_chunks'] for p in progress] == [4, 4, 4, 4]
+        assert [p['bytes_received'] for p in progress] == [
+            1000, 2000, 3000, len(DATA)]
+        assert progress[-1]['percent_complete'] == 100
+        assert progress[-1]['eta_secs'] == 0
+
+    def test_totals_unknown_without_length(self, card):
+        progress = []
+
+        download(card, 'files', io.BytesIO(), progress_cb=progress.append)
+
+        assert len(progress) == 1
+        assert progress[0]['total_bytes'] is None
+        assert progress[0]['total_chunks'] is None
+        assert progress[0]['percent_complete'] is None
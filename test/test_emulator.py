@@ -0,0 +1,175 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import binary_helpers, upload  # noqa: E402
+from notecard.emulator import (  # noqa: E402
+    EmulatedI2C,
+    EmulatedSerialPort,
+    EmulatedUART,
+    NotecardEmulator,
+)
+from notecard.pacing import PacingProfile  # noqa: E402
+
+
+def read_all(emulator, now=None):
+    return emulator.read(4096, now=now)
+
+
+@pytest.fixture
+def emulator():
+    return NotecardEmulator()
+
+
+@pytest.fixture
+def i2c_card(emulator):
+    card = notecard.OpenI2C(EmulatedI2C(emulator), 0, 0)
+    card.SetPacingProfile(PacingProfile(0, 0))
+
+    return card
+
+
+class TestNotecardEmulator:
+    def test_answers_bare_newline_with_crlf(self, emulator):
+        emulator.write(b'\n')
+
+        assert read_all(emulator) == b'\r\n'
+
+    def test_commands_get_no_response(self, emulator):
+        emulator.write(b'{"cmd":"note.add","body":{"temp":21}}\n')
+
+        assert read_all(emulator) == b''
+        assert emulator.notes == {'data.qo': [{'temp': 21}]}
+
+    def test_unknown_request_gets_error(self, emulator):
+        emulator.write(b'{"req":"hub.teleport"}\n')
+
+        assert b'unknown request: hub.teleport' in read_all(emulator)
+
+    def test_rejects_request_with_bad_crc(self, emulator):
+        emulator.write(b'{"req":"card.version","crc":"0005:00000000"}\n')
+
+        rsp = read_all(emulator)
+
+        assert b'CRC error {io}' in rsp
+        assert b'"crc":"0005:' in rsp
+        assert emulator.requests == []
+
+    def test_response_is_held_until_latency_elapses(self):
+        emulator = NotecardEmulator(latency_ms=100,
+                                    request_latency_ms={'web.post': 500})
+
+        emulator.write(b'{"req":"card.version"}\n', now=10)
+        emulator.write(b'{"req":"web.post"}\n', now=10)
+
+        assert emulator.available(now=10.05) == 0
+        assert b'notecard-emulator' in read_all(emulator, now=10.1)
+        assert emulator.available(now=10.4) == 0
+        assert b'"result":200' in read_all(emulator, now=10.5)
+
+    def test_input_buffer_overrun_gives_io_error(self):
+        emulator = NotecardEmulator(rx_buffer_size=32, rx_bytes_per_sec=1000)
+        req = b'{"req":"card.version","pad":"' + b'x' * 64 + b'"}\n'
+
+        emulator.write(req[:32], now=0)
+        # Most of this is lost, including the newline.
+        emulator.write(req[32:], now=0.001)
+        assert read_all(emulator) == b''
+        emulator.write(b'\n', now=1)
+
+        assert b'serial overrun {io}' in read_all(emulator)
+
+    def test_input_buffer_drains_at_configured_rate(self):
+        emulator = NotecardEmulator(rx_buffer_size=32, rx_bytes_per_sec=1000)
+        req = b'{"req":"card.version","pad":"' + b'x' * 64 + b'"}\n'
+
+        for i in range(0, len(req), 32):
+            emulator.write(req[i:i + 32], now=i / 1000)
+
+        assert b'notecard-emulator' in read_all(emulator)
+
+
+class TestEmulatedI2C:
+    def test_transaction(self, i2c_card, emulator):
+        rsp = i2c_card.Transaction({'req': 'card.version'})
+
+        assert rsp['version'] == 'notecard-emulator'
+        assert emulator.requests[-1] == {'req': 'card.version'}
+
+    def test_binary_round_trip(self, i2c_card):
+        data = bytes(range(256)) * 8
+
+        binary_helpers.binary_store_reset(i2c_card)
+        binary_helpers.binary_store_transmit(i2c_card, data, 0)
+        binary_helpers.binary_store_transmit(i2c_card, data, len(data))
+
+        assert binary_helpers.binary_store_decoded_length(i2c_card) == \
+            2 * len(data)
+        assert binary_helpers.binary_store_receive(
+            i2c_card, len(data), len(data)) == data
+
+    def test_upload_records_web_posts(self, i2c_card, emulator):
+        data = bytes(range(256)) * 20
+
+        upload.upload(i2c_card, data, 'my-route', max_chunk_size=2000)
+
+        assert [p['req']['offset'] for p in emulator.web_posts] == \
+            [0, 2000, 4000]
+        assert b''.join(p['payload'] for p in emulator.web_posts) == data
+
+    def test_raises_on_wrong_address(self, emulator):
+        i2c = EmulatedI2C(emulator)
+
+        with pytest.raises(OSError):
+            i2c.writeto(0x42, b'\x01\n')
+
+    def test_micropython_and_circuitpython_calls(self, emulator):
+        i2c = EmulatedI2C(emulator)
+        i2c.writeto(0x17, b'\x01\n')
+        header = bytearray(2)
+        rsp = bytearray(4)
+
+        i2c.writeto_then_readfrom(0x17, b'\x00\x00', header)
+        i2c.writeto(0x17, bytes([0, header[0]]), False)
+        i2c.readfrom_into(0x17, rsp)
+
+        assert header == bytearray([2, 0])
+        assert rsp == bytearray([0, 2]) + b'\r\n'
+
+
+class TestEmulatedUART:
+    def test_binary_round_trip(self, emulator):
+        card = notecard.OpenSerial(EmulatedUART(emulator))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        data = bytes(range(256)) * 8
+
+        binary_helpers.binary_store_transmit(card, data, 0)
+
+        assert binary_helpers.binary_store_receive(card, 0, len(data)) == data
+
+
+class TestEmulatedSerialPort:
+    def test_transaction_and_binary_round_trip(self, emulator):
+        serial = pytest.importorskip('serial')
+        data = bytes(range(256)) * 8
+
+        with EmulatedSerialPort(emulator) as endpoint:
+            port = serial.Serial(endpoint.port, 115200)
+            try:
+                card = notecard.OpenSerial(port)
+                card.SetPacingProfile(PacingProfile(0, 0))
+
+                rsp = card.Transaction({'req': 'card.version'})
+                binary_helpers.binary_store_reset(card)
+                binary_helpers.binary_store_transmit(card, data, 0)
+                received = binary_helpers.binary_store_receive(
+                    card, 0, len(data))
+            finally:
+                port.close()
+
+        assert rsp['version'] == 'notecard-emulator'
+        assert received == data
@@ -9,6 +9,7 @@ sys.path.insert(0,
                 os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import notecard  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
 
 
 @pytest.fixture
@@ -141,6 +142,51 @@ class TestI2C:
 
         assert card._reset_required
 
+    def test_reset_retries_as_soon_as_stale_data_stops(
+            self, arrange_reset_test):
+        card = arrange_reset_test()
+        card._read.side_effect = [(0, b'{"err":"x"}\r\n'), (0, b'\r\n')]
+
+        # The quiet time has passed whenever it's checked, the drain timeout
+        # never has.
+        def quiet_timed_out(start, timeout_secs):
+            return timeout_secs != notecard.CARD_RESET_DRAIN_MS / 1000
+
+        with patch('notecard.notecard.has_timed_out',
+                   side_effect=quiet_timed_out):
+            card.Reset()
+
+        assert card._write.call_count == 2
+        assert not card._reset_required
+        notecard.notecard.time.sleep.assert_not_called()
+
+    def test_reset_polls_for_echo(self, arrange_reset_test):
+        card = arrange_reset_test()
+        card._read.side_effect = [(0, b''), (0, b''), (2, b''), (0, b'\r\n')]
+
+        with patch('notecard.notecard.has_timed_out',
+                   side_effect=TrueOnNthIteration(5)):
+            card.Reset()
+
+        assert card._read.call_args_list[-1].args == (2,)
+        sleeps = [c.args[0] for c in
+                  notecard.notecard.time.sleep.call_args_list]
+        assert sleeps == [notecard.notecard.CARD_I2C_POLL_MIN_MS / 1000,
+                          notecard.notecard.CARD_I2C_POLL_MIN_MS * 2 / 1000]
+
+    def test_reset_waits_paced_segment_delay_after_read_error(
+            self, arrange_reset_test):
+        card = arrange_reset_test()
+        card.SetPacingProfile(PacingProfile(40, 20))
+        card._read.side_effect = [Exception('read failed.'), (0, b'\r\n')]
+
+        with patch('notecard.notecard.has_timed_out',
+                   side_effect=TrueOnNthIteration(4)):
+            card.Reset()
+
+        assert not card._reset_required
+        notecard.notecard.time.sleep.assert_any_call(0.04)
+
     # __init__ tests.
     def test_init_calls_reset(self):
         with patch('notecard.notecard.OpenI2C.Reset') as reset_mock:
@@ -328,6 +374,19 @@ class TestI2C:
         for write_call in write_mock.call_args_list:
             assert len(write_call[0][0]) <= card.max
 
+    def test_transmit_writes_views_into_data(self, arrange_test):
+        card = arrange_test()
+        data = bytearray(card.max * 2 + 15)
+        write_mock = MagicMock()
+        card._write = write_mock
+
+        card.transmit(data)
+
+        for write_call in write_mock.call_args_list:
+            chunk = write_call[0][0]
+            assert isinstance(chunk, memoryview)
+            assert chunk.obj is data
+
     # _transact tests.
     def test_transact_calls_transmit_with_req_bytes(
             self, arrange_transact_test):
@@ -375,6 +434,45 @@ class TestI2C:
                                       'available data.')):
                 card._transact(req_bytes, rsp_expected=True)
 
+    def test_transact_backs_off_exponentially_while_polling(
+            self, arrange_transact_test):
+        card, req_bytes = arrange_transact_test()
+        card._read = MagicMock(side_effect=[(0, bytearray())] * 7 + [
+            (1, bytearray())])
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            card._transact(req_bytes, rsp_expected=True)
+
+        delays = [c.args[0] for c in sleep_mock.call_args_list]
+        assert delays == [0.001, 0.002, 0.004, 0.008, 0.016, 0.032, 0.05, 0.05]
+
+    def test_transact_polls_slower_for_long_running_requests(
+            self, arrange_transact_test):
+        card, req_bytes = arrange_transact_test()
+        card._read = MagicMock(return_value=(1, bytearray()))
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            card._transact(req_bytes, rsp_expected=True, timeout_secs=90)
+
+        sleep_mock.assert_called_once_with(
+            notecard.CARD_I2C_POLL_NETWORK_MS / 1000)
+
+    def test_receive_resets_poll_delay_when_data_arrives(self, arrange_test):
+        card = arrange_test()
+        card._read = MagicMock(side_effect=[
+            (0, bytearray()),
+            (0, bytearray()),
+            (0, bytearray(b'{}')),
+            (0, bytearray()),
+            (0, bytearray(b'\r\n')),
+        ])
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            card.receive()
+
+        delays = [c.args[0] for c in sleep_mock.call_args_list]
+        assert delays == [0.001, 0.002, 0.001, 0.002]
+
     # _read tests.
     def test_read_sends_the_initial_read_packet_correctly(
             self, arrange_read_test):
@@ -432,6 +530,45 @@ class TestI2C:
         with pytest.raises(Exception, match=exception_msg):
             card._read(len(data))
 
+    @pytest.mark.parametrize('length', [0, 4, 255])
+    def test_read_reuses_buffers(self, arrange_read_test, length):
+        card = arrange_read_test(0, length, b'\x00' * length)
+
+        card._read(length)
+        card._read(length)
+
+        first, second = card._platform_read.call_args_list
+        assert first.args[0] is second.args[0]
+        assert first.args[1].obj is card._read_buf.obj
+        assert second.args[1].obj is card._read_buf.obj
+
+    def test_cpython_read_fills_read_buffer(self, arrange_test):
+        card = arrange_test()
+
+        def transfer(address, msgs):
+            msgs[1].data = bytearray(b'\x00\x02hi')
+        card.i2c.transfer.side_effect = transfer
+
+        assert card._read(2) == (0, b'hi')
+
+    def test_cpython_read_reuses_read_message(self, arrange_test):
+        card = arrange_test()
+        read_msgs = []
+
+        def transfer(address, msgs):
+            read_msgs.append(msgs[1])
+            length = len(msgs[1].data)
+            msgs[1].data = bytearray([0, length - 2]) + bytearray(length - 2)
+        card.i2c.transfer.side_effect = transfer
+
+        card._read(0)
+        card._read(0)
+        card._read(2)
+
+        assert read_msgs[0] is read_msgs[1]
+        assert read_msgs[2] is not read_msgs[0]
+        assert len(read_msgs[2].data) == 4
+
     # _write tests.
     def test_write_calls_platform_write_correctly(self, arrange_test):
         card = arrange_test()
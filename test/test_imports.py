@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import mock_open, patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import gpio  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def modules_loaded_by(statement, modules):
+    """Return which of `modules` are imported after running `statement`."""
+    script = (f'import sys; {statement}; '
+              f'print(*[m for m in {modules!r} if m in sys.modules])')
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                         text=True, check=True, cwd=ROOT).stdout
+    return out.split()
+
+
+class TestLazyImports:
+    def test_import_notecard_skips_optional_dependencies(self):
+        assert modules_loaded_by(
+            'import notecard',
+            ('filelock', 'periphery', 'RPi', 'notecard.md5')) == []
+
+    def test_transaction_manager_does_not_probe_gpio(self):
+        assert modules_loaded_by(
+            'import notecard.transaction_manager', ('RPi',)) == []
+
+    def test_serial_lock_timeout_is_filelock_timeout(self):
+        from filelock import Timeout
+
+        assert notecard.SerialLockTimeout is Timeout
+        assert notecard.notecard.SerialLockTimeout is Timeout
+
+    def test_unknown_attribute_still_raises(self):
+        with pytest.raises(AttributeError):
+            notecard.NoSuchThing
+
+
+class TestGPIO:
+    def test_setup_off_raspbian_raises_not_implemented(self):
+        with patch.object(gpio, '_rpi_checked', False), \
+                patch('builtins.open', mock_open(read_data='ID=debian\n')):
+            with pytest.raises(NotImplementedError):
+                gpio.GPIO.setup(1, gpio.GPIO.OUT)
+
+    def test_os_release_is_only_read_once(self):
+        with patch.object(gpio, '_rpi_checked', False), \
+                patch('builtins.open',
+                      mock_open(read_data='ID=debian\n')) as open_mock:
+            assert gpio._load_rpi_gpio() is None
+            assert gpio._load_rpi_gpio() is None
+
+        open_mock.assert_called_once_with('/etc/os-release', 'r')
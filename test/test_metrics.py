@@ -0,0 +1,156 @@
+import os
+import sys
+import urllib.request
+import pytest
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import metrics  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.observer import TransactionAttempt, TransactionRecord  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+
+def make_record(req, outcomes, total=0.2, lock_wait=0.0, error=None):
+    record = TransactionRecord({'req': req})
+    record.timestamps = {'start': 0.0, 'lock_start': 0.0,
+                         'lock_end': lock_wait, 'end': total}
+    for outcome in outcomes:
+        attempt = record.begin_attempt(30)
+        attempt.timestamps = {'start': 0.0, 'transmitted': 0.01,
+                              'first_byte': 0.03, 'received': 0.04}
+        if outcome != 'transport':
+            attempt.bytes_received = 50
+        attempt.set_outcome(outcome)
+        if outcome == 'transport':
+            attempt.mark('reset_start')
+            attempt.mark('reset_end')
+    record.error = error
+
+    return record
+
+
+@pytest.fixture
+def card():
+    card = notecard.OpenSerial(EmulatedUART(NotecardEmulator()))
+    card.SetPacingProfile(PacingProfile(0, 0))
+
+    return card
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative_and_inclusive(self):
+        hist = metrics.Histogram((0.1, 1))
+
+        for value in (0.05, 0.1, 0.5, 5):
+            hist.observe(value)
+
+        assert hist.cumulative() == [(0.1, 2), (1, 3), (float('inf'), 4)]
+        assert hist.count == 4
+        assert hist.sum == pytest.approx(5.65)
+
+
+class TestTransportMetrics:
+    def test_counts_records(self):
+        m = metrics.TransportMetrics()
+
+        m(make_record('card.version', ['ok'], lock_wait=0.5))
+        m(make_record('note.add', ['crc', 'seq', 'io', 'ok']))
+        m(make_record('note.add', ['transport'] * 5,
+                      error='Failed to transact with Notecard.'))
+
+        assert m.transactions == {'card.version': 1, 'note.add': 2}
+        assert m.failures == {'note.add': 1}
+        # The last of the five failed transport attempts wasn't retried.
+        assert m.retries == 7
+        assert m.crc_errors == 1
+        assert m.sequence_mismatches == 1
+        assert m.io_errors == 1
+        assert m.transport_errors == 5
+        assert m.resets == 5
+        assert m.bytes_sent == 30 * 10
+        assert m.bytes_received == 50 * 5
+        assert m.lock_wait_seconds == 0.5
+        assert m.latency['note.add'].count == 2
+        assert m.response_wait.count == 10
+
+    def test_counts_real_transactions(self, card):
+        m = card.GetMetrics()
+
+        card.Transaction({'req': 'card.version'})
+        card.Transaction({'req': 'card.version'})
+
+        assert card.GetMetrics() is m
+        assert m.transactions == {'card.version': 2}
+        assert m.bytes_sent > 0
+        assert m.bytes_received > 0
+        assert m.latency['card.version'].count == 2
+
+    def test_sequence_mismatch_is_recorded(self, card):
+        card._attempt = TransactionAttempt(0)
+        card._last_request_seq_number = 4
+
+        assert card._crc_error(b'{"a":1,"crc":"0003:00000000"}')
+        assert card._attempt.outcome == 'seq'
+
+
+class TestRenderPrometheus:
+    def test_renders_counters_and_histograms(self):
+        m = metrics.TransportMetrics(labels={'card': 'gw-1'},
+                                     buckets=(0.1, 1))
+        m(make_record('card.version', ['crc', 'ok'], total=0.25))
+
+        text = metrics.render_prometheus(m)
+
+        assert '# TYPE notecard_transactions_total counter\n' in text
+        assert ('notecard_transactions_total{card="gw-1",req="card.version"}'
+                ' 1\n') in text
+        assert 'notecard_crc_errors_total{card="gw-1"} 1\n' in text
+        assert '# TYPE notecard_transaction_duration_seconds histogram\n' \
+            in text
+        assert ('notecard_transaction_duration_seconds_bucket{card="gw-1",'
+                'req="card.version",le="0.1"} 0\n') in text
+        assert ('notecard_transaction_duration_seconds_bucket{card="gw-1",'
+                'req="card.version",le="+Inf"} 1\n') in text
+        assert ('notecard_transaction_duration_seconds_sum{card="gw-1",'
+                'req="card.version"} 0.25\n') in text
+        assert 'notecard_response_wait_seconds_count{card="gw-1"} 2\n' in text
+
+    def test_merges_families_across_metrics(self):
+        a = metrics.TransportMetrics(labels={'card': 'a'})
+        b = metrics.TransportMetrics(labels={'card': 'b'})
+
+        text = metrics.render_prometheus(a, b)
+
+        assert text.count('# TYPE notecard_resets_total counter') == 1
+        assert 'notecard_resets_total{card="a"} 0\n' in text
+        assert 'notecard_resets_total{card="b"} 0\n' in text
+
+    def test_escapes_label_values(self):
+        m = metrics.TransportMetrics(labels={'card': 'a"b\\c\nd'})
+
+        text = metrics.render_prometheus(m)
+
+        assert 'notecard_resets_total{card="a\\"b\\\\c\\nd"} 0\n' in text
+
+
+class TestMetricsExporter:
+    def test_serves_metrics(self):
+        m = metrics.TransportMetrics()
+        m(make_record('card.version', ['ok']))
+
+        with metrics.MetricsExporter([m], port=0, addr='127.0.0.1') as e:
+            url = f'http://127.0.0.1:{e.port}/metrics'
+            with urllib.request.urlopen(url, timeout=5) as rsp:
+                body = rsp.read().decode()
+                content_type = rsp.headers['Content-Type']
+
+        assert content_type == metrics.PROMETHEUS_CONTENT_TYPE
+        assert body == metrics.render_prometheus(m)
+
+    def test_listens_on_loopback_by_default(self):
+        with metrics.MetricsExporter([metrics.TransportMetrics()],
+                                     port=0) as e:
+            assert e._server.server_address[0] == '127.0.0.1'
@@ -24,6 +24,8 @@ def arrange_transaction_test():
             card.unlock = MagicMock()
             card._transact = MagicMock(return_value=b'{}\r\n')
             card._crc_error = MagicMock(return_value=False)
+            # Use the json module so tests can patch notecard.codec.json.
+            card.SetCodec('json')
 
             return card
 
@@ -145,6 +147,38 @@ class TestNotecard:
 
         assert not error
 
+    def test_crc_error_ignores_crc_key_inside_body(self):
+        card = notecard.Notecard()
+        card._card_supports_crc = False
+        rsp_bytes = b'{"body":{"crc":"not-a-crc"},"total":1}\r\n'
+
+        error = card._crc_error(rsp_bytes)
+
+        assert not error
+        assert not card._card_supports_crc
+
+    def test_crc_error_does_not_decode_json(self):
+        card = notecard.Notecard()
+        card._last_request_seq_number = 42
+
+        with patch.object(card._codec, 'loads') as loads_mock:
+            card._crc_error(b'{"crc":"002A:A3A6BF43"}\r\n')
+
+        loads_mock.assert_not_called()
+
+    def test_evaluate_response_decodes_json_once(self):
+        card = notecard.Notecard()
+        card._last_request_seq_number = 42
+        rsp_bytes = b'{"connected": true,"crc": "002A:025A2457"}\r\n'
+
+        with patch.object(card._codec, 'loads',
+                          wraps=card._codec.loads) as loads_mock:
+            rsp_json, verdict = card._evaluate_response(rsp_bytes)
+
+        assert rsp_json['connected']
+        assert verdict == notecard.notecard._RSP_OK
+        loads_mock.assert_called_once()
+
     # Transaction tests.
     def arrange_transaction_test(self):
         card = notecard.Notecard()
@@ -271,7 +305,7 @@ class TestNotecard:
         card = arrange_transaction_test()
         req = {"req": "hub.status"}
 
-        with patch('notecard.notecard.json.loads',
+        with patch('notecard.codec.json.loads',
                    side_effect=Exception('json.loads failed.')):
             with pytest.raises(
                     Exception, match='Failed to transact with Notecard.'):
@@ -285,7 +319,7 @@ class TestNotecard:
         card = arrange_transaction_test()
         req = {"req": "hub.status"}
 
-        with patch('notecard.notecard.json.loads',
+        with patch('notecard.codec.json.loads',
                    return_value={'err': 'some {io} error'}):
             with pytest.raises(
                     Exception, match='Failed to transact with Notecard.'):
@@ -299,7 +333,7 @@ class TestNotecard:
         card = arrange_transaction_test()
         req = {"req": "hub.status"}
 
-        with patch('notecard.notecard.json.loads',
+        with patch('notecard.codec.json.loads',
                    return_value={'err': 'some error {io} {not-supported}'}):
             card.Transaction(req)
             assert card._transact.call_count == 1
@@ -309,7 +343,7 @@ class TestNotecard:
         card = arrange_transaction_test()
         req = {"req": "hub.status"}
 
-        with patch('notecard.notecard.json.loads',
+        with patch('notecard.codec.json.loads',
                    return_value={'err': 'a {bad-bin} error'}):
             with pytest.raises(
                     Exception, match='Failed to transact with Notecard.'):
@@ -338,7 +372,7 @@ class TestNotecard:
         valid_response = b'{"total":42}\r\n'
         card._transact.side_effect = [heartbeat_response] * num_heartbeats + [valid_response]
 
-        with patch('notecard.notecard.json.loads') as mock_loads:
+        with patch('notecard.codec.json.loads') as mock_loads:
             mock_loads.side_effect = json_responses
             if debug_enabled:
                 with patch('builtins.print') as mock_print:
@@ -369,7 +403,7 @@ class TestNotecard:
             {'total': 42}
         ]
 
-        with patch('notecard.notecard.json.loads') as mock_loads:
+        with patch('notecard.codec.json.loads') as mock_loads:
             mock_loads.side_effect = json_responses
             with patch('builtins.print') as mock_print:
                 result = card.Transaction(req)
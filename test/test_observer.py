@@ -0,0 +1,185 @@
+import asyncio
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import aio, observer  # noqa: E402
+from notecard.emulator import EmulatedI2C, EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+
+
+@pytest.fixture
+def emulator():
+    return NotecardEmulator()
+
+
+@pytest.fixture
+def serial_card(emulator):
+    card = notecard.OpenSerial(EmulatedUART(emulator))
+    card.SetPacingProfile(PacingProfile(0, 0))
+
+    return card
+
+
+@pytest.fixture
+def records(serial_card):
+    records = []
+    serial_card.AddObserver(records.append)
+
+    return records
+
+
+class TestTransactionRecord:
+    def test_durations_sum_phases_over_attempts(self):
+        record = observer.TransactionRecord({'req': 'card.version'})
+        record.timestamps = {'start': 0.0, 'encoded': 0.5, 'end': 10.0}
+        for start in (1.0, 5.0):
+            attempt = record.begin_attempt(10)
+            attempt.timestamps = {'start': start, 'transmitted': start + 1,
+                                  'first_byte': start + 2.5,
+                                  'received': start + 3}
+
+        assert record.durations() == {
+            'encode': 0.5,
+            'transmit': 2.0,
+            'wait': 3.0,
+            'receive': 1.0,
+            'total': 10.0,
+        }
+
+    def test_retries_and_byte_counts(self):
+        record = observer.TransactionRecord({'cmd': 'note.add'})
+        for outcome, nbytes in (('crc', 20), ('transport', 0), ('ok', 20)):
+            attempt = record.begin_attempt(15)
+            attempt.received(nbytes)
+            attempt.set_outcome(outcome)
+
+        assert record.req == 'note.add'
+        assert record.retries == 2
+        assert record.bytes_sent == 45
+        assert record.bytes_received == 40
+        assert record.to_dict()['attempts'][1]['outcome'] == 'transport'
+
+    def test_last_failed_attempt_is_not_a_retry(self):
+        record = observer.TransactionRecord({'req': 'card.version'})
+        record.begin_attempt(15).set_outcome('transport')
+
+        assert record.retries == 0
+
+    def test_first_outcome_sticks(self):
+        attempt = observer.TransactionAttempt(1)
+
+        attempt.set_outcome('transport')
+        attempt.set_outcome('ok')
+
+        assert attempt.outcome == 'transport'
+
+
+class TestObservers:
+    def test_observer_gets_record_per_transaction(self, serial_card,
+                                                  records):
+        serial_card.Transaction({'req': 'card.version'})
+        serial_card.Transaction({'cmd': 'note.add', 'body': {'temp': 1}})
+
+        assert [r.req for r in records] == ['card.version', 'note.add']
+        version, command = records
+        assert version.error is None
+        assert version.retries == 0
+        assert [a.outcome for a in version.attempts] == ['ok']
+        assert version.bytes_sent > 0
+        assert version.bytes_received > 0
+        assert command.bytes_received == 0
+
+    def test_record_has_phase_timestamps(self, serial_card, records):
+        serial_card.Transaction({'req': 'card.version'})
+
+        record = records[0]
+        assert {'start', 'encoded', 'tm_start', 'tm_end', 'lock_start',
+                'lock_end', 'end'} <= set(record.timestamps)
+        assert {'start', 'transmitted', 'first_byte',
+                'received'} <= set(record.attempts[0].timestamps)
+        durations = record.durations()
+        assert {'encode', 'lock_wait', 'transmit', 'wait', 'receive',
+                'total'} <= set(durations)
+        assert all(d >= 0 for d in durations.values())
+
+    def test_crc_error_is_counted_as_retry(self, serial_card, records):
+        with patch.object(serial_card, '_crc_error',
+                          side_effect=[True, False]), \
+                patch('notecard.notecard.time.sleep'):
+            serial_card.Transaction({'req': 'card.version'})
+
+        assert [a.outcome for a in records[0].attempts] == ['crc', 'ok']
+        assert records[0].retries == 1
+
+    def test_transport_failure_records_reset_and_error(self, serial_card,
+                                                       records):
+        with patch.object(serial_card, '_transact',
+                          side_effect=Exception('boom')), \
+                patch.object(serial_card, 'Reset'), \
+                patch('notecard.notecard.time.sleep'):
+            with pytest.raises(Exception, match='Failed to transact'):
+                serial_card.Transaction({'req': 'card.version'})
+
+        record = records[0]
+        assert record.error == 'Failed to transact with Notecard.'
+        # The last failed attempt isn't retried.
+        assert record.retries == notecard.notecard.CARD_TRANSACTION_RETRIES - 1
+        # The last failure leaves the reset to the next transaction.
+        assert record.resets == notecard.notecard.CARD_TRANSACTION_RETRIES - 1
+
+    def test_failing_observer_does_not_break_transaction(self, serial_card,
+                                                         records):
+        serial_card.AddObserver(MagicMock(side_effect=Exception('bad')))
+        late = MagicMock()
+        serial_card.AddObserver(late)
+
+        rsp = serial_card.Transaction({'req': 'card.version'})
+
+        assert 'version' in rsp
+        assert len(records) == 1
+        late.assert_called_once()
+
+    def test_remove_observer(self, serial_card, records):
+        serial_card.RemoveObserver(records.append)
+
+        serial_card.Transaction({'req': 'card.version'})
+
+        assert records == []
+
+    def test_no_record_without_observers(self, serial_card):
+        with patch('notecard.notecard.TransactionRecord') as record_mock:
+            serial_card.Transaction({'req': 'card.version'})
+
+        record_mock.assert_not_called()
+        assert serial_card._attempt is observer.NULL_ATTEMPT
+
+    def test_i2c_record(self, emulator):
+        card = notecard.OpenI2C(EmulatedI2C(emulator), 0, 0)
+        card.SetPacingProfile(PacingProfile(0, 0))
+        records = []
+        card.AddObserver(records.append)
+
+        card.Transaction({'req': 'card.version'})
+
+        assert {'transmitted', 'first_byte',
+                'received'} <= set(records[0].attempts[0].timestamps)
+
+    def test_async_record(self, emulator):
+        card = aio.AsyncOpenSerial(EmulatedUART(emulator))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        records = []
+        card.AddObserver(records.append)
+
+        asyncio.run(card.Transaction({'req': 'card.version'}))
+
+        record = records[0]
+        assert record.req == 'card.version'
+        assert [a.outcome for a in record.attempts] == ['ok']
+        assert {'transmitted', 'first_byte',
+                'received'} <= set(record.attempts[0].timestamps)
@@ -0,0 +1,141 @@
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard.pacing import PacingProfile, calibrate, PACING_PRESETS  # noqa: E402
+from notecard.retry import NO_RETRY  # noqa: E402
+
+
+@pytest.fixture
+def serial_card():
+    with patch('notecard.notecard.OpenSerial.Reset'):
+        card = notecard.OpenSerial(MagicMock())
+    card.uart.write = MagicMock()
+
+    return card
+
+
+@pytest.fixture
+def calibrate_card():
+    card = notecard.Notecard()
+    card.Transaction = MagicMock()
+
+    return card
+
+
+class TestPacingProfile:
+    @pytest.mark.parametrize('name', PACING_PRESETS.keys())
+    def test_preset_uses_preset_delays(self, name):
+        profile = PacingProfile.preset(name)
+
+        assert (profile.segment_delay_ms,
+                profile.chunk_delay_ms) == PACING_PRESETS[name]
+        assert profile.name == name
+
+    def test_preset_raises_on_unknown_name(self):
+        with pytest.raises(ValueError, match='Unknown pacing preset'):
+            PacingProfile.preset('ludicrous')
+
+    def test_negative_delays_are_rejected(self):
+        with pytest.raises(ValueError, match='must not be negative'):
+            PacingProfile(-1, 20)
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        path = str(tmp_path / 'pacing.json')
+        profile = PacingProfile(75, 8, name='bench')
+
+        profile.save(path)
+        loaded = PacingProfile.load(path)
+
+        assert loaded == profile
+        assert loaded.name == 'bench'
+
+    def test_notecard_defaults_to_default_preset(self):
+        card = notecard.Notecard()
+
+        assert card.GetPacingProfile() == PacingProfile.preset('default')
+
+    def test_set_pacing_profile_accepts_preset_name(self):
+        card = notecard.Notecard()
+
+        card.SetPacingProfile('aggressive')
+
+        assert card.GetPacingProfile() == PacingProfile.preset('aggressive')
+
+    def test_serial_transmit_uses_profile_segment_delay(self, serial_card):
+        serial_card.SetPacingProfile(PacingProfile(40, 3))
+        data = bytearray(notecard.CARD_REQUEST_SEGMENT_MAX_LEN + 1)
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            serial_card.transmit(data)
+
+        assert [c.args[0] for c in sleep_mock.call_args_list] == [0.04, 0.04]
+
+    def test_i2c_transmit_uses_profile_chunk_delay(self):
+        with patch('notecard.notecard.OpenI2C.Reset'):
+            card = notecard.OpenI2C(MagicMock(), 0, 0)
+        card._write = MagicMock()
+        card.SetPacingProfile(PacingProfile(40, 3))
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            card.transmit(bytearray(10))
+
+        assert 0.003 in [c.args[0] for c in sleep_mock.call_args_list]
+
+
+class TestCalibrate:
+    def test_picks_fastest_candidate_before_first_failure(
+            self, calibrate_card):
+        candidates = [(250, 20), (100, 10), (50, 5), (10, 1)]
+
+        def transaction_side_effect(req, retry_policy=None):
+            if calibrate_card.GetPacingProfile().segment_delay_ms < 50:
+                return {'err': 'serial overrun {io}'}
+            return {'version': 'notecard-8.1.3'}
+
+        calibrate_card.Transaction.side_effect = transaction_side_effect
+
+        profile = calibrate(calibrate_card, candidates=candidates)
+
+        assert (profile.segment_delay_ms, profile.chunk_delay_ms) == (50, 5)
+        assert calibrate_card.GetPacingProfile() == profile
+
+    def test_probes_are_not_retried(self, calibrate_card):
+        calibrate_card.Transaction.return_value = {}
+
+        calibrate(calibrate_card, candidates=[(100, 10)])
+
+        for call in calibrate_card.Transaction.call_args_list:
+            assert call.kwargs['retry_policy'] is NO_RETRY
+
+    def test_failed_transaction_counts_as_failure(self, calibrate_card):
+        candidates = [(250, 20), (100, 10)]
+        calibrate_card.Transaction.side_effect = [
+            {}, {}, {}, Exception('Failed to transact with Notecard.')]
+
+        profile = calibrate(calibrate_card, candidates=candidates)
+
+        assert profile.segment_delay_ms == 250
+
+    def test_raises_and_restores_profile_if_nothing_passes(
+            self, calibrate_card):
+        original = calibrate_card.GetPacingProfile()
+        calibrate_card.Transaction.return_value = {'err': '{io}'}
+
+        with pytest.raises(Exception, match='Pacing calibration failed'):
+            calibrate(calibrate_card)
+
+        assert calibrate_card.GetPacingProfile() is original
+
+    def test_saves_result_when_path_given(self, calibrate_card, tmp_path):
+        path = str(tmp_path / 'pacing.json')
+        calibrate_card.Transaction.return_value = {}
+
+        profile = calibrate(calibrate_card, candidates=[(100, 10)], path=path)
+
+        assert PacingProfile.load(path) == profile
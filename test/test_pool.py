@@ -0,0 +1,194 @@
+import os
+import sys
+import threading
+import time
+import pytest
+from concurrent.futures import TimeoutError
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard.emulator import EmulatedUART, NotecardEmulator  # noqa: E402
+from notecard.pacing import PacingProfile  # noqa: E402
+from notecard.pool import NotecardPool  # noqa: E402
+
+
+class FakeCard:
+    """The parts of a Notecard a TransactionDispatcher uses."""
+
+    _debug = False
+
+    def __init__(self, name, fail=False, hang=None):
+        self.name = name
+        self.fail = fail
+        self.hang = hang
+        self.requests = []
+
+    def _begin_burst(self):
+        pass
+
+    def _end_burst(self):
+        pass
+
+    def Transaction(self, req, lock=True):
+        if self.hang is not None:
+            self.hang.wait(5)
+        if self.fail:
+            raise Exception('Failed to transact with Notecard.')
+        self.requests.append(req)
+        return {'card': self.name}
+
+
+def emulated_card():
+    card = notecard.OpenSerial(EmulatedUART(NotecardEmulator()))
+    card.SetPacingProfile(PacingProfile(0, 0))
+    return card
+
+
+class TestNotecardPool:
+    def test_opens_cards_in_parallel(self):
+        def slow_open(name):
+            def opener():
+                time.sleep(0.2)
+                return FakeCard(name)
+            return opener
+
+        start = time.monotonic()
+        with NotecardPool({n: slow_open(n) for n in 'abcd'}) as pool:
+            elapsed = time.monotonic() - start
+
+            assert pool.healthy() == ['a', 'b', 'c', 'd']
+        assert elapsed < 0.6
+
+    def test_map_fans_out_to_every_card(self):
+        with NotecardPool([emulated_card, emulated_card]) as pool:
+            results = pool.map({'req': 'card.version'}, timeout=5)
+
+            assert set(results) == {0, 1}
+            assert all('version' in rsp for rsp in results.values())
+
+    def test_card_that_fails_to_open_is_left_out(self):
+        def broken():
+            raise Exception('Failed to reset Notecard.')
+
+        with NotecardPool({'good': lambda: FakeCard('good'),
+                           'bad': broken}) as pool:
+            assert pool.healthy() == ['good']
+            assert str(pool.members['bad'].last_error) == \
+                'Failed to reset Notecard.'
+
+    def test_raises_if_no_card_opens(self):
+        def broken():
+            raise Exception('Failed to reset Notecard.')
+
+        with pytest.raises(Exception, match='could be opened'):
+            NotecardPool([broken])
+
+    def test_submit_routes_to_least_busy_card(self):
+        hang = threading.Event()
+        cards = {'busy': FakeCard('busy', hang=hang), 'idle': FakeCard('idle')}
+
+        with NotecardPool({n: (lambda c=c: c) for n, c in cards.items()}) \
+                as pool:
+            pool.submit_to('busy', {'req': 'note.add'})
+            results = [pool.submit({'req': 'note.add'}).result(5)
+                       for _ in range(3)]
+            hang.set()
+
+        assert results == [{'card': 'idle'}] * 3
+
+    def test_submit_alternates_between_idle_cards(self):
+        with NotecardPool({'a': lambda: FakeCard('a'),
+                           'b': lambda: FakeCard('b')}) as pool:
+            results = [pool.submit({'req': 'note.add'}).result(5)['card']
+                       for _ in range(4)]
+
+        assert sorted(results) == ['a', 'a', 'b', 'b']
+
+    def test_failing_card_is_dropped(self):
+        with NotecardPool({'good': lambda: FakeCard('good'),
+                           'bad': lambda: FakeCard('bad', fail=True)},
+                          max_failures=2) as pool:
+            assert pool.check_health(timeout=5) == {'good': True,
+                                                    'bad': False}
+            assert pool.healthy() == ['good', 'bad']
+
+            pool.check_health(timeout=5)
+
+            assert pool.healthy() == ['good']
+            assert pool.check_health(timeout=5) == {'good': True}
+
+    def test_hung_card_does_not_block_healthy_ones(self):
+        hang = threading.Event()
+        with NotecardPool({'good': lambda: FakeCard('good'),
+                           'hung': lambda: FakeCard('hung', hang=hang)},
+                          max_failures=1) as pool:
+            start = time.monotonic()
+            results = pool.map({'req': 'card.version'}, timeout=0.2)
+
+            assert time.monotonic() - start < 1
+            assert results['good'] == {'card': 'good'}
+            assert isinstance(results['hung'], TimeoutError)
+            assert pool.healthy() == ['good']
+            assert pool.submit({'req': 'note.add'}).result(5) == \
+                {'card': 'good'}
+            hang.set()
+
+    def test_hung_opener_does_not_block_pool(self):
+        hang = threading.Event()
+
+        def open_hung():
+            hang.wait(5)
+            return FakeCard('hung')
+
+        start = time.monotonic()
+        with NotecardPool({'good': lambda: FakeCard('good'),
+                           'hung': open_hung},
+                          open_timeout=0.2) as pool:
+            assert time.monotonic() - start < 1
+            assert pool.healthy() == ['good']
+            member = pool._members['hung']
+            assert not member.alive
+            assert isinstance(member.last_error, TimeoutError)
+            assert pool.map({'req': 'card.version'}, timeout=1) == \
+                {'good': {'card': 'good'}}
+            hang.set()
+
+    @pytest.mark.parametrize('fail', [True, False])
+    def test_timed_out_request_counts_once(self, fail):
+        hang = threading.Event()
+        card = FakeCard('slow', fail=fail, hang=hang)
+        with NotecardPool({'slow': lambda: card}, max_failures=3) as pool:
+            pool.map({'req': 'card.version'}, timeout=0.1)
+            member = pool._members['slow']
+            assert member.failures == 1
+
+            # The request's late completion, whether it fails or succeeds,
+            # doesn't change the count.
+            hang.set()
+            deadline = time.monotonic() + 5
+            while member.in_flight and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert member.in_flight == 0
+            assert member.failures == 1
+
+    def test_success_clears_failure_count(self):
+        card = FakeCard('flaky', fail=True)
+        with NotecardPool({'flaky': lambda: card}, max_failures=2) as pool:
+            pool.check_health()
+            card.fail = False
+            pool.check_health()
+            card.fail = True
+            pool.check_health()
+
+            assert pool.healthy() == ['flaky']
+
+    def test_submit_raises_when_every_card_is_dropped(self):
+        with NotecardPool([lambda: FakeCard('bad', fail=True)],
+                          max_failures=1) as pool:
+            pool.check_health()
+
+            with pytest.raises(Exception, match='No healthy Notecards'):
+                pool.submit({'req': 'note.add'})
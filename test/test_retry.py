@@ -0,0 +1,229 @@
+import asyncio
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0,
+                os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import notecard  # noqa: E402
+from notecard import aio  # noqa: E402
+from notecard.retry import (  # noqa: E402
+    DEFAULT_RETRY_POLICY,
+    IO_ERROR,
+    NO_RETRY,
+    RESPONSE_ERROR,
+    TRANSPORT_ERROR,
+    RetryPolicy,
+    RetryRule,
+)
+
+
+@pytest.fixture
+def arrange_transaction_test():
+    with patch('notecard.notecard.time.sleep') as sleep_mock:
+        def _arrange_transaction_test():
+            card = notecard.Notecard()
+            card.Reset = MagicMock()
+            card.lock = MagicMock()
+            card.unlock = MagicMock()
+            card._transact = MagicMock(return_value=b'{}\r\n')
+            card._crc_error = MagicMock(return_value=False)
+
+            return card, sleep_mock
+
+        yield _arrange_transaction_test
+
+
+class TestRetryRule:
+    def test_backs_off_exponentially_up_to_cap(self):
+        rule = RetryRule(delay_secs=0.1, backoff=2, max_delay_secs=0.5)
+
+        assert [rule.delay(n) for n in range(1, 6)] == \
+            pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_jitter_takes_off_up_to_fraction_of_delay(self):
+        rule = RetryRule(delay_secs=1, jitter=0.5)
+
+        with patch('notecard.retry.random.random', side_effect=[0, 1]):
+            assert rule.delay(1) == 1
+            assert rule.delay(1) == 0.5
+
+    @pytest.mark.parametrize('kwargs', [
+        {'delay_secs': -1},
+        {'backoff': 0.5},
+        {'jitter': 2},
+    ])
+    def test_rejects_bad_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            RetryRule(**kwargs)
+
+
+class TestRetryPolicy:
+    def test_default_matches_legacy_behavior(self):
+        retry = DEFAULT_RETRY_POLICY.start({'req': 'card.version'})
+
+        delays = [retry.next_delay(RESPONSE_ERROR) for _ in range(5)]
+
+        assert delays == [0.5, 0.5, 0.5, 0.5, None]
+        assert retry.rule(TRANSPORT_ERROR).reset
+        assert not retry.rule(RESPONSE_ERROR).reset
+        assert notecard.CARD_TRANSACTION_RETRIES == \
+            DEFAULT_RETRY_POLICY.max_attempts
+
+    def test_limits_retries_per_kind(self):
+        policy = RetryPolicy(max_attempts=10,
+                             transport=RetryRule(max_retries=1, reset=True))
+        retry = policy.start({'req': 'card.version'})
+
+        assert retry.next_delay(TRANSPORT_ERROR) is not None
+        assert retry.next_delay(RESPONSE_ERROR) is not None
+        assert retry.next_delay(TRANSPORT_ERROR) is None
+        assert retry.next_delay(RESPONSE_ERROR) is not None
+
+    def test_no_retry_requests_get_one_attempt(self):
+        policy = RetryPolicy(no_retry=('card.restart',))
+
+        assert policy.start({'req': 'card.restart'}).next_delay(
+            RESPONSE_ERROR) is None
+        assert policy.start({'req': 'card.version'}).next_delay(
+            RESPONSE_ERROR) is not None
+
+    def test_deadline_stops_retries_that_would_start_too_late(self):
+        policy = RetryPolicy(crc=RetryRule(delay_secs=1, backoff=2),
+                             deadline_secs=2.5)
+
+        with patch('notecard.retry.elapsed_secs', return_value=0.2):
+            retry = policy.start({'req': 'card.version'})
+            delays = [retry.next_delay(RESPONSE_ERROR) for _ in range(3)]
+
+        assert delays == [1, 2, None]
+
+    def test_io_errors_share_crc_rule_by_default(self):
+        policy = RetryPolicy(crc=RetryRule(max_retries=1))
+        retry = policy.start({'req': 'card.version'})
+
+        assert retry.rule(IO_ERROR) is policy.crc
+        assert retry.next_delay(IO_ERROR) is not None
+        assert retry.next_delay(RESPONSE_ERROR) is None
+
+    def test_io_rule_is_separate_from_crc_rule(self):
+        policy = RetryPolicy(crc=RetryRule(max_retries=1),
+                             io=RetryRule(max_retries=0))
+        retry = policy.start({'req': 'card.version'})
+
+        assert retry.next_delay(IO_ERROR) is None
+        assert retry.next_delay(RESPONSE_ERROR) is not None
+
+    def test_with_io_keeps_the_rest_of_the_policy(self):
+        policy = RetryPolicy(max_attempts=3, deadline_secs=5,
+                             no_retry=('card.restart',))
+        io = RetryRule(max_retries=0)
+
+        copy = policy.with_io(io)
+
+        assert copy.io is io
+        assert policy.io is None
+        assert (copy.max_attempts, copy.crc, copy.transport,
+                copy.deadline_secs, copy.no_retry) == (
+            policy.max_attempts, policy.crc, policy.transport,
+            policy.deadline_secs, policy.no_retry)
+
+    def test_rejects_zero_attempts(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+
+class TestTransactionRetries:
+    def test_card_policy_is_used(self, arrange_transaction_test):
+        card, sleep_mock = arrange_transaction_test()
+        card.SetRetryPolicy(RetryPolicy(
+            max_attempts=3, crc=RetryRule(delay_secs=0.1, backoff=3)))
+        card._crc_error.return_value = True
+
+        with pytest.raises(Exception, match='Failed to transact'):
+            card.Transaction({'req': 'card.version'})
+
+        assert card._transact.call_count == 3
+        assert [c.args[0] for c in sleep_mock.call_args_list] == \
+            pytest.approx([0.1, 0.3])
+
+    def test_per_call_policy_overrides_card_policy(
+            self, arrange_transaction_test):
+        card, _ = arrange_transaction_test()
+        card._crc_error.return_value = True
+
+        with pytest.raises(Exception, match='Failed to transact'):
+            card.Transaction({'req': 'card.version'}, retry_policy=NO_RETRY)
+
+        assert card._transact.call_count == 1
+        assert card.GetRetryPolicy() is DEFAULT_RETRY_POLICY
+
+    def test_transport_rule_can_skip_reset(self, arrange_transaction_test):
+        card, _ = arrange_transaction_test()
+        card._reset_required = False
+        card.SetRetryPolicy(RetryPolicy(transport=RetryRule(delay_secs=0)))
+        card._transact.side_effect = [Exception('boom'), b'{}\r\n']
+
+        card.Transaction({'req': 'card.version'})
+
+        card.Reset.assert_not_called()
+
+    def test_crc_rule_can_reset(self, arrange_transaction_test):
+        card, _ = arrange_transaction_test()
+        card._reset_required = False
+        card.SetRetryPolicy(RetryPolicy(crc=RetryRule(reset=True)))
+        card._crc_error.side_effect = [True, False]
+
+        card.Transaction({'req': 'card.version'})
+
+        card.Reset.assert_called_once()
+
+    def test_io_error_without_io_rule_raises(self, arrange_transaction_test):
+        card, _ = arrange_transaction_test()
+        card._transact.return_value = b'{"err":"modem {io}"}\r\n'
+
+        with pytest.raises(Exception, match='Failed to transact'):
+            card.Transaction({'req': 'web.post'},
+                             retry_policy=RetryPolicy(max_attempts=2))
+
+        assert card._transact.call_count == 2
+
+    def test_io_error_not_retried_by_io_rule_is_returned(
+            self, arrange_transaction_test):
+        card, _ = arrange_transaction_test()
+        card._reset_required = False
+        card._transact.return_value = b'{"err":"modem {io}"}\r\n'
+        card._crc_error.side_effect = [True, False]
+        policy = RetryPolicy(io=RetryRule(max_retries=0))
+
+        rsp = card.Transaction({'req': 'web.post'}, retry_policy=policy)
+
+        # The CRC error is still retried, but the {io} error is returned.
+        assert rsp == {'err': 'modem {io}'}
+        assert card._transact.call_count == 2
+        assert not card._reset_required
+
+    def test_no_reset_after_last_attempt(self, arrange_transaction_test):
+        card, _ = arrange_transaction_test()
+        card._reset_required = False
+        card._transact.side_effect = Exception('boom')
+
+        with pytest.raises(Exception, match='Failed to transact'):
+            card.Transaction({'req': 'card.version'})
+
+        assert card.Reset.call_count == notecard.CARD_TRANSACTION_RETRIES - 1
+        assert card._reset_required
+
+    def test_async_per_call_policy(self):
+        card = aio.AsyncNotecard()
+        card.Reset = AsyncMock()
+        card._transact = AsyncMock(return_value=b'{}\r\n')
+        card._crc_error = MagicMock(return_value=True)
+
+        with pytest.raises(Exception, match='Failed to transact'):
+            asyncio.run(card.Transaction({'req': 'card.version'},
+                                         retry_policy=NO_RETRY))
+
+        assert card._transact.await_count == 1
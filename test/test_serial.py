@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import pytest
 from unittest.mock import MagicMock, patch
 from filelock import FileLock
@@ -13,6 +14,35 @@ import notecard  # noqa: E402
 from notecard import NoOpSerialLock, NoOpContextManager  # noqa: E402
 
 
+class StaleBurstUART:
+    """A UART that echoes newlines while stale output arrives in bursts."""
+
+    def __init__(self, bursts, rtt):
+        start = time.monotonic()
+        self.rtt = rtt
+        # (time the data arrives, data), in order of arrival.
+        self.pending = [(start + at, data) for at, data in bursts]
+
+    @property
+    def in_waiting(self):
+        now = time.monotonic()
+        return sum(len(data) for at, data in self.pending if at <= now)
+
+    def read(self, size=1):
+        if not self.in_waiting:
+            return b''
+        at, data = self.pending[0]
+        if len(data) > size:
+            self.pending[0] = (at, data[size:])
+        else:
+            del self.pending[0]
+        return data[:size]
+
+    def write(self, data):
+        self.pending.append((time.monotonic() + self.rtt, b'\r\n'))
+        self.pending.sort(key=lambda p: p[0])
+
+
 @pytest.fixture
 def arrange_test():
     def _arrange_test(debug=False):
@@ -134,6 +164,72 @@ class TestSerial:
 
         assert card._reset_required
 
+    def test_reset_retries_as_soon_as_stale_data_stops(
+            self, arrange_reset_test):
+        card = arrange_reset_test()
+        card._available = MagicMock(
+            side_effect=[True, True, True, False, True, True, False])
+        card._read_byte = MagicMock(
+            side_effect=[b'x', b'\r', b'\n', b'\r', b'\n'])
+
+        # The quiet time has passed whenever it's checked, the drain timeout
+        # never has.
+        def quiet_timed_out(start, timeout_secs):
+            return timeout_secs != notecard.CARD_RESET_DRAIN_MS / 1000
+
+        with patch('notecard.notecard.has_timed_out',
+                   side_effect=quiet_timed_out):
+            card.Reset()
+
+        assert card.uart.write.call_count == 2
+        assert not card._reset_required
+        notecard.notecard.time.sleep.assert_not_called()
+
+    def test_reset_waits_out_segment_delay_after_unpaced_transmit(
+            self, arrange_reset_test):
+        card = arrange_reset_test()
+        card.transmit(b'{"req":"card.version"}\n', delay=False)
+        card._available = MagicMock(side_effect=[True, True, False])
+        card._read_byte = MagicMock(side_effect=[b'\r', b'\n', None])
+
+        with patch('notecard.notecard.has_timed_out',
+                   side_effect=TrueOnNthIteration(2)):
+            card.Reset()
+
+        delay_secs = notecard.notecard.time.sleep.call_args_list[0].args[0]
+        assert 0 < delay_secs <= card._pacing.segment_delay_ms / 1000
+
+    def test_reset_adapts_quiet_time_to_echo_round_trip(
+            self, arrange_reset_test):
+        card = arrange_reset_test()
+        card._available = MagicMock(side_effect=[True, True, False])
+        card._read_byte = MagicMock(side_effect=[b'\r', b'\n', None])
+
+        with patch('notecard.notecard.has_timed_out',
+                   side_effect=TrueOnNthIteration(2)), \
+                patch('notecard.notecard.elapsed_secs', return_value=0.02):
+            card.Reset()
+
+        assert card._reset_quiet_secs == pytest.approx(
+            0.02 * notecard.notecard.CARD_RESET_QUIET_RTT_FACTOR)
+
+    def test_reset_drains_stale_output_arriving_in_bursts(self, arrange_test):
+        card = arrange_test()
+        card.lock = MagicMock()
+        card.unlock = MagicMock()
+        # A previous reset measured a fast echo, so the quiet time is at its
+        # floor, and the stale bursts are further apart than that.
+        card._reset_echo_received(0.001)
+        gap = 0.035
+        assert gap > card._reset_quiet_secs
+        card.uart = StaleBurstUART(
+            [(i * gap, b'{"err":"stale"}\r\n') for i in range(3)], rtt=0.001)
+
+        card.Reset()
+
+        assert not card._reset_required
+        assert card.uart.pending == []
+
     # __init__ tests.
     @patch('notecard.notecard.OpenSerial.Reset')
     def test_init_calls_reset(self, reset_mock):
@@ -240,6 +336,73 @@ class TestSerial:
                                       'available data.')):
                 card._transact(req_bytes, rsp_expected=True)
 
+    def test_transact_waits_on_poller_instead_of_sleeping(
+            self, arrange_transact_test):
+        card, req_bytes = arrange_transact_test()
+        card._available = MagicMock(side_effect=[False, True])
+        card._poller = MagicMock()
+
+        with patch('notecard.notecard.time.sleep') as sleep_mock:
+            card._transact(req_bytes, rsp_expected=True)
+
+        card._poller.poll.assert_called_once()
+        sleep_mock.assert_not_called()
+
+    # _wait_readable tests.
+    @pytest.mark.skipif(not notecard.notecard.use_poll,
+                        reason='poll-based waiting is Linux-only')
+    def test_wait_readable_returns_once_fd_is_readable(self, arrange_test):
+        read_fd, write_fd = os.pipe()
+        try:
+            uart = MagicMock()
+            uart.fileno.return_value = read_fd
+            with patch('notecard.notecard.OpenSerial.Reset'):
+                card = notecard.OpenSerial(uart)
+            os.write(write_fd, b'x')
+
+            start = time.time()
+            card._wait_readable(start, 5)
+
+            assert time.time() - start < 1
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_wait_readable_skips_poll_when_bytes_are_held(self, arrange_test):
+        card = arrange_test()
+        card._poller = MagicMock()
+        card._rx_pending = bytearray(b'x')
+
+        card._wait_readable(0, 5)
+
+        card._poller.poll.assert_not_called()
+
+    @pytest.mark.parametrize(
+        'fileno,has_poller',
+        [
+            (None, False),
+            (OSError('port not open'), False),
+            (7, True),
+        ]
+    )
+    def test_poller_is_set_correctly_on_init(self, fileno, has_poller,
+                                             arrange_test):
+        uart = MagicMock()
+        if isinstance(fileno, Exception):
+            uart.fileno.side_effect = fileno
+        else:
+            uart.fileno.return_value = fileno
+
+        with patch('notecard.notecard.use_poll', new=True):
+            with patch('notecard.notecard.select', create=True) as select_mock:
+                with patch('notecard.notecard.OpenSerial.Reset'):
+                    card = notecard.OpenSerial(uart)
+
+        assert (card._poller is not None) == has_poller
+        if has_poller:
+            select_mock.poll.return_value.register.assert_called_once_with(
+                7, select_mock.POLLIN)
+
     # transmit tests.
     def test_transmit_writes_all_data_bytes(
             self, arrange_test, tramsit_test_data):
@@ -269,6 +432,18 @@ class TestSerial:
             segment = write_call.args[0]
             assert len(segment) <= notecard.CARD_REQUEST_SEGMENT_MAX_LEN
 
+    def test_transmit_writes_views_into_data(
+            self, arrange_test, tramsit_test_data):
+        card = arrange_test()
+        card.uart.write = MagicMock()
+
+        card.transmit(tramsit_test_data)
+
+        for write_call in card.uart.write.call_args_list:
+            segment = write_call.args[0]
+            assert isinstance(segment, memoryview)
+            assert segment.obj is tramsit_test_data
+
     # receive tests.
     def test_receive_raises_exception_on_timeout(self, arrange_test):
         card = arrange_test()
@@ -287,6 +462,7 @@ class TestSerial:
         read_byte_mock = MagicMock()
         read_byte_mock.side_effect = [b'{', b'}', b'\r', b'\n']
         card._read_byte = read_byte_mock
+        card._bulk_receive = False
         card._available = MagicMock(return_value=True)
         expected_data = bytearray('{}\r\n'.encode('utf-8'))
 
@@ -296,6 +472,61 @@ class TestSerial:
         # bytearray by receive.
         assert data == expected_data
 
+    def test_receive_bulk_returns_data_up_to_newline(self, arrange_test):
+        card = arrange_test()
+        card.uart.in_waiting = 4
+        card.uart.read = MagicMock(return_value=b'{}\r\n')
+
+        data = card.receive()
+
+        assert data == bytearray(b'{}\r\n')
+        card.uart.read.assert_called_once_with(4)
+
+    def test_receive_bulk_accumulates_across_reads(self, arrange_test):
+        card = arrange_test()
+        card.uart.in_waiting = 2
+        card.uart.read = MagicMock(side_effect=[b'{"', b'a"', b':1', b'}\n'])
+
+        data = card.receive()
+
+        assert data == bytearray(b'{"a":1}\n')
+        assert card.uart.read.call_count == 4
+
+    def test_receive_bulk_holds_bytes_after_newline_for_next_receive(
+            self, arrange_test):
+        card = arrange_test()
+        card.uart.in_waiting = 12
+        card.uart.read = MagicMock(return_value=b'{}\r\nbinary\n')
+
+        first = card.receive()
+        second = card.receive()
+
+        assert first == bytearray(b'{}\r\n')
+        assert second == bytearray(b'binary\n')
+        card.uart.read.assert_called_once()
+
+    def test_available_reports_held_bytes(self, arrange_test):
+        card = arrange_test()
+        card.uart.in_waiting = 0
+        card._rx_pending = bytearray(b'x')
+
+        assert card._available()
+
+    @pytest.mark.parametrize(
+        'platform,bulk_receive',
+        [
+            ('micropython', False),
+            ('cpython', True),
+            ('circuitpython', True),
+        ]
+    )
+    def test_bulk_receive_is_set_correctly_on_init(
+            self, platform, bulk_receive, arrange_test):
+        with patch('notecard.notecard.sys.implementation.name', new=platform):
+            card = arrange_test()
+
+        assert card._bulk_receive == bulk_receive
+
     # _read_byte tests.
     def test_read_byte_calls_uart_read(self, arrange_test):
         card = arrange_test()
@@ -1,5 +1,7 @@
+import io
 import os
 import sys
+import threading
 import pytest
 from unittest.mock import MagicMock, patch, call
 
@@ -11,9 +13,17 @@ from notecard.upload import (  # noqa: E402
     upload,
     _stage_binary_chunk,
     _md5_hash,
+    _web_failure,
+    _content_hash,
+    UploadJournal,
+    UploadPolicy,
     BINARY_STAGE_RETRIES,
     WEB_POST_RETRIES,
+    WEB_CLIENT_ERROR,
+    WEB_SERVER_ERROR,
+    WEB_TIMEOUT,
 )
+from notecard.retry import RetryPolicy, RetryRule  # noqa: E402
 
 
 @pytest.fixture
@@ -176,6 +186,33 @@ class TestMultiChunkUpload:
         assert result['bytes_uploaded'] == len(data)
         assert result['chunks'] == expected_chunks
 
+    def test_stages_views_into_data(self, card):
+        """Chunks are staged as views into the caller's data, not copies."""
+        data = bytearray(range(256)) * 4
+        buf_max = 300
+        staged = []
+
+        def transaction_side_effect(req, **kwargs):
+            r = req.get('req', '')
+            if r == 'card.binary' and req.get('reset'):
+                return {'max': buf_max}
+            if r == 'web.post':
+                return {'result': 200}
+            return {}
+
+        def stage_side_effect(card, chunk_data, encoded=None):
+            staged.append(chunk_data)
+
+        card.Transaction.side_effect = transaction_side_effect
+
+        with patch('notecard.upload._stage_binary_chunk',
+                   side_effect=stage_side_effect):
+            upload(card, data, route='my-route')
+
+        assert all(isinstance(c, memoryview) and c.obj is data
+                   for c in staged)
+        assert b''.join(staged) == data
+
     def test_sets_total_for_multi_chunk(self, card):
         """total field should be set in web.post for multi-chunk uploads."""
         data = bytearray(range(256)) * 4  # 1024 bytes
@@ -449,6 +486,230 @@ class TestWebPostRetry:
         assert binary_put_count[0] == 2
 
 
+class TestAdaptiveUpload:
+    @pytest.fixture
+    def posts(self, card):
+        """Answer web.posts from a list, recording each post's length."""
+        posts = []
+        responses = []
+
+        def transaction_side_effect(req, **kwargs):
+            r = req.get('req', '')
+            if r == 'card.binary' and req.get('reset'):
+                return {'max': 400}
+            if r == 'web.post':
+                posts.append((req['offset'], staged[-1]))
+                rsp = responses.pop(0) if responses else {'result': 200}
+                if isinstance(rsp, Exception):
+                    raise rsp
+                return rsp
+            return {}
+
+        staged = []
+
+        def stage_side_effect(card, chunk_data, encoded=None):
+            staged.append(len(chunk_data))
+
+        card.Transaction.side_effect = transaction_side_effect
+        with patch('notecard.upload._stage_binary_chunk',
+                   side_effect=stage_side_effect), \
+                patch('notecard.upload.time.sleep') as sleep:
+            yield posts, responses, sleep
+
+    @pytest.mark.parametrize('rsp,kind', [
+        ({'result': 200}, None),
+        ({'result': 500}, WEB_SERVER_ERROR),
+        ({'result': 429}, WEB_SERVER_ERROR),
+        ({'err': 'unexpected error'}, WEB_SERVER_ERROR),
+        ({'err': 'modem error {io}'}, WEB_SERVER_ERROR),
+        ({'result': 504}, WEB_TIMEOUT),
+        ({'err': 'request timed out {timeout}'}, WEB_TIMEOUT),
+        ({'result': 404}, WEB_CLIENT_ERROR),
+    ])
+    def test_classifies_web_failures(self, rsp, kind):
+        assert _web_failure(rsp) == kind
+
+    def test_backs_off_exponentially(self, card, posts):
+        _, responses, sleep = posts
+        responses.extend([{'result': 500}] * 3)
+        policy = UploadPolicy(server=RetryRule(delay_secs=1, backoff=2))
+
+        result = upload(card, bytes(100), route='r', policy=policy)
+
+        assert sleep.call_args_list == [call(1), call(2), call(4)]
+        assert result['retries'] == 3
+        assert result['backoff_secs'] == 7
+
+    def test_does_not_retry_client_error(self, card, posts):
+        posts, responses, sleep = posts
+        responses.append({'result': 404})
+
+        with pytest.raises(Exception, match='web.post failed: HTTP 404'):
+            upload(card, bytes(100), route='r')
+
+        assert len(posts) == 1
+        sleep.assert_not_called()
+
+    @pytest.mark.parametrize('rsp,rule', [
+        (Exception('Failed to transact with Notecard.'), 'transport'),
+        ({'err': 'modem error {io}'}, 'server'),
+    ])
+    def test_local_failure_is_retried_without_shrinking(self, card, posts,
+                                                        rsp, rule):
+        posts, responses, sleep = posts
+        responses.append(rsp)
+        policy = UploadPolicy(min_chunk_size=100,
+                              **{rule: RetryRule(delay_secs=3)})
+
+        result = upload(card, bytes(400), route='r', policy=policy)
+
+        assert posts == [(0, 400), (0, 400)]
+        sleep.assert_called_once_with(3)
+        assert result['retries'] == 1
+        assert result['chunk_size'] == 400
+
+    def test_web_post_io_errors_are_not_retried_by_transaction(self, card,
+                                                               posts):
+        upload(card, bytes(100), route='r')
+
+        web_post = [c for c in card.Transaction.call_args_list
+                    if c.args[0]['req'] == 'web.post'][0]
+        policy = web_post.kwargs['retry_policy']
+        assert policy.io.max_retries == 0
+        assert policy.crc.max_retries is None
+
+    def test_web_post_keeps_card_retry_policy(self, card, posts):
+        card_policy = RetryPolicy(transport=RetryRule(max_retries=1),
+                                  deadline_secs=10, no_retry=('card.restart',))
+        card.SetRetryPolicy(card_policy)
+
+        upload(card, bytes(100), route='r')
+
+        web_post = [c for c in card.Transaction.call_args_list
+                    if c.args[0]['req'] == 'web.post'][0]
+        policy = web_post.kwargs['retry_policy']
+        assert policy.transport is card_policy.transport
+        assert policy.crc is card_policy.crc
+        assert policy.deadline_secs == 10
+        assert policy.no_retry == ('card.restart',)
+        assert policy.io.max_retries == 0
+
+    def test_card_transport_rule_applies_to_web_post(self):
+        from notecard.emulator import EmulatedUART, NotecardEmulator
+        from notecard.pacing import PacingProfile
+
+        card = notecard.OpenSerial(EmulatedUART(NotecardEmulator()))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        card.SetRetryPolicy(RetryPolicy(transport=RetryRule(max_retries=0)))
+        transact = card._transact
+        web_posts = []
+
+        def failing_transact(req_bytes, rsp_expected, timeout_secs):
+            if b'web.post' in req_bytes:
+                web_posts.append(req_bytes)
+                raise Exception('No response from Notecard.')
+            return transact(req_bytes, rsp_expected, timeout_secs)
+
+        card._transact = failing_transact
+
+        with patch('notecard.upload.time.sleep'), \
+                pytest.raises(Exception, match='failed after retries'):
+            upload(card, bytes(100), route='r',
+                   policy=UploadPolicy(max_retries=1))
+
+        # Transaction doesn't retry the post itself, as the card's transport
+        # rule allows no retries, so each of upload's attempts sends it once.
+        assert len(web_posts) == 2
+
+    def test_shrinks_after_timeout_and_grows_back(self, card, posts):
+        posts, responses, _ = posts
+        responses.append({'err': 'request timed out {timeout}'})
+        policy = UploadPolicy(min_chunk_size=100, grow_after=2)
+        progress = []
+
+        result = upload(card, bytes(1200), route='r', policy=policy,
+                        progress_cb=progress.append)
+
+        # The timed out chunk is split in two, and after two posts succeed
+        # the chunk size is back to the Notecard's maximum.
+        assert posts == [(0, 400), (0, 200), (200, 200), (400, 400),
+                         (800, 400)]
+        assert [p['chunk_size'] for p in progress] == [200, 400, 400, 400]
+        assert result['chunks'] == 4
+        assert result['retries'] == 1
+        assert result['bytes_transferred'] == 1600
+        assert result['chunk_size'] == 400
+
+    def test_does_not_shrink_below_min_chunk_size(self, card, posts):
+        posts, responses, _ = posts
+        responses.extend([{'result': 504}] * 3)
+        policy = UploadPolicy(min_chunk_size=150, grow_after=0)
+
+        upload(card, bytes(400), route='r', policy=policy)
+
+        assert posts == [(0, 400), (0, 200), (0, 150), (0, 150), (150, 150),
+                         (300, 100)]
+
+    def test_uploads_through_timeouts_on_emulator(self):
+        from notecard.emulator import EmulatedUART, NotecardEmulator
+        from notecard.pacing import PacingProfile
+
+        emulator = NotecardEmulator()
+        web_post = emulator.handlers['web.post']
+
+        def flaky_web_post(req):
+            # Posts of more than 500 bytes time out.
+            if len(emulator._binary) > 500:
+                emulator._binary = bytearray()
+                return {'err': 'request timed out {timeout}'}
+            return web_post(req)
+
+        emulator.handlers['web.post'] = flaky_web_post
+        card = notecard.OpenSerial(EmulatedUART(emulator))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        data = os.urandom(3000)
+
+        with patch('notecard.upload.time.sleep'):
+            result = upload(card, data, route='r', max_chunk_size=2000,
+                            policy=UploadPolicy(min_chunk_size=250))
+
+        assert b''.join(p['payload'] for p in emulator.web_posts) == data
+        assert [p['req']['offset'] for p in emulator.web_posts] == [
+            0, 500, 1000, 1500, 2000, 2500]
+        # Two timeouts shrink the first chunk to 500 bytes. After four posts
+        # the size grows to 1000, and the last chunk times out once.
+        assert result['retries'] == 3
+        assert result['chunk_size'] == 500
+
+    def test_io_errors_on_emulator_keep_chunk_size(self):
+        from notecard.emulator import EmulatedUART, NotecardEmulator
+        from notecard.pacing import PacingProfile
+
+        emulator = NotecardEmulator()
+        web_post = emulator.handlers['web.post']
+        failures = [1]
+
+        def flaky_web_post(req):
+            # The first post fails with an I/O error.
+            if failures[0]:
+                failures[0] -= 1
+                return {'err': 'modem error {io}'}
+            return web_post(req)
+
+        emulator.handlers['web.post'] = flaky_web_post
+        card = notecard.OpenSerial(EmulatedUART(emulator))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        data = os.urandom(3000)
+
+        with patch('notecard.upload.time.sleep'):
+            result = upload(card, data, route='r', max_chunk_size=2000)
+
+        assert b''.join(p['payload'] for p in emulator.web_posts) == data
+        assert [p['req']['offset'] for p in emulator.web_posts] == [0, 2000]
+        assert result['retries'] == 1
+        assert result['chunk_size'] == 2000
+
+
 class TestProgressCallback:
     def test_progress_callback_called_per_chunk(self, card):
         """progress_cb is called once per chunk with correct fields."""
@@ -519,3 +780,366 @@ class TestProgressCallback:
 
         upload(card, sample_data, route='my-route',
                progress_cb=None)
+
+
+class TestStreamingUpload:
+    @pytest.fixture
+    def staged(self, card):
+        """Accept every request and record the bytes of each staged chunk."""
+        staged = []
+
+        def transaction_side_effect(req, **kwargs):
+            r = req.get('req', '')
+            if r == 'card.binary' and req.get('reset'):
+                return {'max': 300}
+            if r == 'web.post':
+                return {'result': 200}
+            return {}
+
+        def stage_side_effect(card, chunk_data, encoded=None):
+            staged.append(bytes(chunk_data))
+
+        card.Transaction.side_effect = transaction_side_effect
+        with patch('notecard.upload._stage_binary_chunk',
+                   side_effect=stage_side_effect):
+            yield staged
+
+    def test_uploads_file_from_path(self, card, staged, tmp_path):
+        data = bytes(range(256)) * 4
+        path = tmp_path / 'archive.bin'
+        path.write_bytes(data)
+
+        result = upload(card, path, route='my-route')
+
+        assert result['bytes_uploaded'] == len(data)
+        assert result['chunks'] == 4
+        assert [len(c) for c in staged] == [300, 300, 300, 124]
+        assert b''.join(staged) == data
+
+    def test_uploads_rest_of_file_object(self, card, staged):
+        data = bytes(range(256)) * 4
+        f = io.BytesIO(data)
+        f.seek(100)
+
+        upload(card, f, route='my-route')
+
+        assert b''.join(staged) == data[100:]
+
+    @pytest.mark.parametrize('depth', [0, 1, 3])
+    def test_file_chunks_reuse_buffers(self, card, depth):
+        card.Transaction.side_effect = lambda req, **kwargs: (
+            {'max': 300} if req.get('reset') else {'result': 200})
+        buffers = set()
+
+        def stage_side_effect(card, chunk_data, encoded=None):
+            buffers.add(id(chunk_data.obj))
+
+        with patch('notecard.upload._stage_binary_chunk',
+                   side_effect=stage_side_effect):
+            upload(card, io.BytesIO(bytes(3000)), route='my-route',
+                   pipeline_depth=depth)
+
+        # One buffer for the chunk being sent and one for each prepared.
+        assert len(buffers) == depth + 1
+
+    def test_uploads_length_bytes_of_file(self, card, staged):
+        upload(card, io.BytesIO(bytes(range(200))), route='my-route',
+               length=50)
+
+        assert b''.join(staged) == bytes(range(50))
+
+    def test_file_without_readinto(self, card, staged):
+        class Pipe:
+            def __init__(self, data):
+                self._f = io.BytesIO(data)
+
+            def read(self, size):
+                return self._f.read(min(size, 7))
+
+        data = bytes(range(256)) * 2
+
+        upload(card, Pipe(data), route='my-route', length=len(data))
+
+        assert b''.join(staged) == data
+
+    def test_uploads_from_iterator(self, card, staged):
+        pieces = [bytes([i]) * 70 for i in range(10)]
+        captured = []
+        card.Transaction.side_effect = lambda req, **kwargs: (
+            {'max': 300} if req.get('reset')
+            else captured.append(req) or {'result': 200})
+
+        upload(card, iter(pieces), route='my-route', length=700)
+
+        assert [len(c) for c in staged] == [300, 300, 100]
+        assert b''.join(staged) == b''.join(pieces)
+        assert [r['offset'] for r in captured] == [0, 300, 600]
+        assert all(r['total'] == 700 for r in captured)
+
+    def test_iterator_requires_length(self, card, staged):
+        with pytest.raises(ValueError, match='length must be given'):
+            upload(card, iter([b'data']), route='my-route')
+
+        card.Transaction.assert_not_called()
+
+    def test_raises_if_iterator_is_short(self, card, staged):
+        with pytest.raises(Exception, match='ended after 4 of 10 bytes'):
+            upload(card, iter([b'data']), route='my-route', length=10)
+
+    def test_raises_if_iterator_is_long(self, card, staged):
+        with pytest.raises(Exception, match='longer than 2 bytes'):
+            upload(card, iter([b'data']), route='my-route', length=2)
+
+    def test_raises_on_empty_file(self, card, tmp_path):
+        path = tmp_path / 'empty.bin'
+        path.write_bytes(b'')
+
+        with pytest.raises(ValueError, match='data must not be empty'):
+            upload(card, str(path), route='my-route')
+
+
+class TestPipelinedUpload:
+    @pytest.fixture
+    def accept_all(self, card):
+        card.Transaction.side_effect = lambda req, **kwargs: (
+            {'max': 300} if req.get('reset') else {'result': 200})
+
+    @pytest.mark.parametrize('depth', [0, 1])
+    def test_stages_prepared_chunks(self, card, accept_all, depth):
+        data = bytes(range(256)) * 4
+        staged = []
+        web_reqs = []
+        transaction = card.Transaction.side_effect
+
+        def transaction_side_effect(req, **kwargs):
+            if req.get('req') == 'web.post':
+                web_reqs.append(req)
+            return transaction(req, **kwargs)
+
+        def stage_side_effect(card, chunk_data, encoded=None):
+            staged.append((bytes(chunk_data), bytes(encoded)))
+
+        card.Transaction.side_effect = transaction_side_effect
+        with patch('notecard.upload._stage_binary_chunk',
+                   side_effect=stage_side_effect):
+            upload(card, io.BytesIO(data), route='my-route',
+                   pipeline_depth=depth)
+
+        assert b''.join(chunk for chunk, _ in staged) == data
+        for (chunk, encoded), req in zip(staged, web_reqs):
+            assert encoded == notecard.upload._encode_chunk(chunk)
+            assert req['status'] == _md5_hash(chunk)
+
+    @pytest.mark.parametrize('depth, on_main_thread', [(0, True),
+                                                       (1, False)])
+    def test_prepares_on_worker_thread(self, card, accept_all, depth,
+                                       on_main_thread):
+        threads = []
+        encode = notecard.upload._encode_chunk
+
+        def encode_side_effect(chunk_data):
+            threads.append(threading.current_thread())
+            return encode(chunk_data)
+
+        with patch('notecard.upload._encode_chunk',
+                   side_effect=encode_side_effect), \
+                patch('notecard.upload._stage_binary_chunk'):
+            upload(card, bytes(1000), route='my-route', pipeline_depth=depth)
+
+        assert all((t is threading.main_thread()) == on_main_thread
+                   for t in threads)
+
+    def test_next_chunk_is_prepared_during_web_post(self, card):
+        encoded = threading.Semaphore(0)
+        encode = notecard.upload._encode_chunk
+        overlapped = []
+
+        def encode_side_effect(chunk_data):
+            result = encode(chunk_data)
+            encoded.release()
+            return result
+
+        def transaction_side_effect(req, **kwargs):
+            if req.get('reset'):
+                return {'max': 300}
+            if req.get('req') == 'web.post' and req['offset'] == 0:
+                # Chunk 0 was encoded before it was staged; chunk 1 is
+                # encoded while its web.post is in flight.
+                encoded.acquire(timeout=1)
+                overlapped.append(encoded.acquire(timeout=1))
+            return {'result': 200}
+
+        card.Transaction.side_effect = transaction_side_effect
+        with patch('notecard.upload._encode_chunk',
+                   side_effect=encode_side_effect), \
+                patch('notecard.upload._stage_binary_chunk'):
+            upload(card, bytes(1000), route='my-route', pipeline_depth=1)
+
+        assert overlapped == [True]
+
+    def test_error_reading_data_is_raised(self, card, accept_all):
+        def pieces():
+            yield bytes(300)
+            raise OSError('read failed')
+
+        with patch('notecard.upload._stage_binary_chunk'):
+            with pytest.raises(OSError, match='read failed'):
+                upload(card, pieces(), route='my-route', length=1000,
+                       pipeline_depth=2)
+
+
+class TestResumableUpload:
+    class Crash(BaseException):
+        """The host process dying, which upload mustn't catch."""
+
+    def open_card(self, emulator):
+        from notecard.emulator import EmulatedUART
+        from notecard.pacing import PacingProfile
+
+        card = notecard.OpenSerial(EmulatedUART(emulator))
+        card.SetPacingProfile(PacingProfile(0, 0))
+        return card
+
+    def crash_after_posts(self, card, emulator, posts):
+        """Crash the host once `posts` web.posts have reached Notehub.
+
+        The crash comes after the Notecard has answered the web.post but
+        before upload has seen the response, so the chunk isn't journaled.
+        """
+        transaction = card.Transaction
+
+        def crashing_transaction(req, **kwargs):
+            rsp = transaction(req, **kwargs)
+            if (req.get('req') == 'web.post'
+                    and len(emulator.web_posts) == posts):
+                raise self.Crash()
+            return rsp
+
+        card.Transaction = crashing_transaction
+        return card
+
+    def reassemble(self, web_posts):
+        data = bytearray()
+        for post in web_posts:
+            offset = post['req']['offset']
+            data[offset:offset + len(post['payload'])] = post['payload']
+        return bytes(data)
+
+    @pytest.mark.parametrize('source', ['bytes', 'path', 'file'])
+    def test_resumes_after_crash(self, tmp_path, source):
+        from notecard.emulator import NotecardEmulator
+
+        data = os.urandom(5000)
+        path = tmp_path / 'data.bin'
+        path.write_bytes(data)
+        sources = {
+            'bytes': lambda: data,
+            'path': lambda: str(path),
+            'file': lambda: open(path, 'rb'),
+        }
+        journal_path = str(tmp_path / 'upload.journal')
+        emulator = NotecardEmulator()
+        card = self.crash_after_posts(self.open_card(emulator), emulator, 3)
+
+        with pytest.raises(self.Crash):
+            upload(card, sources[source](), route='r', max_chunk_size=1000,
+                   journal=UploadJournal(journal_path))
+        assert len(emulator.web_posts) == 3
+
+        # A new process, with a fresh card and journal.
+        result = upload(self.open_card(emulator), sources[source](),
+                        route='r', max_chunk_size=1000,
+                        journal=UploadJournal(journal_path))
+
+        assert result['resumed_offset'] == 2000
+        assert result['bytes_uploaded'] == 3000
+        assert result['chunks'] == 3
+        offsets = [p['req']['offset'] for p in emulator.web_posts]
+        assert offsets == [0, 1000, 2000, 2000, 3000, 4000]
+        assert all(p['req']['total'] == 5000 for p in emulator.web_posts)
+        assert self.reassemble(emulator.web_posts) == data
+        assert open(journal_path).read() == ''
+
+    def test_different_data_starts_from_beginning(self, tmp_path):
+        from notecard.emulator import NotecardEmulator
+
+        journal_path = str(tmp_path / 'upload.journal')
+        emulator = NotecardEmulator()
+        card = self.crash_after_posts(self.open_card(emulator), emulator, 2)
+        with pytest.raises(self.Crash):
+            upload(card, bytes(3000), route='r', max_chunk_size=1000,
+                   journal=UploadJournal(journal_path))
+
+        result = upload(self.open_card(emulator), bytes([1]) * 3000,
+                        route='r', max_chunk_size=1000,
+                        journal=UploadJournal(journal_path))
+
+        assert result['resumed_offset'] == 0
+        assert result['chunks'] == 3
+
+    def test_finished_upload_returns_full_stats(self, tmp_path):
+        from notecard.emulator import NotecardEmulator
+
+        journal_path = str(tmp_path / 'upload.journal')
+        emulator = NotecardEmulator()
+        data = bytes(3000)
+        full = upload(self.open_card(emulator), data, route='r',
+                      max_chunk_size=1000)
+        journal = UploadJournal(journal_path)
+        journal_key = 'r||3000|{}'.format(
+            _content_hash(data, 3000))
+        journal.record(journal_key, 3000)
+
+        result = upload(self.open_card(emulator), data, route='r',
+                        max_chunk_size=1000, journal=journal)
+
+        assert result.keys() == full.keys()
+        assert result['resumed_offset'] == 3000
+        assert result['bytes_uploaded'] == 0
+        assert result['retries'] == 0
+        assert result['bytes_transferred'] == 0
+        assert result['chunk_size'] == 1000
+        assert len(emulator.web_posts) == 3
+        assert journal.offset(journal_key) == 0
+
+    def test_journal_keeps_latest_offset_per_upload(self, tmp_path):
+        journal_path = str(tmp_path / 'upload.journal')
+        journal = UploadJournal(journal_path)
+        journal.record('a', 100)
+        journal.record('b', 50)
+        journal.record('a', 200)
+
+        journal = UploadJournal(journal_path)
+        assert journal.offset('a') == 200
+        assert journal.offset('b') == 50
+        assert journal.offset('c') == 0
+
+        journal.finish('a')
+        journal = UploadJournal(journal_path)
+        assert journal.offset('a') == 0
+        assert journal.offset('b') == 50
+
+    def test_journal_ignores_torn_line(self, tmp_path):
+        journal_path = tmp_path / 'upload.journal'
+        journal_path.write_text('{"key": "a", "offset": 100}\n'
+                                '{"key": "a", "off')
+
+        assert UploadJournal(str(journal_path)).offset('a') == 100
+
+    def test_journal_rejects_iterator(self, card, tmp_path):
+        journal = UploadJournal(str(tmp_path / 'upload.journal'))
+        with pytest.raises(ValueError, match='iterable'):
+            upload(card, iter([bytes(10)]), route='r', length=10,
+                   journal=journal)
+
+    def test_journal_rejects_unseekable_file(self, card, tmp_path):
+        journal = UploadJournal(str(tmp_path / 'upload.journal'))
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, bytes(10))
+        os.close(write_fd)
+
+        with open(read_fd, 'rb') as pipe:
+            with pytest.raises(ValueError, match='seekable file'):
+                upload(card, pipe, route='r', length=10, journal=journal)
+
+        card.Transaction.assert_not_called()